@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import resource
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.config.settings import FPS, VIDEO_WIDTH, VIDEO_HEIGHT
+from src.video.backends import BACKENDS, np
+from src.video.compositor import QuizCompositor
+from src.video.ffmpeg import FFmpegPipeWriter
+from src.video.sinks import PngFrameSink
+
+from .synthetic import synthetic_background, synthetic_images, synthetic_job
+
+# =========================================================
+# RESULT MODEL
+# =========================================================
+
+
+@dataclass(frozen=True)
+class Metric:
+    value: float
+    unit: str
+    higher_is_better: bool
+
+    def to_dict(self) -> dict:
+        return {
+            "value": round(self.value, 4),
+            "unit": self.unit,
+            "higher_is_better": self.higher_is_better,
+        }
+
+
+Results = Dict[str, Metric]
+
+
+@dataclass(frozen=True)
+class BenchConfig:
+    frames: int = 120  # frames timed per compositor/sink case
+    encode_frames: int = 90
+    presets: tuple = ("ultrafast", "veryfast", "medium")
+    render_seconds: int = 8  # synthetic job length for end-to-end
+
+
+QUICK = BenchConfig(frames=30, encode_frames=30, presets=("ultrafast",), render_seconds=4)
+
+
+def _fps(frames: int, seconds: float) -> float:
+    return frames / max(seconds, 1e-9)
+
+
+def _compositor(backend: str = "pil") -> QuizCompositor:
+    return QuizCompositor(
+        hook_text="Name these 4 things!",
+        instruction_text="All start with the letter A",
+        images=synthetic_images(),
+        duration_seconds=20,
+        background=synthetic_background(),
+        backend=backend,
+    )
+
+
+def _sample_frames(count: int) -> List[bytes]:
+    """
+    `count` raw frames cycling through the whole video (distinct content).
+    """
+    comp = _compositor()
+    step = max(1, comp.total_frames // count)
+    return [
+        bytes(comp.render_frame_buffer((i * step % comp.total_frames) / FPS))
+        for i in range(count)
+    ]
+
+
+# =========================================================
+# COMPOSITOR
+# =========================================================
+
+
+def bench_compositor(cfg: BenchConfig) -> Results:
+    """
+    _render_frame fps while elements animate vs. once they have settled.
+    """
+    results: Results = {}
+    backends = [b for b in BACKENDS if b != "numpy" or np is not None]
+
+    for backend in backends:
+        comp = _compositor(backend)
+        timer_start = int(comp.timer_start * FPS)
+        outro_start = int(comp.outro_start * FPS)
+
+        windows = {
+            "animating": range(0, timer_start),
+            "settled": range(timer_start, outro_start),
+        }
+        for state, window in windows.items():
+            indices = [window[i % len(window)] for i in range(cfg.frames)]
+            comp._render_frame(indices[0] / FPS)  # warm sprite/tile caches
+
+            start = time.perf_counter()
+            for i in indices:
+                comp._render_frame(i / FPS)
+            elapsed = time.perf_counter() - start
+
+            results[f"compositor.{backend}.{state}_fps"] = Metric(
+                _fps(len(indices), elapsed), "fps", True
+            )
+
+    return results
+
+
+# =========================================================
+# FRAME SINKS
+# =========================================================
+
+
+class _RawFileSink:
+    """
+    Raw RGB bytes appended to one file: the cost of the pipe format alone.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.f = path.open("wb")
+
+    def write(self, frame) -> None:
+        self.f.write(frame)
+
+    def close(self) -> None:
+        self.f.close()
+
+
+def bench_sinks(cfg: BenchConfig) -> Results:
+    frames = _sample_frames(min(cfg.frames, 30))
+    total = cfg.frames
+    results: Results = {}
+
+    with tempfile.TemporaryDirectory(prefix="bench_sinks_") as tmp:
+        sinks = {
+            "png": lambda: PngFrameSink(Path(tmp) / "png"),
+            "raw": lambda: _RawFileSink(Path(tmp) / "frames.rgb"),
+        }
+        for name, make in sinks.items():
+            sink = make()
+            start = time.perf_counter()
+            for i in range(total):
+                sink.write(frames[i % len(frames)])
+            sink.close()
+            elapsed = time.perf_counter() - start
+
+            results[f"sink.{name}_fps"] = Metric(_fps(total, elapsed), "fps", True)
+
+    return results
+
+
+# =========================================================
+# ENCODER
+# =========================================================
+
+
+def bench_encoder(cfg: BenchConfig) -> Results:
+    if shutil.which("ffmpeg") is None:
+        return {}
+
+    frames = _sample_frames(min(cfg.encode_frames, 30))
+    results: Results = {}
+
+    with tempfile.TemporaryDirectory(prefix="bench_encode_") as tmp:
+        for preset in cfg.presets:
+            writer = FFmpegPipeWriter(
+                Path(tmp) / f"{preset}.mp4",
+                fps=FPS,
+                width=VIDEO_WIDTH,
+                height=VIDEO_HEIGHT,
+                crf=20,
+                preset=preset,
+            )
+            start = time.perf_counter()
+            with writer:
+                for i in range(cfg.encode_frames):
+                    writer.write(frames[i % len(frames)])
+            elapsed = time.perf_counter() - start
+
+            results[f"encode.{preset}_seconds"] = Metric(elapsed, "s", False)
+            results[f"encode.{preset}_fps"] = Metric(
+                _fps(cfg.encode_frames, elapsed), "fps", True
+            )
+
+    return results
+
+
+# =========================================================
+# END TO END
+# =========================================================
+
+
+def _render_child(seconds: int, queue) -> None:
+    from src.video.renderer import render_job_to_mp4
+
+    job = synthetic_job(duration_seconds=seconds)
+    start = time.perf_counter()
+    render_job_to_mp4(job)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    queue.put((elapsed, self_kb, children_kb))
+
+
+def bench_render(cfg: BenchConfig) -> Results:
+    """
+    render_job_to_mp4 wall time + peak RSS, in a fresh process with
+    throwaway output/cache dirs and the render cache disabled.
+    """
+    if shutil.which("ffmpeg") is None:
+        return {}
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="bench_render_") as tmp:
+        env = {
+            "OUTPUT_DIR": str(Path(tmp) / "output"),
+            "CACHE_DIR": str(Path(tmp) / "cache"),
+            "RENDER_CACHE_MAX_MB": "0",
+        }
+        saved = {k: os.environ.get(k) for k in env}
+        os.environ.update(env)  # inherited by the spawned interpreter
+        try:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_render_child, args=(cfg.render_seconds, queue))
+            proc.start()
+            proc.join()
+            if proc.exitcode != 0:
+                raise RuntimeError(f"Render benchmark failed (exit {proc.exitcode})")
+            elapsed, self_kb, children_kb = queue.get(timeout=5)
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+    return {
+        "render.wall_seconds": Metric(elapsed, "s", False),
+        "render.realtime_factor": Metric(cfg.render_seconds / elapsed, "x", True),
+        "render.peak_rss_mb": Metric(self_kb / 1024, "MB", False),
+        "render.peak_child_rss_mb": Metric(children_kb / 1024, "MB", False),
+    }
+
+
+# =========================================================
+# REGISTRY
+# =========================================================
+
+SUITES: Dict[str, Callable[[BenchConfig], Results]] = {
+    "compositor": bench_compositor,
+    "sinks": bench_sinks,
+    "encoder": bench_encoder,
+    "render": bench_render,
+}
+
+
+def run_suites(names: Optional[List[str]], cfg: BenchConfig) -> Results:
+    results: Results = {}
+    for name in names or list(SUITES):
+        results.update(SUITES[name](cfg))
+    return results
@@ -0,0 +1,156 @@
+"""
+Offline benchmark runner (synthetic inputs, no network).
+
+  python -m benchmarks.run                         # full suite → benchmarks/results.json
+  python -m benchmarks.run --quick --only compositor,sinks
+  python -m benchmarks.run --save-baseline         # also store as the baseline
+  python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.10
+
+With --baseline the exit code is 1 when any metric regressed by more than
+the threshold (relative), so the run can gate a deploy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from src.config.settings import COMPOSITOR_BACKEND, RENDER_WORKERS
+from src.utils.logger import get_logger
+
+from .cases import QUICK, SUITES, BenchConfig, Results, run_suites
+
+log = get_logger("bench")
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_OUT = BENCH_DIR / "results.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.10
+
+
+# =========================================================
+# RESULTS FILE
+# =========================================================
+
+
+def build_report(results: Results, cfg: BenchConfig) -> dict:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+        },
+        "config": {
+            "frames": cfg.frames,
+            "encode_frames": cfg.encode_frames,
+            "presets": list(cfg.presets),
+            "render_seconds": cfg.render_seconds,
+            "compositor_backend": COMPOSITOR_BACKEND,
+            "render_workers": RENDER_WORKERS,
+        },
+        "metrics": {name: m.to_dict() for name, m in sorted(results.items())},
+    }
+
+
+def write_report(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    log.info("Results written: %s", path)
+
+
+# =========================================================
+# BASELINE COMPARISON
+# =========================================================
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Metric names that got worse than the baseline by more than `threshold`.
+    """
+    regressions: List[str] = []
+    base_metrics: Dict[str, dict] = baseline.get("metrics", {})
+
+    for name, cur in current["metrics"].items():
+        base = base_metrics.get(name)
+        if base is None or not base["value"]:
+            log.info("  %-36s %10.3f %-4s (no baseline)", name, cur["value"], cur["unit"])
+            continue
+
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = -change if cur["higher_is_better"] else change
+        flag = "REGRESSION" if worse > threshold else ""
+        log.info(
+            "  %-36s %10.3f %-4s vs %10.3f (%+6.1f%%) %s",
+            name,
+            cur["value"],
+            cur["unit"],
+            base["value"],
+            change * 100,
+            flag,
+        )
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+
+# =========================================================
+# CLI
+# =========================================================
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", help=f"comma-separated subset of {list(SUITES)}")
+    parser.add_argument("--quick", action="store_true", help="fewer frames/presets")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--baseline", type=Path, help="compare against this file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"also write the results to {DEFAULT_BASELINE.name}",
+    )
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else None
+    unknown = set(names or []) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {sorted(unknown)}")
+
+    cfg = QUICK if args.quick else BenchConfig()
+    log.info("Running benchmarks: %s", ", ".join(names or SUITES))
+
+    report = build_report(run_suites(names, cfg), cfg)
+    write_report(report, args.out)
+    if args.save_baseline:
+        write_report(report, DEFAULT_BASELINE)
+
+    if args.baseline is None:
+        for name, m in report["metrics"].items():
+            log.info("  %-36s %10.3f %s", name, m["value"], m["unit"])
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        log.error(
+            "%d metric(s) regressed by more than %.0f%%: %s",
+            len(regressions),
+            args.threshold * 100,
+            ", ".join(regressions),
+        )
+        return 1
+
+    log.info("No regressions beyond %.0f%%", args.threshold * 100)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+from typing import List
+
+from PIL import Image, ImageDraw
+
+from src.video.renderer import RenderJob
+
+# =========================================================
+# SYNTHETIC INPUTS (NO NETWORK)
+# =========================================================
+
+IMAGE_SIZE = (800, 800)  # comparable to a cached wiki image
+
+
+def synthetic_image(seed: int, size: tuple[int, int] = IMAGE_SIZE) -> Image.Image:
+    """
+    Deterministic gradient + shapes: detailed enough to exercise resampling
+    and encoding, unlike a flat color.
+    """
+    rng = random.Random(seed)
+    w, h = size
+
+    r0, g0, b0 = (rng.randrange(256) for _ in range(3))
+    gradient = Image.linear_gradient("L").resize(size)
+    img = Image.merge(
+        "RGB",
+        (
+            gradient.point(lambda v: (v + r0) % 256),
+            gradient.rotate(90).point(lambda v: (v + g0) % 256),
+            gradient.point(lambda v: (255 - v + b0) % 256),
+        ),
+    )
+
+    draw = ImageDraw.Draw(img)
+    for _ in range(24):
+        x0, y0 = rng.randrange(w), rng.randrange(h)
+        x1, y1 = x0 + rng.randrange(20, w // 3), y0 + rng.randrange(20, h // 3)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+    return img
+
+
+def synthetic_images(count: int = 4, seed: int = 0) -> List[Image.Image]:
+    return [synthetic_image(seed * 100 + i) for i in range(count)]
+
+
+def synthetic_background(seed: int = 0) -> Image.Image:
+    return synthetic_image(10_000 + seed, size=(1080, 1920))
+
+
+def synthetic_job(duration_seconds: int = 20, seed: int = 0) -> RenderJob:
+    return RenderJob(
+        puzzle_id=f"bench-{seed:03d}",
+        hook="Name these 4 things!",
+        instruction="All start with the letter A",
+        items=["alpha", "bravo", "charlie", "delta"],
+        images=synthetic_images(seed=seed),
+        duration_seconds=duration_seconds,
+        title="Benchmark",
+        description="Synthetic benchmark job",
+        tags=["bench"],
+    )
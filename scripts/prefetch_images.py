@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sys
+
+from src.media.wiki import prefetch_images
+from src.puzzle.loader import load_valid_puzzles
+from src.utils.logger import get_logger
+
+log = get_logger("prefetch-images")
+
+
+def main() -> int:
+    items = [item for p in load_valid_puzzles() for item in p["items"]]
+
+    log.info("🖼️ Prefetching images for %d item(s)", len(items))
+    failed = prefetch_images(items)
+
+    for item in failed:
+        log.error("❌ %s", item)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
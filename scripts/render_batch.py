@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from src.pipeline.batch import render_batch
+from src.utils.logger import get_logger
+
+log = get_logger("render-batch")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Render many puzzles in one process (no upload)."
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ids", help="comma-separated puzzle ids")
+    target.add_argument("--next", type=int, metavar="N", help="next N unused puzzles")
+    parser.add_argument("--draft", action="store_true", help="low-res QA drafts")
+    args = parser.parse_args()
+
+    ids = [p.strip() for p in args.ids.split(",") if p.strip()] if args.ids else None
+
+    log.info("🚀 Starting batch render")
+    report = render_batch(puzzle_ids=ids, count=args.next, draft=args.draft)
+
+    for item in report.failed:
+        log.error("❌ %s: %s", item.puzzle_id, item.error)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from src.pipeline.runner import run_once
+import sys
+
+from src.pipeline.runner import run_draft, run_once
 from src.pipeline.uploader import upload_video
 from src.utils.logger import get_logger
 
@@ -8,6 +10,15 @@ log = get_logger("run-once")
 
 
 def main() -> None:
+    if "--draft" in sys.argv[1:]:
+        # QA preview only: no full render, no upload, puzzle stays unused
+        log.info("📝 Rendering draft...")
+        draft = run_draft()
+        log.info("Draft: %s", draft.video)
+        if draft.contact_sheet is not None:
+            log.info("Contact sheet: %s", draft.contact_sheet)
+        return
+
     log.info("🚀 Starting visual quiz pipeline")
 
     log.info("🎨 Rendering video...")
@@ -65,10 +65,15 @@ CACHE_DIR: Final[Path] = PROJECT_ROOT / env_str("CACHE_DIR", "cache")
 OUTPUT_DIR: Final[Path] = PROJECT_ROOT / env_str("OUTPUT_DIR", "output")
 
 WIKI_CACHE_DIR: Final[Path] = CACHE_DIR / "wiki_images"
+WIKI_CACHE_INDEX: Final[Path] = CACHE_DIR / "wiki_images.sqlite3"
 FRAME_CACHE_DIR: Final[Path] = CACHE_DIR / "rendered_frames"
+MUSIC_CACHE_DIR: Final[Path] = CACHE_DIR / "music"
+RENDER_CACHE_DIR: Final[Path] = CACHE_DIR / "renders"
+OUTRO_CACHE_DIR: Final[Path] = CACHE_DIR / "outros"
 
 VIDEO_OUTPUT_DIR: Final[Path] = OUTPUT_DIR / "videos"
 META_OUTPUT_DIR: Final[Path] = OUTPUT_DIR / "meta"
+DRAFT_OUTPUT_DIR: Final[Path] = OUTPUT_DIR / "drafts"
 
 STATE_DIR: Final[Path] = PROJECT_ROOT / "state"
 LAST_RUN_FILE: Final[Path] = STATE_DIR / "last_run.txt"
@@ -86,6 +91,49 @@ TIMER_SECONDS: Final[int] = env_int("TIMER_SECONDS", 15)
 ENTRY_ANIMATION_DURATION: Final[float] = env_float("ENTRY_ANIMATION_DURATION", 0.5)
 IMAGE_STAGGER_DELAY: Final[float] = env_float("IMAGE_STAGGER_DELAY", 0.2)
 
+# pipe raw frames into ffmpeg (False = PNG frames on disk)
+STREAM_ENCODE: Final[bool] = env_bool("STREAM_ENCODE", True)
+
+# encode static holds from single stills and join segments with -c copy
+SEGMENT_ENCODE: Final[bool] = env_bool("SEGMENT_ENCODE", False)
+# identical frames needed before a run is encoded as a still segment
+SEGMENT_MIN_HOLD_FRAMES: Final[int] = env_int("SEGMENT_MIN_HOLD_FRAMES", 15)
+
+# "pil" or "numpy" (vectorized blends into a preallocated canvas)
+COMPOSITOR_BACKEND: Final[str] = env_str("COMPOSITOR_BACKEND", "pil")
+
+# frame rendering processes (1 = render in the main process)
+RENDER_WORKERS: Final[int] = env_int("RENDER_WORKERS", 1)
+# rendered-but-unencoded frames held in memory (~6MB each at 1080x1920)
+RENDER_MAX_IN_FLIGHT: Final[int] = env_int("RENDER_MAX_IN_FLIGHT", 60)
+
+# frames per resumable chunk when streaming (0 = one pass, no resume)
+RENDER_CHECKPOINT_FRAMES: Final[int] = env_int("RENDER_CHECKPOINT_FRAMES", 150)
+
+# per-phase compositor timings written next to the metadata JSON
+RENDER_PROFILE: Final[bool] = env_bool("RENDER_PROFILE", False)
+
+# finished videos kept for identical jobs, LRU-evicted (0 = disabled)
+RENDER_CACHE_MAX_MB: Final[int] = env_int("RENDER_CACHE_MAX_MB", 2048)
+
+# encode the outro once per background/branding/encoder and stream-copy it
+# onto chunked and segmented renders
+OUTRO_CACHE: Final[bool] = env_bool("OUTRO_CACHE", True)
+# cached outro segments, LRU-evicted beyond this size
+OUTRO_CACHE_MAX_MB: Final[int] = env_int("OUTRO_CACHE_MAX_MB", 256)
+
+# extra outputs encoded from the same frames, written as <name>.<rendition>.mp4
+# "name:WxH[:crf=N][:preset=P][:audio=0|1]", comma-separated ("" = none)
+RENDITIONS: Final[str] = env_str("RENDITIONS", "")
+
+# QA drafts: same timeline at a fraction of the size/fps, silent, ultrafast
+DRAFT_SCALE: Final[float] = env_float("DRAFT_SCALE", 0.33)
+DRAFT_FPS: Final[int] = env_int("DRAFT_FPS", 10)
+DRAFT_CRF: Final[int] = env_int("DRAFT_CRF", 30)
+DRAFT_PRESET: Final[str] = env_str("DRAFT_PRESET", "ultrafast")
+# keyframe contact sheet PNG next to each draft
+DRAFT_CONTACT_SHEET: Final[bool] = env_bool("DRAFT_CONTACT_SHEET", True)
+
 # =========================================================
 # FONTS
 # =========================================================
@@ -116,6 +164,24 @@ UPLOAD_INTERVAL_HOURS: Final[int] = env_int("UPLOAD_INTERVAL_HOURS", 24)
 WIKI_LANG: Final[str] = env_str("WIKI_LANG", "en")
 WIKI_IMAGE_MIN_WIDTH: Final[int] = env_int("WIKI_IMAGE_MIN_WIDTH", 600)
 WIKI_IMAGE_MIN_HEIGHT: Final[int] = env_int("WIKI_IMAGE_MIN_HEIGHT", 600)
+# API endpoint override (e.g. a local stand-in); "" = https://<lang>.wikipedia.org
+WIKI_API_URL: Final[str] = env_str("WIKI_API_URL", "")
+# cached images older than this are revalidated with a conditional GET
+# (0 = never)
+WIKI_REVALIDATE_DAYS: Final[int] = env_int("WIKI_REVALIDATE_DAYS", 30)
+# downloads larger than this are abandoned (streamed, never fully buffered)
+WIKI_MAX_IMAGE_MB: Final[int] = env_int("WIKI_MAX_IMAGE_MB", 25)
+# parallel image downloads per puzzle/prefetch (one pooled HTTP session)
+WIKI_DOWNLOAD_WORKERS: Final[int] = env_int("WIKI_DOWNLOAD_WORKERS", 4)
+# shared per-host token bucket for all Wikimedia requests
+WIKI_RATE_LIMIT: Final[float] = env_float("WIKI_RATE_LIMIT", 5.0)  # requests/sec
+WIKI_RATE_BURST: Final[int] = env_int("WIKI_RATE_BURST", 5)
+# retries on 429/5xx/connection errors (Retry-After or jittered backoff)
+WIKI_MAX_RETRIES: Final[int] = env_int("WIKI_MAX_RETRIES", 4)
+WIKI_BACKOFF_MAX: Final[float] = env_float("WIKI_BACKOFF_MAX", 60.0)  # seconds
+# consecutive failed requests before a host is skipped for the cooldown
+WIKI_BREAKER_FAILURES: Final[int] = env_int("WIKI_BREAKER_FAILURES", 3)
+WIKI_BREAKER_COOLDOWN: Final[float] = env_float("WIKI_BREAKER_COOLDOWN", 120.0)
 
 # =========================================================
 # AUDIO
@@ -123,6 +189,8 @@ WIKI_IMAGE_MIN_HEIGHT: Final[int] = env_int("WIKI_IMAGE_MIN_HEIGHT", 600)
 
 ENABLE_BACKGROUND_MUSIC: Final[bool] = env_bool("ENABLE_BACKGROUND_MUSIC", True)
 MUSIC_VOLUME: Final[float] = env_float("MUSIC_VOLUME", 0.15)
+MUSIC_FADE_IN: Final[float] = env_float("MUSIC_FADE_IN", 0.0)
+MUSIC_FADE_OUT: Final[float] = env_float("MUSIC_FADE_OUT", 0.0)
 
 # =========================================================
 # YOUTUBE (optional in DRY_RUN)
@@ -151,9 +219,13 @@ def ensure_directories() -> None:
         CACHE_DIR,
         WIKI_CACHE_DIR,
         FRAME_CACHE_DIR,
+        MUSIC_CACHE_DIR,
+        RENDER_CACHE_DIR,
+        OUTRO_CACHE_DIR,
         OUTPUT_DIR,
         VIDEO_OUTPUT_DIR,
         META_OUTPUT_DIR,
+        DRAFT_OUTPUT_DIR,
         STATE_DIR,
     ):
         p.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from ..config.settings import WIKI_CACHE_DIR, WIKI_CACHE_INDEX
+from ..utils.hashing import sha256_file
+from ..utils.logger import get_logger
+
+log = get_logger("image-index")
+
+INDEX_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    file TEXT PRIMARY KEY,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    source_url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+# =========================================================
+# ENTRY
+# =========================================================
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    file: str  # name inside WIKI_CACHE_DIR
+    width: int
+    height: int
+    bytes: int
+    mtime_ns: int
+    ctime_ns: int  # changes on any rewrite, even one that restores mtime
+    sha256: str
+    source_url: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    accessed_at: float
+
+    @classmethod
+    def for_file(
+        cls,
+        path: Path,
+        *,
+        source_url: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+    ) -> "IndexEntry":
+        """
+        Describe a cache file; reads the image header only, not the pixels.
+        """
+        with Image.open(path) as img:
+            width, height = img.size
+        st = path.stat()
+        now = time.time()
+        return cls(
+            file=path.name,
+            width=width,
+            height=height,
+            bytes=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            ctime_ns=st.st_ctime_ns,
+            sha256=sha256_file(path),
+            source_url=source_url,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=now if fetched_at is None else fetched_at,
+            accessed_at=now,
+        )
+
+    def matches(self, path: Path) -> bool:
+        """
+        Whether the file on disk is still the one indexed: same size and
+        timestamps, or (when a timestamp moved) the same content hash.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_size != self.bytes:
+            return False
+        if st.st_mtime_ns == self.mtime_ns and st.st_ctime_ns == self.ctime_ns:
+            return True
+        return sha256_file(path) == self.sha256
+
+
+_COLUMNS = [f.name for f in fields(IndexEntry)]
+
+
+# =========================================================
+# INDEX
+# =========================================================
+
+
+class ImageCacheIndex:
+    """
+    SQLite metadata for the wiki image cache, one row per cached file.
+
+    Safe to share between threads (one connection behind a lock) and
+    between processes (SQLite locking, WAL journal).
+    """
+
+    def __init__(self, path: Path = WIKI_CACHE_INDEX, root: Path = WIKI_CACHE_DIR):
+        self.path = path
+        self.root = root
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS images")
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={INDEX_VERSION}")
+            self.rebuild()
+
+    def get(self, file: str) -> Optional[IndexEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM images WHERE file = ?", (file,)
+            ).fetchone()
+        return IndexEntry(*row) if row else None
+
+    def lookup(self, path: Path) -> Optional[IndexEntry]:
+        """
+        Entry for `path` if it still describes the file on disk. A file
+        that was only touched (same content) gets its timestamps
+        re-recorded, so it is hashed once, not on every lookup.
+        """
+        entry = self.get(path.name)
+        if entry is None or not entry.matches(path):
+            return None
+        st = path.stat()
+        if (st.st_mtime_ns, st.st_ctime_ns) != (entry.mtime_ns, entry.ctime_ns):
+            entry = replace(entry, mtime_ns=st.st_mtime_ns, ctime_ns=st.st_ctime_ns)
+            self.put(entry)
+        return entry
+
+    def put(self, entry: IndexEntry) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO images ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(getattr(entry, c) for c in _COLUMNS),
+            )
+
+    def touch(self, file: str, *, fetched: bool = False) -> None:
+        """
+        Record a cache hit (and, with `fetched`, a successful revalidation).
+        """
+        now = time.time()
+        column = "fetched_at = ?, accessed_at" if fetched else "accessed_at"
+        params = (now, now, file) if fetched else (now, file)
+        with self._lock:
+            self._conn.execute(f"UPDATE images SET {column} = ? WHERE file = ?", params)
+
+    def remove(self, file: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM images WHERE file = ?", (file,))
+
+    def rebuild(self) -> int:
+        """
+        Index the files already in the cache directory (source unknown,
+        fetch time taken from the file's mtime). Unreadable files are
+        deleted. Returns the number of entries added.
+        """
+        added = 0
+        for path in sorted(self.root.glob("*.jpg")):
+            try:
+                entry = IndexEntry.for_file(path, fetched_at=path.stat().st_mtime)
+            except Exception:
+                path.unlink(missing_ok=True)
+                continue
+            self.put(entry)
+            added += 1
+
+        log.info("Image cache index rebuilt: %d file(s)", added)
+        return added
+
+
+_index: Optional[ImageCacheIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_image_index() -> ImageCacheIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ImageCacheIndex()
+        return _index
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from ..config.settings import (
+    WIKI_RATE_LIMIT,
+    WIKI_RATE_BURST,
+    WIKI_MAX_RETRIES,
+    WIKI_BACKOFF_MAX,
+    WIKI_BREAKER_FAILURES,
+    WIKI_BREAKER_COOLDOWN,
+)
+from ..utils.logger import get_logger
+from ..utils.time import utc_now
+
+log = get_logger("ratelimit")
+
+# =========================================================
+# CONSTANTS
+# =========================================================
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE = 1.0  # seconds, doubled per attempt
+MIN_RATE_FRACTION = 0.1  # throttling never slows a host below this share
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+# =========================================================
+# TOKEN BUCKET
+# =========================================================
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every request to one host.
+
+    A throttled response halves the refill rate and pauses the bucket, so
+    all threads back off together; each success recovers a little rate.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.max_rate = max(0.01, rate)
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - max(self._updated, self._resume_at))
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = max(now, self._updated)
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available; returns the seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._resume_at and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                if now < self._resume_at:
+                    delay = self._resume_at - now
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def throttle(self, pause: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # one halving per pause, however many threads hit the limit
+            if now >= self._resume_at:
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self._tokens = 0.0
+            self._resume_at = max(self._resume_at, now + pause)
+
+    def recover(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+# =========================================================
+# CIRCUIT BREAKER
+# =========================================================
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed requests; while open,
+    requests fail immediately. After `cooldown` one trial request is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> bool:
+        """
+        Returns True when this failure opened the circuit.
+        """
+        with self._lock:
+            self._failures += 1
+            reopened = self._trial
+            self._trial = False
+            if reopened or (
+                self._opened_at is None and self._failures >= self.threshold
+            ):
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+# =========================================================
+# STATS
+# =========================================================
+
+
+@dataclass
+class RateLimitStats:
+    requests: int = 0
+    throttled: int = 0  # 429/5xx responses and connection errors
+    retried: int = 0
+    failed: int = 0  # gave up after retries, or circuit open
+    circuit_opened: int = 0
+    wait_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retried": self.retried,
+            "failed": self.failed,
+            "circuit_opened": self.circuit_opened,
+            "wait_seconds": round(self.wait_seconds, 2),
+        }
+
+
+# =========================================================
+# LIMITER
+# =========================================================
+
+
+def retry_after_seconds(resp: requests.Response) -> Optional[float]:
+    """
+    Retry-After as seconds (delta-seconds or HTTP-date), if present.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - utc_now()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int, cap: float = WIKI_BACKOFF_MAX) -> float:
+    """
+    Full-jitter exponential backoff for retry `attempt` (0-based).
+    """
+    return random.uniform(0, min(cap, BACKOFF_BASE * 2**attempt))
+
+
+class RateLimiter:
+    """
+    Per-host token buckets and circuit breakers in front of a session.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = WIKI_RATE_LIMIT,
+        burst: int = WIKI_RATE_BURST,
+        max_retries: int = WIKI_MAX_RETRIES,
+        backoff_max: float = WIKI_BACKOFF_MAX,
+        breaker_failures: int = WIKI_BREAKER_FAILURES,
+        breaker_cooldown: float = WIKI_BREAKER_COOLDOWN,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max(0, max_retries)
+        self.backoff_max = backoff_max
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.stats = RateLimitStats()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> tuple[TokenBucket, CircuitBreaker]:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+                self._breakers[host] = CircuitBreaker(
+                    self.breaker_failures, self.breaker_cooldown
+                )
+            return self._buckets[host], self._breakers[host]
+
+    def _count(self, field: str, amount: float = 1) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + amount)
+
+    def _give_up(self, host: str, breaker: CircuitBreaker) -> None:
+        self._count("failed")
+        if breaker.record_failure():
+            self._count("circuit_opened")
+            log.error(
+                "Circuit opened for %s for %.0fs", host, self.breaker_cooldown
+            )
+
+    def request(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send through the host's bucket, retrying 429/5xx/connection errors.
+
+        Waits are Retry-After when the server sends one, otherwise jittered
+        exponential backoff, both capped at `backoff_max`. Returns the last
+        response for other statuses (the caller checks it). Raises
+        CircuitOpenError while the host's circuit is open and RuntimeError
+        once the retries are used up.
+        """
+        host = urlsplit(url).netloc
+        bucket, breaker = self._host(host)
+
+        if not breaker.allow():
+            self._count("failed")
+            raise CircuitOpenError(f"Circuit open for {host}, skipping request")
+
+        for attempt in range(self.max_retries + 1):
+            self._count("wait_seconds", bucket.acquire())
+            self._count("requests")
+
+            try:
+                resp = session.request(method, url, **kwargs)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                resp, error = None, e
+            except Exception:
+                # not retryable, but still an outcome for the breaker (a
+                # half-open trial must not stay pending forever)
+                self._give_up(host, breaker)
+                raise
+
+            if resp is not None and resp.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                bucket.recover()
+                return resp
+
+            self._count("throttled")
+            reason = error or f"HTTP {resp.status_code}"
+            delay = retry_after_seconds(resp) if resp is not None else None
+            if delay is None:
+                delay = backoff_seconds(attempt, self.backoff_max)
+            delay = min(delay, self.backoff_max)
+
+            if resp is not None:
+                resp.close()
+
+            # a last attempt that gives up only slows the others down when
+            # the server explicitly asked for it
+            retrying = attempt < self.max_retries
+            if retrying or (resp is not None and resp.status_code == 429):
+                bucket.throttle(delay)
+
+            if retrying:
+                self._count("retried")
+                log.warning(
+                    "%s from %s, retry %d/%d in %.1fs",
+                    reason,
+                    host,
+                    attempt + 1,
+                    self.max_retries,
+                    delay,
+                )
+
+        self._give_up(host, breaker)
+        raise RuntimeError(
+            f"{reason} from {host} after {self.max_retries + 1} attempt(s)"
+        )
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -3,20 +3,31 @@ from __future__ import annotations
 import hashlib
 import io
 import re
+import sqlite3
+import threading
 import time
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image, UnidentifiedImageError
 
 from ..config.settings import (
+    WIKI_API_URL,
+    WIKI_DOWNLOAD_WORKERS,
     WIKI_LANG,
     WIKI_CACHE_DIR,
     WIKI_IMAGE_MIN_WIDTH,
     WIKI_IMAGE_MIN_HEIGHT,
+    WIKI_MAX_IMAGE_MB,
+    WIKI_REVALIDATE_DAYS,
 )
 from ..utils.logger import get_logger
+from .image_index import IndexEntry, get_image_index
+from .ratelimit import get_rate_limiter
 
 
 log = get_logger("wiki")
@@ -30,7 +41,47 @@ HEADERS = {
     "User-Agent": "VisualQuizShortsBot/1.0 (educational use; contact admin@example.com)"
 }
 
-RATE_LIMIT_SLEEP = 30  # seconds
+REQUEST_TIMEOUT = 15  # seconds
+DOWNLOAD_CHUNK = 64 * 1024
+# pithumbsize bounds the long edge; this much headroom keeps the short edge
+# of images up to 2:1 above the minimum size
+THUMB_ASPECT_HEADROOM = 2
+MAX_TITLES_PER_QUERY = 50  # MediaWiki limit for anonymous clients
+
+
+# =========================================================
+# HTTP SESSION
+# =========================================================
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide keep-alive session, shared by the download threads.
+    The pool holds a connection per worker for each host.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            size = max(1, WIKI_DOWNLOAD_WORKERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    """
+    GET through the shared session and the Wikimedia rate limiter.
+    """
+    return get_rate_limiter().request(
+        get_session(), "GET", url, timeout=REQUEST_TIMEOUT, **kwargs
+    )
 
 
 # =========================================================
@@ -51,6 +102,10 @@ def _cache_path(query: str) -> Path:
     return WIKI_CACHE_DIR / f"{slug}_{h}.jpg"
 
 
+def _api_url() -> str:
+    return WIKI_API_URL or WIKI_API.format(lang=WIKI_LANG)
+
+
 def _valid_image(img: Image.Image) -> bool:
     w, h = img.size
     return w >= WIKI_IMAGE_MIN_WIDTH and h >= WIKI_IMAGE_MIN_HEIGHT
@@ -75,22 +130,82 @@ def _save_cache(path: Path, img: Image.Image) -> None:
         pass
 
 
-def _download_image(url: str) -> Image.Image:
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
-
-        if resp.status_code == 429:
-            log.error(
-                "Wikimedia rate-limited (429). Cooling down %ss", RATE_LIMIT_SLEEP
-            )
-            time.sleep(RATE_LIMIT_SLEEP)
-            raise RuntimeError("Rate limited by Wikimedia")
+@dataclass(frozen=True)
+class Download:
+    image: Optional[Image.Image]  # None: not modified (304)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _thumb_size() -> int:
+    return max(WIKI_IMAGE_MIN_WIDTH, WIKI_IMAGE_MIN_HEIGHT) * THUMB_ASPECT_HEADROOM
+
+
+def _read_capped(resp: requests.Response, limit: int) -> bytes:
+    """
+    Stream the body, giving up as soon as it exceeds `limit` bytes.
+    """
+    length = resp.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > limit:
+        raise RuntimeError(f"Image too large ({int(length) >> 20} MB)")
+
+    data = bytearray()
+    for chunk in resp.iter_content(DOWNLOAD_CHUNK):
+        data += chunk
+        if len(data) > limit:
+            raise RuntimeError(f"Image larger than {limit >> 20} MB")
+    return bytes(data)
+
+
+def _decode_image(data: bytes) -> Image.Image:
+    """
+    Decode at the smallest scale that still meets the minimum size: JPEGs
+    via DCT scaling (draft), other formats via an integer reduce.
+    """
+    img = Image.open(io.BytesIO(data))
+    box = (WIKI_IMAGE_MIN_WIDTH, WIKI_IMAGE_MIN_HEIGHT)
+
+    if img.format == "JPEG":
+        img.draft("RGB", box)
+        return img.convert("RGB")
+
+    # reduce() rejects palette/bilevel/16-bit modes, so convert first
+    img = img.convert("RGB")
+    factor = min(img.width // box[0], img.height // box[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img
+
+
+def _download_image(
+    url: str,
+    *,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Download:
+    """
+    GET an image; with validators it is conditional and a 304 comes back
+    as Download(image=None).
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
 
-        resp.raise_for_status()
+    try:
+        # 429/5xx are retried (and shared as back-pressure) by the limiter
+        with _get(url, stream=True, headers=headers) as resp:
+            if resp.status_code == 304 and headers:
+                return Download(None, etag, last_modified)
+            resp.raise_for_status()
+            data = _read_capped(resp, WIKI_MAX_IMAGE_MB << 20)
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
 
         try:
-            return Image.open(io.BytesIO(resp.content)).convert("RGB")
-        except UnidentifiedImageError:
+            return Download(_decode_image(data), etag, last_modified)
+        except (UnidentifiedImageError, OSError, ValueError):
             raise RuntimeError("Downloaded file is not a valid image")
 
     except requests.RequestException as e:
@@ -98,86 +213,314 @@ def _download_image(url: str) -> Image.Image:
 
 
 # =========================================================
-# CORE
+# PAGE IMAGE LOOKUP (BATCHED)
 # =========================================================
 
 
-def fetch_wikipedia_image(query: str, *, force_refresh: bool = False) -> Image.Image:
-    cache_file = _cache_path(query)
+Size = Tuple[int, int]
 
-    # -----------------------------------------------------
-    # CACHE
-    # -----------------------------------------------------
-    if cache_file.exists() and not force_refresh:
+
+@dataclass(frozen=True)
+class PageImage:
+    title: str
+    original: Optional[str] = None
+    thumbnail: Optional[str] = None
+    original_size: Optional[Size] = None
+    thumbnail_size: Optional[Size] = None
+
+    def sources(self) -> List[tuple[str, str]]:
+        """
+        (kind, url) candidates in preference order.
+
+        The thumbnail (requested at render size) comes first unless the API
+        reports it below the minimum size while the original is larger;
+        only then is the original worth downloading.
+        """
+        thumb, orig = self.thumbnail_size, self.original_size
+        prefer_original = (
+            thumb is not None
+            and orig is not None
+            and (thumb[0] < WIKI_IMAGE_MIN_WIDTH or thumb[1] < WIKI_IMAGE_MIN_HEIGHT)
+            and orig[0] * orig[1] > thumb[0] * thumb[1]
+        )
+        found = [("thumbnail", self.thumbnail), ("original", self.original)]
+        if prefer_original:
+            found.reverse()
+        return [(kind, url) for kind, url in found if url]
+
+
+def _image_info(info: Optional[dict]) -> tuple[Optional[str], Optional[Size]]:
+    if not info:
+        return None, None
+    if "width" in info and "height" in info:
+        return info.get("source"), (int(info["width"]), int(info["height"]))
+    return info.get("source"), None
+
+
+def _resolve_title(title: str, query: dict) -> str:
+    """
+    Follow the API's normalization + redirect mapping for one input title.
+    """
+    for key in ("normalized", "redirects"):
+        mapping = {m["from"]: m["to"] for m in query.get(key, [])}
+        title = mapping.get(title, title)
+    return title
+
+
+def _query_page_images(
+    titles: Sequence[str],
+    api_url: str,
+) -> Dict[str, Optional[PageImage]]:
+    """
+    One pageimages request (plus continuations) for up to
+    MAX_TITLES_PER_QUERY titles.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "prop": "pageimages",
+        "piprop": "original|thumbnail",
+        "pithumbsize": _thumb_size(),
+        "pilimit": "max",
+        "titles": "|".join(titles),
+        "redirects": 1,
+    }
+
+    pages: Dict[str, dict] = {}
+    mappings: dict = {"normalized": [], "redirects": []}
+    cont: dict = {}
+
+    while True:
         try:
-            img = Image.open(cache_file).convert("RGB")
-            if _valid_image(img):
-                return img
-        except Exception:
-            cache_file.unlink(missing_ok=True)
+            resp = _get(api_url, params={**params, **cont})
+            resp.raise_for_status()
+            data = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            raise RuntimeError(f"pageimages query failed: {e}") from e
+
+        query = data.get("query", {})
+        for key in mappings:
+            mappings[key] += query.get(key, [])
+        for page in query.get("pages", {}).values():
+            merged = pages.setdefault(page.get("title", ""), {})
+            merged.update(page)
+
+        cont = data.get("continue") or {}
+        if not cont:
+            break
+
+    results: Dict[str, Optional[PageImage]] = {}
+    for title in titles:
+        page = pages.get(_resolve_title(title, mappings))
+        if page is None or "missing" in page or "invalid" in page:
+            results[title] = None
+            continue
+        original, original_size = _image_info(page.get("original"))
+        thumbnail, thumbnail_size = _image_info(page.get("thumbnail"))
+        results[title] = PageImage(
+            title=page["title"],
+            original=original,
+            thumbnail=thumbnail,
+            original_size=original_size,
+            thumbnail_size=thumbnail_size,
+        )
+    return results
+
+
+def resolve_page_images(
+    queries: Iterable[str],
+    *,
+    api_url: Optional[str] = None,
+) -> Dict[str, Optional[PageImage]]:
+    """
+    Image URLs for many titles, MAX_TITLES_PER_QUERY per API request.
+
+    Keys are the input strings; None means no such page. Titles in a batch
+    whose request fails are missing from the result.
+    """
+    api_url = api_url or _api_url()
+    unique = list(dict.fromkeys(q for q in queries if q and "|" not in q))
+
+    results: Dict[str, Optional[PageImage]] = {}
+    for i in range(0, len(unique), MAX_TITLES_PER_QUERY):
+        batch = unique[i : i + MAX_TITLES_PER_QUERY]
+        try:
+            results.update(_query_page_images(batch, api_url))
+        except RuntimeError as e:
+            log.warning("Page image lookup failed for %d title(s): %s", len(batch), e)
 
-    api_url = WIKI_API.format(lang=WIKI_LANG)
+    found = sum(1 for page in results.values() if page is not None)
+    log.info("Resolved page images: %d/%d titles", found, len(unique))
+    return results
 
-    # -----------------------------------------------------
-    # ORIGINAL IMAGE
-    # -----------------------------------------------------
+
+# =========================================================
+# CORE
+# =========================================================
+
+
+def _index_entry(path: Path) -> Optional[IndexEntry]:
+    """
+    Index row for a cache file that is still the file on disk.
+    """
     try:
-        params = {
-            "action": "query",
-            "format": "json",
-            "prop": "pageimages",
-            "piprop": "original",
-            "titles": query,
-            "redirects": 1,
-        }
-
-        resp = requests.get(api_url, params=params, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
-
-        pages = resp.json().get("query", {}).get("pages", {})
-
-        for page in pages.values():
-            original = page.get("original")
-            if original and "source" in original:
-                img = _download_image(original["source"])
-                if not _valid_image(img):
-                    img = _upscale(img)
-
-                _save_cache(cache_file, img)
-                return img
+        return get_image_index().lookup(path)
+    except (sqlite3.Error, OSError) as e:
+        log.warning("Image cache index unavailable: %s", e)
+        return None
 
-    except Exception as e:
-        log.warning("Original image failed for '%s': %s", query, e)
 
-    # -----------------------------------------------------
-    # FALLBACK: THUMBNAIL
-    # -----------------------------------------------------
+def _entry_valid(entry: IndexEntry) -> bool:
+    return entry.width >= WIKI_IMAGE_MIN_WIDTH and entry.height >= WIKI_IMAGE_MIN_HEIGHT
+
+
+def _entry_stale(entry: IndexEntry) -> bool:
+    if WIKI_REVALIDATE_DAYS <= 0 or not entry.source_url:
+        return False
+    return time.time() - entry.fetched_at > WIKI_REVALIDATE_DAYS * 86400
+
+
+def _index_file(path: Path, **source) -> None:
     try:
-        log.warning("Original image missing for '%s', trying thumbnail", query)
+        get_image_index().put(IndexEntry.for_file(path, **source))
+    except (sqlite3.Error, OSError) as e:
+        log.warning("Could not index %s: %s", path.name, e)
+
+
+def _store(query: str, img: Image.Image, url: str, download: Download) -> None:
+    path = _cache_path(query)
+    _save_cache(path, img)
+    if path.exists():
+        _index_file(
+            path,
+            source_url=url,
+            etag=download.etag,
+            last_modified=download.last_modified,
+        )
+
 
-        params["piprop"] = "thumbnail"
-        params["pithumbsize"] = max(
-            WIKI_IMAGE_MIN_WIDTH,
-            WIKI_IMAGE_MIN_HEIGHT,
+def _revalidate(query: str, entry: IndexEntry) -> Optional[Image.Image]:
+    """
+    Conditional GET for a stale entry. Returns the new image if the source
+    changed; None means keep the cached file (also when the check fails).
+    """
+    if not entry.source_url:
+        return None
+    try:
+        download = _download_image(
+            entry.source_url, etag=entry.etag, last_modified=entry.last_modified
         )
+    except Exception as e:
+        log.warning("Revalidation failed for '%s', using cache: %s", query, e)
+        return None
 
-        resp = requests.get(api_url, params=params, headers=HEADERS, timeout=15)
-        resp.raise_for_status()
+    if download.image is None:
+        get_image_index().touch(entry.file, fetched=True)
+        return None
 
-        pages = resp.json().get("query", {}).get("pages", {})
+    log.info("Cached image for '%s' changed upstream, refreshed", query)
+    img = download.image if _valid_image(download.image) else _upscale(download.image)
+    _store(query, img, entry.source_url, download)
+    return img
 
-        for page in pages.values():
-            thumb = page.get("thumbnail")
-            if thumb and "source" in thumb:
-                img = _download_image(thumb["source"])
-                if not _valid_image(img):
-                    img = _upscale(img)
 
-                _save_cache(cache_file, img)
+def _load_cached(query: str) -> Optional[Image.Image]:
+    cache_file = _cache_path(query)
+    entry = _index_entry(cache_file)
+
+    # indexed: size check and freshness without decoding
+    if entry is not None:
+        if not _entry_valid(entry):
+            return None
+        if _entry_stale(entry):
+            img = _revalidate(query, entry)
+            if img is not None:
                 return img
+        try:
+            img = Image.open(cache_file).convert("RGB")
+        except Exception:
+            cache_file.unlink(missing_ok=True)
+            return None
+        get_image_index().touch(entry.file)
+        return img
 
-    except Exception as e:
-        log.warning("Thumbnail image failed for '%s': %s", query, e)
+    # not indexed yet (or replaced on disk): decode, then index it
+    if not cache_file.exists():
+        return None
+    try:
+        img = Image.open(cache_file).convert("RGB")
+        if _valid_image(img):
+            _index_file(cache_file)
+            return img
+    except Exception:
+        cache_file.unlink(missing_ok=True)
+    return None
+
+
+def _maybe_cached(query: str) -> bool:
+    """
+    Whether `query` may be served from disk (stale entries included; files
+    not indexed yet are checked when loaded).
+    """
+    path = _cache_path(query)
+    entry = _index_entry(path)
+    return _entry_valid(entry) if entry is not None else path.exists()
+
+
+def _cache_hit(query: str) -> bool:
+    """
+    True when `query` is cached, valid and fresh per the index (no decode).
+    """
+    entry = _index_entry(_cache_path(query))
+    return entry is not None and _entry_valid(entry) and not _entry_stale(entry)
+
+
+def fetch_wikipedia_image(
+    query: str,
+    *,
+    force_refresh: bool = False,
+    page: Optional[PageImage] = None,
+) -> Image.Image:
+    """
+    Lead image of the `query` article (cached on disk).
+
+    `page` is the item's entry from resolve_page_images(); without it the
+    lookup is done here (one request for both original and thumbnail).
+    Images are fetched at render size (see PageImage.sources) and decoded
+    no larger than needed.
+    """
+    # -----------------------------------------------------
+    # CACHE
+    # -----------------------------------------------------
+    if not force_refresh:
+        img = _load_cached(query)
+        if img is not None:
+            return img
+
+    # -----------------------------------------------------
+    # LOOKUP
+    # -----------------------------------------------------
+    if page is None:
+        page = resolve_page_images([query]).get(query)
+    if page is None:
+        raise RuntimeError(f"No usable image found for '{query}'")
+
+    # -----------------------------------------------------
+    # RIGHT-SIZED THUMBNAIL, ORIGINAL ONLY IF NEEDED
+    # -----------------------------------------------------
+    for kind, url in page.sources():
+        try:
+            download = _download_image(url)
+        except Exception as e:
+            log.warning("%s image failed for '%s': %s", kind.capitalize(), query, e)
+            continue
+
+        img = download.image
+        if not _valid_image(img):
+            img = _upscale(img)
+
+        _store(query, img, url, download)
+        return img
 
     # -----------------------------------------------------
     # FINAL FAILURE
@@ -190,15 +533,85 @@ def fetch_wikipedia_image(query: str, *, force_refresh: bool = False) -> Image.I
 # =========================================================
 
 
-def fetch_images_for_items(items: list[str]) -> list[Image.Image]:
-    images: list[Image.Image] = []
+def _lookup_uncached(items: Iterable[str]) -> Dict[str, Optional[PageImage]]:
+    missing = [item for item in items if not _maybe_cached(item)]
+    return resolve_page_images(missing) if missing else {}
 
-    for item in items:
-        try:
-            img = fetch_wikipedia_image(item)
-            images.append(img)
-        except Exception as e:
-            log.error("Failed to fetch image for '%s': %s", item, e)
-            raise
 
-    return images
+def _fetch_resolved(item: str, pages: Dict[str, Optional[PageImage]]) -> Image.Image:
+    if item in pages and pages[item] is None:
+        raise RuntimeError(f"No Wikipedia page for '{item}'")
+    return fetch_wikipedia_image(item, page=pages.get(item))
+
+
+def _fetch_concurrently(
+    items: Sequence[str],
+    pages: Dict[str, Optional[PageImage]],
+    *,
+    fail_fast: bool,
+) -> List[Future]:
+    """
+    Fetch `items` on WIKI_DOWNLOAD_WORKERS threads; futures in item order.
+
+    With `fail_fast`, the first failure cancels every download that has
+    not started yet (running ones finish into the cache) and returns
+    without waiting for them.
+    """
+    workers = max(1, min(WIKI_DOWNLOAD_WORKERS, len(items)))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wiki")
+    futures = [pool.submit(_fetch_resolved, item, pages) for item in items]
+
+    if fail_fast:
+        _, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        if pending:
+            pool.shutdown(wait=False, cancel_futures=True)
+            return futures
+
+    pool.shutdown(wait=True)
+    return futures
+
+
+def fetch_images_for_items(items: list[str]) -> list[Image.Image]:
+    """
+    Images for `items`, in order. One API request resolves every uncached
+    item, then the downloads run in parallel; the first failure cancels
+    the rest and is raised.
+    """
+    if not items:
+        return []
+
+    pages = _lookup_uncached(items)
+    futures = _fetch_concurrently(items, pages, fail_fast=True)
+
+    for item, fut in zip(items, futures):
+        if fut.done() and not fut.cancelled() and fut.exception() is not None:
+            log.error("Failed to fetch image for '%s': %s", item, fut.exception())
+            raise fut.exception()
+
+    return [fut.result() for fut in futures]
+
+
+def prefetch_images(items: Iterable[str]) -> List[str]:
+    """
+    Warm the image cache for many items (e.g. a whole puzzle bank) with
+    batched lookups and parallel downloads. Returns the items that could
+    not be fetched.
+    """
+    items = list(dict.fromkeys(items))
+    # valid, fresh index entries need neither a request nor a decode
+    todo = [item for item in items if not _cache_hit(item)]
+    if not todo:
+        log.info("Prefetched images: %d/%d items cached", len(items), len(items))
+        return []
+
+    pages = _lookup_uncached(todo)
+    futures = _fetch_concurrently(todo, pages, fail_fast=False)
+
+    failed: List[str] = []
+    for item, fut in zip(todo, futures):
+        if fut.exception() is not None:
+            log.warning("Prefetch failed for '%s': %s", item, fut.exception())
+            failed.append(item)
+
+    log.info("Prefetched images: %d/%d items", len(items) - len(failed), len(items))
+    return failed
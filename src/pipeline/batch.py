@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import resource
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Set
+
+from ..media.ratelimit import get_rate_limiter
+from ..media.wiki import prefetch_images
+from ..puzzle.loader import Puzzle, load_valid_puzzles
+from ..video.draft import render_draft
+from ..video.renderer import render_job_to_mp4
+from ..video.text import get_text_sprite_cache
+from ..config.settings import OUTPUT_DIR
+from ..utils.logger import get_logger
+from .runner import MAX_PUZZLE_ATTEMPTS, build_job, load_used_ids, mark_used
+
+log = get_logger("batch")
+
+REPORT_DIR = OUTPUT_DIR / "batches"
+
+
+# =========================================================
+# RESULTS
+# =========================================================
+
+
+@dataclass
+class BatchItem:
+    puzzle_id: str
+    ok: bool
+    seconds: float
+    video: Optional[Path] = None
+    # metadata JSON, or the contact sheet for drafts
+    extra: Optional[Path] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "puzzle_id": self.puzzle_id,
+            "ok": self.ok,
+            "seconds": round(self.seconds, 2),
+            "video": str(self.video) if self.video else None,
+            "extra": str(self.extra) if self.extra else None,
+            "error": self.error,
+        }
+
+
+@dataclass
+class BatchReport:
+    draft: bool
+    items: List[BatchItem] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rendered(self) -> List[BatchItem]:
+        return [it for it in self.items if it.ok]
+
+    @property
+    def failed(self) -> List[BatchItem]:
+        return [it for it in self.items if not it.ok]
+
+    def to_dict(self) -> dict:
+        sprites = get_text_sprite_cache()
+        job_seconds = [it.seconds for it in self.rendered]
+        return {
+            "created": datetime.utcnow().isoformat(timespec="seconds"),
+            "draft": self.draft,
+            "rendered": len(self.rendered),
+            "failed": len(self.failed),
+            "total_seconds": round(self.seconds, 2),
+            "mean_seconds": (
+                round(sum(job_seconds) / len(job_seconds), 2) if job_seconds else None
+            ),
+            "text_sprite_cache": {"hits": sprites.hits, "misses": sprites.misses},
+            "wikimedia_requests": get_rate_limiter().stats.to_dict(),
+            # ru_maxrss is KiB on Linux
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "jobs": [it.to_dict() for it in self.items],
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        log.info("Batch report saved: %s", path)
+
+
+# =========================================================
+# PUZZLE SELECTION
+# =========================================================
+
+
+def puzzles_by_id(puzzle_ids: Sequence[str]) -> List[Puzzle]:
+    by_id = {p["id"]: p for p in load_valid_puzzles()}
+    unknown = [pid for pid in puzzle_ids if pid not in by_id]
+    if unknown:
+        raise ValueError(f"Unknown puzzle ids: {', '.join(unknown)}")
+    return [by_id[pid] for pid in puzzle_ids]
+
+
+def unused_puzzles(used: Set[str]) -> Iterator[Puzzle]:
+    """
+    Valid puzzles not in `used`, in file order (never recycled).
+    """
+    for p in load_valid_puzzles():
+        if p["id"] not in used:
+            yield p
+
+
+# =========================================================
+# BATCH RENDER
+# =========================================================
+
+
+def _render_one(puzzle: Puzzle, draft: bool) -> BatchItem:
+    start = time.time()
+    puzzle_id = puzzle["id"]
+    try:
+        job = build_job(puzzle)
+        if draft:
+            result = render_draft(job)
+            video, extra = result.video, result.contact_sheet
+        else:
+            video, extra = render_job_to_mp4(job)
+    except Exception as e:
+        log.warning("⚠️ Puzzle %s failed: %s", puzzle_id, e)
+        return BatchItem(puzzle_id, False, time.time() - start, error=str(e))
+
+    return BatchItem(puzzle_id, True, time.time() - start, video=video, extra=extra)
+
+
+def render_batch(
+    *,
+    puzzle_ids: Optional[Sequence[str]] = None,
+    count: Optional[int] = None,
+    draft: bool = False,
+    report_path: Optional[Path] = None,
+) -> BatchReport:
+    """
+    Render several puzzles in this process, one after another.
+
+    Either `puzzle_ids` (rendered as given) or the next `count` unused
+    puzzles, replacing failures with the next unused one until
+    MAX_PUZZLE_ATTEMPTS of them have failed. Fonts, text sprites, decoded
+    backgrounds, icons and prepared music stay warm between jobs.
+
+    Final renders mark puzzles as used (failures too, like run_once);
+    drafts leave the used list alone. A JSON summary is written to
+    `report_path` (default output/batches/batch_<stamp>.json).
+    """
+    if (puzzle_ids is None) == (count is None):
+        raise ValueError("Pass either puzzle_ids or count")
+
+    start = time.time()
+    report = BatchReport(draft=draft)
+    used = load_used_ids()
+
+    if puzzle_ids is not None:
+        queue: List[Puzzle] = puzzles_by_id(puzzle_ids)
+        target = len(puzzle_ids)
+        max_failures = target
+    else:
+        queue = list(unused_puzzles(used))
+        target = count or 0
+        max_failures = MAX_PUZZLE_ATTEMPTS
+
+    log.info("📦 Batch %s: %d puzzle(s)", "draft" if draft else "render", target)
+
+    # resolve every item's image in a few batched lookups up front
+    prefetch_images(item for p in queue[:target] for item in p["items"])
+
+    for puzzle in queue:
+        if len(report.rendered) >= target or len(report.failed) >= max_failures:
+            break
+
+        log.info(
+            "🧩 Batch job %d — %s (%d/%d rendered)",
+            len(report.items) + 1,
+            puzzle["id"],
+            len(report.rendered),
+            target,
+        )
+        item = _render_one(puzzle, draft)
+        report.items.append(item)
+
+        # explicit puzzle_ids may name puzzles that are already used
+        if not draft and puzzle["id"] not in used:
+            mark_used(puzzle["id"])
+            used.add(puzzle["id"])
+
+    if len(report.rendered) < target:
+        log.warning(
+            "Batch rendered %d/%d puzzle(s) (%d failed)",
+            len(report.rendered),
+            target,
+            len(report.failed),
+        )
+
+    report.seconds = time.time() - start
+    stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    report.write(report_path or REPORT_DIR / f"batch_{stamp}.json")
+
+    log.info(
+        "✅ Batch finished in %.1fs: %d rendered, %d failed",
+        report.seconds,
+        len(report.rendered),
+        len(report.failed),
+    )
+    return report
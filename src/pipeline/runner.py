@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import sys
 from pathlib import Path
 from typing import Set
 
 from ..puzzle.loader import select_next_puzzle, Puzzle
 from ..media.wiki import fetch_images_for_items
+from ..video.draft import DraftResult, render_draft
 from ..video.renderer import RenderJob, render_job_to_mp4
 from ..config.settings import OUTPUT_DIR
 from ..utils.logger import get_logger
@@ -36,6 +38,28 @@ def mark_used(puzzle_id: str) -> None:
         f.write(puzzle_id + "\n")
 
 
+# =========================================================
+# JOB
+# =========================================================
+
+
+def build_job(puzzle: Puzzle) -> RenderJob:
+    """
+    Fetch the puzzle's images and describe its video.
+    """
+    items: list[str] = puzzle["items"]
+    return RenderJob(
+        puzzle_id=puzzle["id"],
+        hook=puzzle["prompt"],
+        instruction=puzzle["rule"],
+        items=items,
+        images=fetch_images_for_items(items),
+        duration_seconds=20,
+        title="Can you answer it? 🤔 #shorts",
+        tags=["quiz", "brainteaser", "shorts"],
+    )
+
+
 # =========================================================
 # RUNNER
 # =========================================================
@@ -57,9 +81,6 @@ def run_once() -> tuple[Path, Path]:
         puzzle: Puzzle = select_next_puzzle(used)
 
         puzzle_id: str = puzzle["id"]
-        hook: str = puzzle["prompt"]
-        instruction: str = puzzle["rule"]
-        items: list[str] = puzzle["items"]
 
         log.info(
             "🧩 Puzzle attempt %d/%d — %s",
@@ -72,22 +93,11 @@ def run_once() -> tuple[Path, Path]:
             # -------------------------------------------------
             # IMAGE FETCH
             # -------------------------------------------------
-            images = fetch_images_for_items(items)
+            job = build_job(puzzle)
 
             # -------------------------------------------------
             # RENDER
             # -------------------------------------------------
-            job = RenderJob(
-                puzzle_id=puzzle_id,
-                hook=hook,
-                instruction=instruction,
-                items=items,
-                images=images,
-                duration_seconds=20,
-                title="Can you answer it? 🤔 #shorts",
-                tags=["quiz", "brainteaser", "shorts"],
-            )
-
             video_path, meta_path = render_job_to_mp4(job)
 
             mark_used(puzzle_id)
@@ -115,11 +125,57 @@ def run_once() -> tuple[Path, Path]:
     ) from last_error
 
 
+def run_draft() -> DraftResult:
+    """
+    Renders a low-res QA draft of the next puzzle.
+
+    Nothing is persisted: the puzzle stays unused, and puzzles whose draft
+    fails are only skipped for this call.
+    """
+
+    skipped: Set[str] = load_used_ids()
+    last_error: Exception | None = None
+
+    for attempt in range(1, MAX_PUZZLE_ATTEMPTS + 1):
+        puzzle: Puzzle = select_next_puzzle(skipped)
+        puzzle_id: str = puzzle["id"]
+
+        log.info(
+            "📝 Draft attempt %d/%d — %s",
+            attempt,
+            MAX_PUZZLE_ATTEMPTS,
+            puzzle_id,
+        )
+
+        try:
+            result = render_draft(build_job(puzzle))
+            log.info("📝 Draft for %s ready for review", puzzle_id)
+            return result
+
+        except Exception as e:
+            last_error = e
+            log.warning(
+                "⚠️ Skipping puzzle %s due to error: %s",
+                puzzle_id,
+                str(e),
+            )
+            skipped.add(puzzle_id)
+
+    raise RuntimeError(
+        f"Failed to render a draft after {MAX_PUZZLE_ATTEMPTS} puzzle attempts"
+    ) from last_error
+
+
 # =========================================================
 # CLI
 # =========================================================
 
 if __name__ == "__main__":
-    video, meta = run_once()
-    print("✅ Video created:", video)
-    print("📝 Metadata:", meta)
+    if "--draft" in sys.argv[1:]:
+        draft = run_draft()
+        print("📝 Draft created:", draft.video)
+        print("🖼️ Contact sheet:", draft.contact_sheet)
+    else:
+        video, meta = run_once()
+        print("✅ Video created:", video)
+        print("📝 Metadata:", meta)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
 
 
 def sha1(text: str) -> str:
@@ -9,3 +12,33 @@ def sha1(text: str) -> str:
 
 def sha256(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+_FILE_HASHES: Dict[Tuple[str, int, int], str] = {}
+_FILE_HASHES_LOCK = threading.Lock()
+
+
+def cached_sha256_file(path: Path) -> str:
+    """
+    sha256_file, recomputed only when the file's mtime or size changes.
+    """
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+    with _FILE_HASHES_LOCK:
+        cached = _FILE_HASHES.get(key)
+    if cached is not None:
+        return cached
+
+    digest = sha256_file(path)
+    with _FILE_HASHES_LOCK:
+        _FILE_HASHES[key] = digest
+    return digest
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
 import math
-from typing import Callable, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:  # optional: array variants + Timeline
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# whether the array helpers and Timeline are available
+HAS_NUMPY = np is not None
 
 # =========================================================
 # TYPES
@@ -195,3 +204,195 @@ def stagger_progress(
         return 1.0
 
     return (global_progress - start) / duration
+
+
+# =========================================================
+# SLIDE-IN ELEMENT
+# =========================================================
+
+
+@dataclass(frozen=True)
+class SlideIn:
+    """
+    Element that slides + fades in once, optionally staggered.
+
+    progress(t) = stagger_progress(max(0, t - start), index, stagger, duration)
+    """
+
+    final_pos: Point
+    angle_deg: float
+    start: float
+    duration: float
+    index: int = 0
+    stagger: float = 0.0
+    distance: int = 300
+
+    def progress(self, t: float) -> float:
+        gp = max(0.0, t - self.start)
+        return stagger_progress(gp, self.index, self.stagger, self.duration)
+
+    def state(self, progress: float) -> Tuple[Point, int]:
+        """
+        (position, alpha) at the given progress.
+        """
+        pos = slide_from_angle(self.final_pos, progress, self.angle_deg, self.distance)
+        return pos, fade_in(progress)
+
+
+# =========================================================
+# ARRAY VARIANTS (NUMPY)
+# =========================================================
+# Same maths as the scalar helpers above, evaluated for a whole vector of
+# timestamps in one call. Integer results truncate like int().
+
+
+def ease_out_cubic_array(t):
+    return 1 - np.power(1 - t, 3)
+
+
+def lerp_point_array(start: FloatPoint, end: FloatPoint, t, easing=None):
+    t = np.clip(t, 0.0, 1.0)
+    t = (easing or ease_out_cubic_array)(t)
+    x = start[0] + (end[0] - start[0]) * t
+    y = start[1] + (end[1] - start[1]) * t
+    return x.astype(np.int64), y.astype(np.int64)
+
+
+def slide_from_angle_array(
+    final_pos: Point,
+    progress,
+    angle_deg: float,
+    distance: int = 300,
+    easing=None,
+):
+    rad = math.radians(angle_deg)
+    dx = math.cos(rad) * distance
+    dy = math.sin(rad) * distance
+    start = (final_pos[0] + dx, final_pos[1] + dy)
+    return lerp_point_array(start, final_pos, progress, easing)
+
+
+def fade_in_array(progress):
+    p = np.clip(progress, 0.0, 1.0)
+    return (255 * ease_out_cubic_array(p)).astype(np.int64)
+
+
+def stagger_progress_array(
+    global_progress,
+    index: int,
+    stagger_delay: float,
+    duration: float,
+):
+    start = index * stagger_delay
+    end = start + duration
+    local = (global_progress - start) / duration
+    return np.where(
+        global_progress <= start,
+        0.0,
+        np.where(global_progress >= end, 1.0, local),
+    )
+
+
+def countdown_value_array(total_seconds: int, elapsed_seconds):
+    return np.maximum(0, total_seconds - elapsed_seconds.astype(np.int64))
+
+
+# =========================================================
+# TIMELINE
+# =========================================================
+
+
+@dataclass
+class Track:
+    """
+    Per-frame state of one SlideIn element.
+    """
+
+    progress: "np.ndarray"
+    x: "np.ndarray"
+    y: "np.ndarray"
+    alpha: "np.ndarray"
+
+
+class Timeline:
+    """
+    Per-frame element state for a whole video, precomputed up front.
+
+    Frame i is at t = i / fps. Renderers index into the arrays instead of
+    calling the scalar helpers per element per frame.
+    """
+
+    def __init__(self, total_frames: int, fps: int) -> None:
+        if not HAS_NUMPY:
+            raise RuntimeError("Timeline requires numpy")
+
+        self.total_frames = total_frames
+        self.fps = fps
+        self.t = np.arange(total_frames, dtype=np.float64) / fps
+
+        self.tracks: Dict[str, Track] = {}
+        self.timer = np.full(total_frames, -1, dtype=np.int64)
+        self.outro_alpha = np.full(total_frames, -1, dtype=np.int64)
+
+    # -----------------------------------------------------
+    # BUILD
+    # -----------------------------------------------------
+
+    def add_slide(self, name: str, el: SlideIn) -> Track:
+        gp = np.maximum(0.0, self.t - el.start)
+        p = stagger_progress_array(gp, el.index, el.stagger, el.duration)
+        x, y = slide_from_angle_array(el.final_pos, p, el.angle_deg, el.distance)
+        track = Track(progress=p, x=x, y=y, alpha=fade_in_array(p))
+        self.tracks[name] = track
+        return track
+
+    def set_timer(self, total_seconds: int, start: float) -> None:
+        shown = self.t >= start
+        values = countdown_value_array(total_seconds, self.t - start)
+        self.timer = np.where(shown, values, -1)
+
+    def set_outro(self, start: float, fade_seconds: float) -> None:
+        shown = self.t >= start
+        alpha = ((self.t - start) / fade_seconds * 255).astype(np.int64)
+        self.outro_alpha = np.where(shown, np.minimum(255, alpha), -1)
+
+    # -----------------------------------------------------
+    # QUERY
+    # -----------------------------------------------------
+
+    def frame_index(self, t: float) -> Optional[int]:
+        """
+        Index of the frame at t, or None if t is not on the frame grid.
+        """
+        i = round(t * self.fps)
+        if 0 <= i < self.total_frames and self.t[i] == t:
+            return i
+        return None
+
+    def visual_key(self, i: int) -> tuple:
+        """
+        Hashable summary of everything that affects frame i's pixels.
+        """
+        outro = int(self.outro_alpha[i])
+        if outro >= 0:
+            return ("outro", outro)
+
+        layers = tuple(
+            (int(tr.x[i]), int(tr.y[i]), int(tr.alpha[i]))
+            if tr.progress[i] > 0
+            else None
+            for tr in self.tracks.values()
+        )
+        return ("main", layers, int(self.timer[i]))
+
+    def changed(self) -> List[bool]:
+        """
+        changed[i] is False when frame i looks exactly like frame i - 1.
+        """
+        out: List[bool] = []
+        prev = None
+        for i in range(self.total_frames):
+            key = self.visual_key(i)
+            out.append(key != prev)
+            prev = key
+        return out
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from ..config.settings import (
+    ASSETS_DIR,
+    FRAME_CACHE_DIR,
+    VIDEO_WIDTH,
+    VIDEO_HEIGHT,
+)
+from ..utils.hashing import sha1
+from ..utils.logger import get_logger
+
+log = get_logger("assets")
+
+# =========================================================
+# TYPES
+# =========================================================
+
+Size = Tuple[int, int]
+FileKey = Tuple[str, int, int]  # (path, mtime_ns, size)
+
+BACKGROUND_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+MUSIC_EXTS = (".mp3", ".wav", ".m4a", ".aac")
+ICON_NAMES = ("like", "comment", "subscribe")
+
+BACKGROUND_CACHE_DIR = FRAME_CACHE_DIR / "backgrounds"
+BACKGROUND_MEMORY_CACHE = 4  # decoded 1080x1920 frames kept in RAM
+FALLBACK_BACKGROUND = (10, 10, 14)
+
+
+def _file_key(path: Path) -> FileKey:
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+# =========================================================
+# DIRECTORY LISTING (MTIME-INVALIDATED)
+# =========================================================
+
+
+@dataclass
+class _Listing:
+    files: List[Path]
+    dir_mtimes: Dict[Path, int]
+
+    def is_fresh(self) -> bool:
+        # adding/removing a file (or subdirectory) bumps its parent's mtime
+        for d, mtime in self.dir_mtimes.items():
+            try:
+                if d.stat().st_mtime_ns != mtime:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+
+def _scan(root: Path, exts: Tuple[str, ...]) -> _Listing:
+    files: List[Path] = []
+    dir_mtimes: Dict[Path, int] = {}
+
+    if not root.exists():
+        # watch the nearest existing parent so creating the dir is noticed
+        parent = root.parent
+        if parent.exists():
+            dir_mtimes[parent] = parent.stat().st_mtime_ns
+        return _Listing(files=files, dir_mtimes=dir_mtimes)
+
+    for dirpath, _, filenames in os.walk(root):
+        d = Path(dirpath)
+        dir_mtimes[d] = d.stat().st_mtime_ns
+        files.extend(d / f for f in filenames if Path(f).suffix.lower() in exts)
+
+    files.sort()
+    return _Listing(files=files, dir_mtimes=dir_mtimes)
+
+
+# =========================================================
+# CATALOG
+# =========================================================
+
+
+class AssetCatalog:
+    """
+    Process-wide index of backgrounds, music, logo and icons.
+
+    Directory listings are rescanned only when a directory mtime changes.
+    Backgrounds are decoded and resized to the video size once, then kept
+    as raw RGB files under FRAME_CACHE_DIR so later jobs (and processes)
+    skip decoding entirely; files whose background was edited or removed
+    are pruned. Logo and icons are loaded once and shared; callers must
+    treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        assets_dir: Path = ASSETS_DIR,
+        cache_dir: Path = BACKGROUND_CACHE_DIR,
+        size: Size = (VIDEO_WIDTH, VIDEO_HEIGHT),
+    ) -> None:
+        self.assets_dir = assets_dir
+        self.cache_dir = cache_dir
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._listings: Dict[Path, _Listing] = {}
+        self._images: Dict[FileKey, Image.Image] = {}
+        self._backgrounds: "OrderedDict[FileKey, Image.Image]" = OrderedDict()
+
+    # -----------------------------------------------------
+    # LISTINGS
+    # -----------------------------------------------------
+
+    def _files(
+        self,
+        subdir: str,
+        exts: Tuple[str, ...],
+        on_rescan: Optional[Callable[[List[Path]], None]] = None,
+    ) -> List[Path]:
+        root = self.assets_dir / subdir
+        rescanned = False
+        with self._lock:
+            listing = self._listings.get(root)
+            if listing is None or not listing.is_fresh():
+                listing = _scan(root, exts)
+                self._listings[root] = listing
+                rescanned = True
+                log.debug("Indexed %d files in %s", len(listing.files), root)
+
+        if rescanned and on_rescan is not None:
+            on_rescan(listing.files)
+        return listing.files
+
+    def backgrounds(self) -> List[Path]:
+        return self._files("backgrounds", BACKGROUND_EXTS, self._prune_raw)
+
+    def music(self) -> List[Path]:
+        return self._files("music", MUSIC_EXTS)
+
+    # -----------------------------------------------------
+    # BACKGROUNDS (PRE-RESIZED RAW CACHE)
+    # -----------------------------------------------------
+
+    def _raw_path(self, key: FileKey) -> Path:
+        w, h = self.size
+        return self.cache_dir / f"{sha1('|'.join(map(str, key)))[:16]}_{w}x{h}.rgb"
+
+    def background(self, path: Path) -> Image.Image:
+        """
+        `path` decoded + resized to the video size (shared, read-only).
+        """
+        key = _file_key(path)
+
+        with self._lock:
+            cached = self._backgrounds.get(key)
+            if cached is not None:
+                self._backgrounds.move_to_end(key)
+                return cached
+
+        raw = self._raw_path(key)
+        if raw.exists() and raw.stat().st_size == self.size[0] * self.size[1] * 3:
+            img = Image.frombytes("RGB", self.size, raw.read_bytes())
+        else:
+            with Image.open(path) as src:
+                img = src.convert("RGB").resize(self.size)
+            self._write_raw(raw, img)
+            # a new key may mean the background was edited in place
+            self._prune_raw([path, *self.backgrounds()])
+
+        with self._lock:
+            self._backgrounds[key] = img
+            while len(self._backgrounds) > BACKGROUND_MEMORY_CACHE:
+                self._backgrounds.popitem(last=False)
+        return img
+
+    def _write_raw(self, raw: Path, img: Image.Image) -> None:
+        try:
+            raw.parent.mkdir(parents=True, exist_ok=True)
+            tmp = raw.with_name(f"{raw.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(img.tobytes())
+            tmp.replace(raw)
+        except OSError as e:
+            log.warning("Could not cache background %s: %s", raw.name, e)
+
+    def _prune_raw(self, backgrounds: List[Path]) -> None:
+        """
+        Delete cached files at this size that no current background maps
+        to (the source was edited, renamed or removed).
+        """
+        current = set()
+        for path in backgrounds:
+            try:
+                current.add(self._raw_path(_file_key(path)).name)
+            except OSError:
+                continue
+
+        w, h = self.size
+        stale = [
+            f for f in self.cache_dir.glob(f"*_{w}x{h}.rgb") if f.name not in current
+        ]
+        for f in stale:
+            f.unlink(missing_ok=True)
+        if stale:
+            log.info("Pruned %d stale background(s) from cache", len(stale))
+
+    def choose_background(self, rng: Optional[random.Random] = None) -> Optional[Path]:
+        candidates = self.backgrounds()
+        if not candidates:
+            log.warning("No background images found, using fallback color")
+            return None
+
+        chosen = (rng or random).choice(candidates)
+        log.info("Background selected: %s", chosen.name)
+        return chosen
+
+    def load_background(self, path: Optional[Path]) -> Image.Image:
+        if path is None:
+            return Image.new("RGB", self.size, FALLBACK_BACKGROUND)
+        return self.background(path)
+
+    def random_background(self, rng: Optional[random.Random] = None) -> Image.Image:
+        return self.load_background(self.choose_background(rng))
+
+    def random_music(self, rng: Optional[random.Random] = None) -> Optional[Path]:
+        candidates = self.music()
+        if not candidates:
+            log.info("No background music found")
+            return None
+
+        chosen = (rng or random).choice(candidates)
+        log.info("Music selected: %s", chosen.name)
+        return chosen
+
+    # -----------------------------------------------------
+    # LOGO / ICONS (SHARED)
+    # -----------------------------------------------------
+
+    def _rgba(self, path: Path) -> Optional[Image.Image]:
+        if not path.exists():
+            return None
+
+        key = _file_key(path)
+        with self._lock:
+            cached = self._images.get(key)
+        if cached is not None:
+            return cached
+
+        with Image.open(path) as src:
+            img = src.convert("RGBA")
+        with self._lock:
+            self._images[key] = img
+        return img
+
+    def logo_path(self) -> Path:
+        return self.assets_dir / "logo.png"
+
+    def icon_paths(self) -> Dict[str, Path]:
+        return {name: self.assets_dir / "icons" / f"{name}.png" for name in ICON_NAMES}
+
+    def logo(self) -> Optional[Image.Image]:
+        return self._rgba(self.logo_path())
+
+    def icons(self) -> Dict[str, Image.Image]:
+        icons = {}
+        for name, path in self.icon_paths().items():
+            img = self._rgba(path)
+            if img is not None:
+                icons[name] = img
+        return icons
+
+
+_CATALOG: Optional[AssetCatalog] = None
+
+
+def get_asset_catalog() -> AssetCatalog:
+    global _CATALOG
+    if _CATALOG is None:
+        _CATALOG = AssetCatalog()
+    return _CATALOG
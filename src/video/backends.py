@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Protocol, Tuple
+
+from PIL import Image
+
+from .ffmpeg import FrameBytes
+from .scene import PreparedTile
+from .text import TextSprite
+
+try:  # optional: only needed for COMPOSITOR_BACKEND=numpy
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# =========================================================
+# TYPES
+# =========================================================
+
+Frame = Image.Image
+Point = Tuple[int, int]
+Size = Tuple[int, int]
+
+BACKENDS = ("pil", "numpy")
+
+
+class Canvas(Protocol):
+    """
+    One frame being composited on top of a base layer.
+    """
+
+    def paste_tile(self, tile: PreparedTile, pos: Point, alpha: int) -> None: ...
+
+    def paste_text(self, sprite: TextSprite, pos: Point, alpha: int) -> None: ...
+
+    def frame(self) -> Frame: ...
+
+    def buffer(self) -> FrameBytes: ...
+
+
+# =========================================================
+# PIL
+# =========================================================
+
+
+class PilCanvas:
+    def __init__(self, image: Image.Image) -> None:
+        self.image = image
+
+    def paste_tile(self, tile: PreparedTile, pos: Point, alpha: int) -> None:
+        img = tile.with_alpha(alpha)
+        self.image.paste(img, pos, img)
+
+    def paste_text(self, sprite: TextSprite, pos: Point, alpha: int) -> None:
+        img = sprite.with_alpha(alpha)
+        self.image.paste(img, pos, img)
+
+    def frame(self) -> Frame:
+        return self.image
+
+    def buffer(self) -> FrameBytes:
+        return self.image.tobytes()
+
+
+class PilBackend:
+    name = "pil"
+
+    def begin(self, base: Image.Image) -> PilCanvas:
+        return PilCanvas(base.copy())
+
+
+# =========================================================
+# NUMPY
+# =========================================================
+
+SOURCE_CACHE_SIZE = 64
+
+
+class NumpyBackend:
+    """
+    Canvas held as one preallocated HxWx3 uint8 array, reused every frame.
+
+    Sources (tiles, text sprites) are converted once to premultiplied
+    float32 color + coverage and blended into slices of the canvas.
+    `buffer()` hands the canvas to the frame sink without copying, so it is
+    only valid until the next `begin()`.
+    """
+
+    name = "numpy"
+
+    def __init__(self, size: Size) -> None:
+        if np is None:
+            raise RuntimeError("COMPOSITOR_BACKEND=numpy requires numpy")
+
+        w, h = size
+        self.size = size
+        self.array = np.empty((h, w, 3), dtype=np.uint8)
+
+        self._base_ref: Image.Image | None = None
+        self._base_array = None
+        # (id(image), uniform) → (image, premultiplied rgb, coverage);
+        # the image is held so its id cannot be reused while cached
+        self._sources: "OrderedDict[tuple[int, bool], tuple]" = OrderedDict()
+
+    # -----------------------------------------------------
+    # FRAME LIFECYCLE
+    # -----------------------------------------------------
+
+    def begin(self, base: Image.Image) -> "NumpyBackend":
+        if base is not self._base_ref:
+            self._base_ref = base
+            self._base_array = np.asarray(base.convert("RGB"))
+        np.copyto(self.array, self._base_array)
+        return self
+
+    def frame(self) -> Frame:
+        return Image.frombytes("RGB", self.size, self.array.tobytes())
+
+    def buffer(self) -> FrameBytes:
+        return memoryview(self.array).cast("B")
+
+    # -----------------------------------------------------
+    # BLENDING
+    # -----------------------------------------------------
+
+    def paste_tile(self, tile: PreparedTile, pos: Point, alpha: int) -> None:
+        # PreparedTile.with_alpha replaces alpha outright, so tiles blend
+        # with uniform coverage regardless of the source alpha channel
+        self._blend(tile.rgba, pos, alpha, uniform=True)
+
+    def paste_text(self, sprite: TextSprite, pos: Point, alpha: int) -> None:
+        self._blend(sprite.image, pos, alpha)
+
+    def _source(self, img: Image.Image, uniform: bool):
+        key = (id(img), uniform)
+        entry = self._sources.get(key)
+        if entry is not None and entry[0] is img:
+            self._sources.move_to_end(key)
+            return entry[1], entry[2]
+
+        rgba = np.asarray(img.convert("RGBA"), dtype=np.float32)
+        if uniform:
+            coverage = np.ones(rgba.shape[:2] + (1,), dtype=np.float32)
+        else:
+            coverage = rgba[..., 3:4] / 255.0
+        premul = rgba[..., :3] * coverage
+
+        self._sources[key] = (img, premul, coverage)
+        while len(self._sources) > SOURCE_CACHE_SIZE:
+            self._sources.popitem(last=False)
+        return premul, coverage
+
+    def _blend(
+        self, img: Image.Image, pos: Point, alpha: int, uniform: bool = False
+    ) -> None:
+        if alpha <= 0:
+            return
+
+        premul, coverage = self._source(img, uniform)
+        sh, sw = coverage.shape[:2]
+        ch, cw = self.array.shape[:2]
+
+        # clip source rect to the canvas (slides start off-screen)
+        x0, y0 = int(pos[0]), int(pos[1])
+        dx0, dy0 = max(0, x0), max(0, y0)
+        dx1, dy1 = min(cw, x0 + sw), min(ch, y0 + sh)
+        if dx0 >= dx1 or dy0 >= dy1:
+            return
+
+        sx0, sy0 = dx0 - x0, dy0 - y0
+        sx1, sy1 = sx0 + (dx1 - dx0), sy0 + (dy1 - dy0)
+
+        scale = alpha / 255.0
+        src = premul[sy0:sy1, sx0:sx1]
+        a = coverage[sy0:sy1, sx0:sx1]
+        if scale < 1.0:
+            src = src * scale
+            a = a * scale
+
+        dst = self.array[dy0:dy1, dx0:dx1]
+        out = src + dst * (1.0 - a)
+        np.copyto(dst, np.rint(out), casting="unsafe")
+
+
+# =========================================================
+# FACTORY
+# =========================================================
+
+
+def make_backend(name: str, size: Size):
+    name = name.lower()
+    if name == "pil":
+        return PilBackend()
+    if name == "numpy":
+        return NumpyBackend(size)
+    raise ValueError(f"Unknown compositor backend '{name}' (expected {BACKENDS})")
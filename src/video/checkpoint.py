@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from PIL import Image
+
+from .ffmpeg import (
+    FFmpegPipeWriter,
+    FrameBytes,
+    Rendition,
+    rendition_path,
+    segment_args,
+)
+from .segments import Segment, concat_renditions
+from .sinks import FrameSink
+from ..config.settings import VIDEO_WIDTH, VIDEO_HEIGHT
+from ..utils.logger import get_logger
+
+log = get_logger("checkpoint")
+
+MANIFEST_NAME = "checkpoint.json"
+ORPHAN_MIN_AGE_SECONDS = 3600  # legacy temp dirs without a manifest
+
+MODE_CHUNKS = "chunks"
+MODE_PNG = "png"
+
+
+def chunk_path(mode_dir: Path, index: int) -> Path:
+    return mode_dir / f"chunk_{index:04d}.mp4"
+
+
+def png_path(mode_dir: Path, index: int) -> Path:
+    return mode_dir / f"frame_{index:05d}.png"
+
+
+# =========================================================
+# MANIFEST
+# =========================================================
+
+
+@dataclass
+class RenderCheckpoint:
+    """
+    Progress of one job's render, persisted in <temp_dir>/checkpoint.json.
+
+    `frames_done` only counts frames that are durably on disk: closed
+    chunk segments (`chunks` holds their frame counts) or atomically
+    renamed PNGs. A restarted render of the same fingerprint resumes
+    from there; anything else in the directory is discarded.
+    """
+
+    dir: Path
+    fingerprint: str
+    total_frames: int
+    mode: str = ""
+    frames_done: int = 0
+    chunks: List[int] = field(default_factory=list)
+
+    @property
+    def manifest(self) -> Path:
+        return self.dir / MANIFEST_NAME
+
+    @property
+    def mode_dir(self) -> Path:
+        return self.dir / self.mode
+
+    @classmethod
+    def open(cls, dir: Path, fingerprint: str, total_frames: int) -> "RenderCheckpoint":
+        cp = cls(dir=dir, fingerprint=fingerprint, total_frames=total_frames)
+        data = _read_manifest(dir)
+
+        if (
+            data is not None
+            and data.get("fingerprint") == fingerprint
+            and data.get("total_frames") == total_frames
+        ):
+            cp.mode = str(data.get("mode", ""))
+            cp.frames_done = int(data.get("frames_done", 0))
+            cp.chunks = [int(n) for n in data.get("chunks", [])]
+        elif dir.exists():
+            shutil.rmtree(dir, ignore_errors=True)
+
+        dir.mkdir(parents=True, exist_ok=True)
+        cp.save()
+        return cp
+
+    def save(self) -> None:
+        data = {
+            "fingerprint": self.fingerprint,
+            "total_frames": self.total_frames,
+            "mode": self.mode,
+            "frames_done": self.frames_done,
+            "chunks": self.chunks,
+            "pid": os.getpid(),
+            "updated": time.time(),
+        }
+        tmp = self.manifest.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(self.manifest)
+
+    # -----------------------------------------------------
+    # RESUME
+    # -----------------------------------------------------
+
+    def begin(
+        self,
+        mode: str,
+        renditions: Sequence[Rendition] = (),
+        stop: Optional[int] = None,
+    ) -> int:
+        """
+        Switch to `mode` and return the first frame still to render.
+
+        `stop` is where rendered frames end this time (e.g. the start of
+        a cached outro); chunks reaching past it, left by a run that
+        rendered the outro inline, are dropped.
+        """
+        if mode != self.mode:
+            if self.mode:
+                shutil.rmtree(self.mode_dir, ignore_errors=True)
+            self.mode = mode
+            self.frames_done = 0
+            self.chunks = []
+        else:
+            self._verify(renditions)
+            if stop is not None:
+                self._truncate(stop, renditions)
+
+        self.mode_dir.mkdir(parents=True, exist_ok=True)
+        self.save()
+
+        if self.frames_done:
+            log.info(
+                "Resuming %s render at frame %d/%d",
+                mode,
+                self.frames_done,
+                self.total_frames,
+            )
+        return self.frames_done
+
+    def _verify(self, renditions: Sequence[Rendition] = ()) -> None:
+        if self.mode == MODE_CHUNKS:
+            good: List[int] = []
+            for i, frames in enumerate(self.chunks):
+                p = chunk_path(self.mode_dir, i)
+                paths = [p, *(rendition_path(p, r) for r in renditions)]
+                if not all(q.exists() and q.stat().st_size for q in paths):
+                    break
+                good.append(frames)
+            self.chunks = good
+            self.frames_done = sum(good)
+
+        elif self.mode == MODE_PNG:
+            n = 0
+            while n < self.frames_done and png_path(self.mode_dir, n).exists():
+                n += 1
+            # the newest frame is the one a crash could have damaged
+            if n and not _png_ok(png_path(self.mode_dir, n - 1)):
+                n -= 1
+            self.frames_done = n
+
+    def _truncate(self, stop: int, renditions: Sequence[Rendition] = ()) -> None:
+        if self.mode != MODE_CHUNKS or self.frames_done <= stop:
+            return
+        keep: List[int] = []
+        for frames in self.chunks:
+            if sum(keep) + frames > stop:
+                break
+            keep.append(frames)
+        for i in range(len(keep), len(self.chunks)):
+            p = chunk_path(self.mode_dir, i)
+            for q in (p, *(rendition_path(p, r) for r in renditions)):
+                q.unlink(missing_ok=True)
+        log.info(
+            "Checkpoint covers frames past %d, keeping %d/%d chunks",
+            stop,
+            len(keep),
+            len(self.chunks),
+        )
+        self.chunks = keep
+        self.frames_done = sum(keep)
+
+    # -----------------------------------------------------
+    # PROGRESS
+    # -----------------------------------------------------
+
+    def add_chunk(self, frames: int) -> None:
+        self.chunks.append(frames)
+        self.frames_done += frames
+        self.save()
+
+    def advance(self, frames_done: int) -> None:
+        self.frames_done = frames_done
+        self.save()
+
+    def remove(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def _read_manifest(dir: Path) -> Optional[dict]:
+    try:
+        return json.loads((dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _png_ok(path: Path) -> bool:
+    try:
+        with Image.open(path) as img:
+            img.verify()
+        return True
+    except Exception:
+        return False
+
+
+# =========================================================
+# ORPHAN CLEANUP
+# =========================================================
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_orphans(root: Path, keep: Path) -> None:
+    """
+    Remove temp dirs left behind by other jobs' crashed renders.
+
+    Dirs whose manifest names a live process (another render in flight)
+    are left alone, as are recent dirs without a manifest.
+    """
+    if not root.exists():
+        return
+
+    for d in root.iterdir():
+        if not d.is_dir() or d == keep:
+            continue
+
+        data = _read_manifest(d)
+        if data is not None:
+            pid = int(data.get("pid", 0))
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+        else:
+            try:
+                if time.time() - d.stat().st_mtime < ORPHAN_MIN_AGE_SECONDS:
+                    continue
+            except OSError:
+                continue
+
+        log.info("Removing orphaned render dir: %s", d.name)
+        shutil.rmtree(d, ignore_errors=True)
+
+
+# =========================================================
+# CHECKPOINTED SINKS
+# =========================================================
+
+
+class ChunkedFrameSink:
+    """
+    Streams frames into fixed-length segments, checkpointing after each.
+
+    Every chunk is a complete mp4 encoded with shared parameters, so
+    close() joins them (plus music) with a stream copy. abort() only
+    drops the chunk in progress; finished chunks survive for a resume.
+
+    A `tail` segment (e.g. the cached outro) covers the last frames of
+    the video and is appended as is.
+    """
+
+    def __init__(
+        self,
+        checkpoint: RenderCheckpoint,
+        out_mp4: Path,
+        *,
+        fps: int,
+        chunk_frames: int,
+        width: int = VIDEO_WIDTH,
+        height: int = VIDEO_HEIGHT,
+        crf: int = 20,
+        preset: str = "medium",
+        music_file: Optional[Path] = None,
+        renditions: Sequence[Rendition] = (),
+        tail: Optional[Segment] = None,
+    ) -> None:
+        self.checkpoint = checkpoint
+        self.out_mp4 = out_mp4
+        self.fps = fps
+        self.chunk_frames = max(1, chunk_frames)
+        self.width = width
+        self.height = height
+        self.crf = crf
+        self.preset = preset
+        self.music_file = music_file
+        self.renditions = tuple(renditions)
+        self.tail = tail
+
+        self._writer: Optional[FFmpegPipeWriter] = None
+
+    def write(self, frame: FrameBytes) -> None:
+        if self._writer is None:
+            self._writer = FFmpegPipeWriter(
+                chunk_path(self.checkpoint.mode_dir, len(self.checkpoint.chunks)),
+                fps=self.fps,
+                width=self.width,
+                height=self.height,
+                crf=self.crf,
+                preset=self.preset,
+                extra_args=segment_args(self.fps),
+                renditions=self.renditions,
+            ).open()
+
+        self._writer.write(frame)
+        if self._writer.frames_written >= self.chunk_frames:
+            self._finish_chunk()
+
+    def _finish_chunk(self) -> None:
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        writer.close()
+        self.checkpoint.add_chunk(writer.frames_written)
+
+    def close(self) -> None:
+        self._finish_chunk()
+
+        cp = self.checkpoint
+        tail_frames = self.tail.frames if self.tail is not None else 0
+        if cp.frames_done + tail_frames != cp.total_frames:
+            raise RuntimeError(
+                f"Chunked render incomplete: {cp.frames_done}/{cp.total_frames} frames"
+            )
+
+        segments = [
+            Segment(path=chunk_path(cp.mode_dir, i), frames=n, static=False)
+            for i, n in enumerate(cp.chunks)
+        ]
+        if self.tail is not None:
+            segments.append(self.tail)
+        log.info("Joining %d checkpoint chunks", len(segments))
+        concat_renditions(
+            segments,
+            self.out_mp4,
+            self.renditions,
+            music_file=self.music_file,
+            duration_seconds=cp.total_frames / self.fps,
+        )
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+
+
+class CheckpointedSink:
+    """
+    Wraps a sink whose writes are durable on return (e.g. PNG frames) and
+    records progress every `every` frames.
+    """
+
+    def __init__(
+        self,
+        inner: FrameSink,
+        checkpoint: RenderCheckpoint,
+        *,
+        start: int,
+        every: int,
+    ) -> None:
+        self.inner = inner
+        self.checkpoint = checkpoint
+        self.index = start
+        self.every = max(1, every)
+
+    def write(self, frame: FrameBytes) -> None:
+        self.inner.write(frame)
+        self.index += 1
+        if self.index % self.every == 0:
+            self.checkpoint.advance(self.index)
+
+    def close(self) -> None:
+        self.inner.close()
+        self.checkpoint.advance(self.index)
+
+    def abort(self) -> None:
+        self.inner.abort()
+        self.checkpoint.advance(self.index)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from typing import List, Tuple
-
-from PIL import Image, ImageDraw, ImageFont
-
-from .animations import (
-    slide_from_angle,
-    fade_in,
-    stagger_progress,
-    countdown_text,
-)
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image, ImageFont
+
+from .animations import HAS_NUMPY, SlideIn, Timeline, countdown_text
+from .assets import get_asset_catalog
+from .backends import Canvas, FrameBytes, PilCanvas, make_backend
+from .profiling import NULL_PROFILER
+from .scene import PreparedScene
+from .text import text_sprite
 from ..config.settings import (
     VIDEO_WIDTH,
     VIDEO_HEIGHT,
@@ -19,7 +22,7 @@ from ..config.settings import (
     IMAGE_STAGGER_DELAY,
     FONT_PRIMARY,
     FONT_SECONDARY,
-    ASSETS_DIR,
+    COMPOSITOR_BACKEND,
 )
 
 # =========================================================
@@ -29,6 +32,13 @@ from ..config.settings import (
 Frame = Image.Image
 Point = Tuple[int, int]
 
+# (name, element timing, draw(canvas, pos, alpha))
+Layer = Tuple[str, SlideIn, Callable[[Canvas, Point, int], None]]
+
+# per layer (progress, pos, alpha); timer text; outro alpha (None = main scene)
+LayerState = Tuple[float, Point, int]
+FrameState = Tuple[List[LayerState], Optional[str], Optional[int]]
+
 # =========================================================
 # LAYOUT CONSTANTS
 # =========================================================
@@ -40,20 +50,105 @@ GRID_GAP = 20
 
 TIMER_POS = (VIDEO_WIDTH - 160, 60)
 IMAGE_SIZE = (420, 420)
+SLIDE_DISTANCE = 300
+
+LOGO_POS = (VIDEO_WIDTH - 140, 30)
+LOGO_SIZE = (120, 120)
+ICON_SIZE = (80, 80)
+ICON_SPACING = 200
+ICON_LABEL_OFFSET = 70
 
 OUTRO_SECONDS = 3
+OUTRO_FADE_SECONDS = 0.6
 
 # =========================================================
 # FONT LOADING
 # =========================================================
 
-FONT_HOOK = ImageFont.truetype(str(FONT_PRIMARY), 78)
-FONT_INSTRUCTION = ImageFont.truetype(str(FONT_SECONDARY), 52)
-FONT_TIMER = ImageFont.truetype(str(FONT_PRIMARY), 54)
 
-FONT_OUTRO_TITLE = ImageFont.truetype(str(FONT_PRIMARY), 72)
-FONT_OUTRO_TEXT = ImageFont.truetype(str(FONT_PRIMARY), 46)  # BOLD for red text
-FONT_ICON_LABEL = ImageFont.truetype(str(FONT_SECONDARY), 34)
+@lru_cache(maxsize=None)
+def load_font(path: Path, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(str(path), size)
+
+
+FONT_HOOK = load_font(FONT_PRIMARY, 78)
+FONT_INSTRUCTION = load_font(FONT_SECONDARY, 52)
+FONT_TIMER = load_font(FONT_PRIMARY, 54)
+
+FONT_OUTRO_TITLE = load_font(FONT_PRIMARY, 72)
+FONT_OUTRO_TEXT = load_font(FONT_PRIMARY, 46)  # BOLD for red text
+FONT_ICON_LABEL = load_font(FONT_SECONDARY, 34)
+
+# =========================================================
+# SCALED LAYOUT
+# =========================================================
+
+
+@dataclass(frozen=True)
+class Layout:
+    """
+    Layout constants + fonts at one output scale (1.0 = full resolution).
+
+    Draft renders use the same timeline at a fraction of the pixels; every
+    position, size and font is derived from the constants above.
+    """
+
+    scale: float
+    size: Point
+    top_y: int
+    instruction_y: int
+    grid_top_y: int
+    grid_gap: int
+    timer_pos: Point
+    image_size: Point
+    slide_distance: int
+    logo_pos: Point
+    logo_size: Point
+    icon_size: Point
+    icon_spacing: int
+    icon_label_offset: int
+    font_hook: ImageFont.FreeTypeFont
+    font_instruction: ImageFont.FreeTypeFont
+    font_timer: ImageFont.FreeTypeFont
+    font_outro_title: ImageFont.FreeTypeFont
+    font_outro_text: ImageFont.FreeTypeFont
+    font_icon_label: ImageFont.FreeTypeFont
+
+    @classmethod
+    def at(cls, scale: float = 1.0) -> "Layout":
+        def px(v: float) -> int:
+            return max(1, int(round(v * scale)))
+
+        def even(v: float) -> int:
+            # x264 needs even frame dimensions
+            return max(2, 2 * int(round(v * scale / 2)))
+
+        def font(base: ImageFont.FreeTypeFont) -> ImageFont.FreeTypeFont:
+            return load_font(Path(base.path), px(base.size))
+
+        width, height = even(VIDEO_WIDTH), even(VIDEO_HEIGHT)
+        return cls(
+            scale=scale,
+            size=(width, height),
+            top_y=px(TOP_Y),
+            instruction_y=px(INSTRUCTION_Y),
+            grid_top_y=px(GRID_TOP_Y),
+            grid_gap=px(GRID_GAP),
+            timer_pos=(width - px(VIDEO_WIDTH - TIMER_POS[0]), px(TIMER_POS[1])),
+            image_size=(px(IMAGE_SIZE[0]), px(IMAGE_SIZE[1])),
+            slide_distance=px(SLIDE_DISTANCE),
+            logo_pos=(width - px(VIDEO_WIDTH - LOGO_POS[0]), px(LOGO_POS[1])),
+            logo_size=(px(LOGO_SIZE[0]), px(LOGO_SIZE[1])),
+            icon_size=(px(ICON_SIZE[0]), px(ICON_SIZE[1])),
+            icon_spacing=px(ICON_SPACING),
+            icon_label_offset=px(ICON_LABEL_OFFSET),
+            font_hook=font(FONT_HOOK),
+            font_instruction=font(FONT_INSTRUCTION),
+            font_timer=font(FONT_TIMER),
+            font_outro_title=font(FONT_OUTRO_TITLE),
+            font_outro_text=font(FONT_OUTRO_TEXT),
+            font_icon_label=font(FONT_ICON_LABEL),
+        )
 
 # =========================================================
 # CORE COMPOSITOR
@@ -68,6 +163,10 @@ class QuizCompositor:
         images: List[Image.Image],
         duration_seconds: int,
         background: Image.Image,
+        backend: Optional[str] = None,
+        profiler=NULL_PROFILER,
+        scale: float = 1.0,
+        fps: int = FPS,
     ) -> None:
         if len(images) != 4:
             raise ValueError("Exactly 4 images are required")
@@ -76,9 +175,28 @@ class QuizCompositor:
         self.instruction_text = instruction_text
         self.images = images
         self.duration_seconds = duration_seconds
-        self.background = background.resize((VIDEO_WIDTH, VIDEO_HEIGHT))
 
-        self.total_frames = duration_seconds * FPS
+        # scale/fps only change pixels and sampling, never the timeline
+        self.layout = lo = Layout.at(scale)
+        self.width, self.height = lo.size
+        self.fps = fps
+        self.total_frames = duration_seconds * fps
+
+        # decode + resample everything once; frames only paste
+        catalog = get_asset_catalog()
+        self.scene = PreparedScene.build(
+            background=background,
+            images=images,
+            tile_size=lo.image_size,
+            size=lo.size,
+            logo=catalog.logo(),
+            logo_size=lo.logo_size,
+            icons=catalog.icons(),
+            icon_size=lo.icon_size,
+        )
+        self.background = self.scene.background
+        self.backend = make_backend(backend or COMPOSITOR_BACKEND, lo.size)
+        self.profiler = profiler
 
         # animation timing
         self.hook_start = 0.0
@@ -89,98 +207,316 @@ class QuizCompositor:
         )
         self.outro_start = duration_seconds - OUTRO_SECONDS
 
-        # assets
-        self.logo = None
-        logo_path = ASSETS_DIR / "logo.png"
-        if logo_path.exists():
-            self.logo = Image.open(logo_path).convert("RGBA")
+        # grid layout
+        (tile_w, tile_h), gap, top = lo.image_size, lo.grid_gap, lo.grid_top_y
+        start_x = (self.width - (tile_w * 2 + gap)) // 2
+        self.grid_positions: List[Point] = [
+            (start_x, top),
+            (start_x + tile_w + gap, top),
+            (start_x, top + tile_h + gap),
+            (start_x + tile_w + gap, top + tile_h + gap),
+        ]
 
-        self.icons = {}
-        for name in ("like", "comment", "subscribe"):
-            p = ASSETS_DIR / "icons" / f"{name}.png"
-            if p.exists():
-                self.icons[name] = Image.open(p).convert("RGBA")
+        # layers in draw order (the timer is always drawn last, on top)
+        cx = self.width // 2
+        self.layers: List[Layer] = [
+            (
+                "hook",
+                SlideIn(
+                    (cx, lo.top_y),
+                    270,
+                    self.hook_start,
+                    ENTRY_ANIMATION_DURATION,
+                    distance=lo.slide_distance,
+                ),
+                self._draw_hook,
+            ),
+            (
+                "instruction",
+                SlideIn(
+                    (cx, lo.instruction_y),
+                    0,
+                    self.instruction_start,
+                    ENTRY_ANIMATION_DURATION,
+                    distance=lo.slide_distance,
+                ),
+                self._draw_instruction,
+            ),
+        ]
+        for i, pos in enumerate(self.grid_positions):
+            self.layers.append(
+                (
+                    f"tile_{i}",
+                    SlideIn(
+                        pos,
+                        180,
+                        self.grid_start,
+                        ENTRY_ANIMATION_DURATION,
+                        index=i,
+                        stagger=IMAGE_STAGGER_DELAY,
+                        distance=lo.slide_distance,
+                    ),
+                    partial(self._draw_tile, i),
+                )
+            )
+
+        # profiler phase per layer (all tiles report as "grid")
+        self._layer_phases = [
+            "grid" if name.startswith("tile_") else name for name, _, _ in self.layers
+        ]
+
+        # whole-video state arrays (scalar fallback without numpy)
+        self.timeline: Optional[Timeline] = None
+        if HAS_NUMPY:
+            self.timeline = self._build_timeline()
+
+        # baked base layer: background + the first N settled layers
+        self._baked_count = 0
+        self._baked: Image.Image = self.background
+        self._outro_settled: Optional[Frame] = None
 
     # =====================================================
     # FRAME LOOP
     # =====================================================
 
     def render_frames(self) -> List[Frame]:
-        return [self._render_frame(i / FPS) for i in range(self.total_frames)]
+        return [self._render_frame(i / self.fps) for i in range(self.total_frames)]
 
     # =====================================================
     # FRAME RENDER
     # =====================================================
 
     def _render_frame(self, t: float) -> Frame:
+        return self._compose(t).frame()
+
+    def render_frame_buffer(self, t: float) -> FrameBytes:
+        """
+        Raw RGB24 bytes of the frame at t.
+
+        With the numpy backend this is a view of the reused canvas, valid
+        only until the next render call.
+        """
+        canvas = self._compose(t)
+        with self.profiler.phase("buffer"):
+            return canvas.buffer()
+
+    def _compose(self, t: float) -> Canvas:
+        prof = self.profiler
+        layers, timer, outro_alpha = self._state(t)
+
+        if outro_alpha is not None:
+            with prof.phase("outro"):
+                return self._compose_outro(outro_alpha)
+
+        progress = [p for p, _, _ in layers]
+        baked_count = self._settled_prefix(progress)
+
+        with prof.phase("background"):
+            canvas = self.backend.begin(self._base_layer(baked_count))
+
+        # only layers that are still animating are drawn per frame
+        for (_, _, draw_fn), phase, (p, pos, alpha) in zip(
+            self.layers[baked_count:],
+            self._layer_phases[baked_count:],
+            layers[baked_count:],
+        ):
+            if p > 0:
+                with prof.phase(phase):
+                    draw_fn(canvas, pos, alpha)
+
+        if timer is not None:
+            with prof.phase("timer"):
+                self._draw_text(
+                    canvas,
+                    self.layout.timer_pos,
+                    timer,
+                    self.layout.font_timer,
+                    255,
+                    (220, 30, 30),
+                )
+
+        return canvas
+
+    # =====================================================
+    # TIMELINE / FRAME STATE
+    # =====================================================
+
+    def _build_timeline(self) -> Timeline:
+        timeline = Timeline(self.total_frames, self.fps)
+        for name, el, _ in self.layers:
+            timeline.add_slide(name, el)
+        timeline.set_timer(TIMER_SECONDS, self.timer_start)
+        timeline.set_outro(self.outro_start, OUTRO_FADE_SECONDS)
+        return timeline
+
+    def _state(self, t: float) -> FrameState:
+        """
+        Everything needed to draw the frame at t.
+
+        On the frame grid this is read from the precomputed timeline;
+        anything else falls back to the scalar animation helpers.
+        """
+        i = self.timeline.frame_index(t) if self.timeline is not None else None
+        if i is not None:
+            return self._state_at(i)
+
         if t >= self.outro_start:
-            return self._render_outro(t - self.outro_start)
-
-        base = self.background.copy()
-        draw = ImageDraw.Draw(base)
-
-        # Hook
-        hp = self._progress(t, self.hook_start, ENTRY_ANIMATION_DURATION)
-        if hp > 0:
-            pos = slide_from_angle((VIDEO_WIDTH // 2, TOP_Y), hp, 270)
-            self._draw_centered_text(draw, pos, self.hook_text, FONT_HOOK, fade_in(hp))
-
-        # Instruction
-        ip = self._progress(t, self.instruction_start, ENTRY_ANIMATION_DURATION)
-        if ip > 0:
-            pos = slide_from_angle((VIDEO_WIDTH // 2, INSTRUCTION_Y), ip, 0)
-            self._draw_centered_text(
-                draw, pos, self.instruction_text, FONT_INSTRUCTION, fade_in(ip)
-            )
+            t = t - self.outro_start
+            return [], None, min(255, int((t / OUTRO_FADE_SECONDS) * 255))
 
-        self._draw_image_grid(base, t)
+        layers: List[LayerState] = []
+        for _, el, _ in self.layers:
+            p = el.progress(t)
+            pos, alpha = el.state(p)
+            layers.append((p, pos, alpha))
 
+        timer = None
         if t >= self.timer_start:
             timer = countdown_text(TIMER_SECONDS, t - self.timer_start)
-            draw.text(TIMER_POS, timer, font=FONT_TIMER, fill=(220, 30, 30))
 
-        return base
+        return layers, timer, None
+
+    def frame_changes(self) -> List[bool]:
+        """
+        changes[i] is False when frame i is pixel-identical to frame i - 1,
+        so its predecessor's buffer can be re-sent instead of re-rendered.
+        """
+        if self.timeline is not None:
+            return self.timeline.changed()
+
+        changes: List[bool] = []
+        prev = None
+        for i in range(self.total_frames):
+            key = self._visual_key(self._state(i / self.fps))
+            changes.append(key != prev)
+            prev = key
+        return changes
+
+    @staticmethod
+    def _visual_key(state: FrameState) -> tuple:
+        layers, timer, outro_alpha = state
+        if outro_alpha is not None:
+            return ("outro", outro_alpha)
+        return (
+            "main",
+            tuple((*pos, alpha) if p > 0 else None for p, pos, alpha in layers),
+            timer,
+        )
+
+    def _state_at(self, i: int) -> FrameState:
+        tl = self.timeline
+        assert tl is not None
+
+        outro_alpha = int(tl.outro_alpha[i])
+        if outro_alpha >= 0:
+            return [], None, outro_alpha
+
+        layers: List[LayerState] = []
+        for name, _, _ in self.layers:
+            tr = tl.tracks[name]
+            layers.append(
+                (float(tr.progress[i]), (int(tr.x[i]), int(tr.y[i])), int(tr.alpha[i]))
+            )
+
+        timer_value = int(tl.timer[i])
+        timer = f"{timer_value}s" if timer_value >= 0 else None
+        return layers, timer, None
+
+    # =====================================================
+    # LAYER CACHE
+    # =====================================================
+
+    @staticmethod
+    def _settled_prefix(progress: List[float]) -> int:
+        """
+        Number of leading layers whose animation has finished.
+
+        Only a prefix of the draw order may be baked: anything drawn later
+        must still land on top of it to keep the output pixel-identical.
+        """
+        n = 0
+        for p in progress:
+            if p < 1.0:
+                break
+            n += 1
+        return n
+
+    def _base_layer(self, count: int) -> Image.Image:
+        """
+        Background with the first `count` layers drawn in their final state.
+        """
+        if count < self._baked_count:
+            # out-of-order access (e.g. seeking backwards): rebuild
+            self._baked_count = 0
+            self._baked = self.background
+
+        if count > self._baked_count:
+            canvas = PilCanvas(self._baked.copy())
+            for _, el, draw_fn in self.layers[self._baked_count : count]:
+                draw_fn(canvas, *el.state(1.0))
+            self._baked = canvas.image
+            self._baked_count = count
+
+        return self._baked
+
+    # =====================================================
+    # LAYERS
+    # =====================================================
+
+    def _draw_hook(self, canvas: Canvas, pos: Point, alpha: int):
+        self._draw_centered_text(
+            canvas, pos, self.hook_text, self.layout.font_hook, alpha
+        )
+
+    def _draw_instruction(self, canvas: Canvas, pos: Point, alpha: int):
+        self._draw_centered_text(
+            canvas, pos, self.instruction_text, self.layout.font_instruction, alpha
+        )
+
+    def _draw_tile(self, index: int, canvas: Canvas, pos: Point, alpha: int):
+        canvas.paste_tile(self.scene.tiles[index], pos, alpha)
 
     # =====================================================
     # OUTRO
     # =====================================================
 
-    def _render_outro(self, t: float) -> Frame:
-        base = self.background.copy()
-        draw = ImageDraw.Draw(base)
+    def _compose_outro(self, alpha: int) -> Canvas:
+        # after the fade every outro frame is identical
+        if alpha == 255 and self._outro_settled is not None:
+            return self.backend.begin(self._outro_settled)
 
-        alpha = min(255, int((t / 0.6) * 255))
-        cx = VIDEO_WIDTH // 2
+        lo = self.layout
+        canvas = self.backend.begin(self.background)
+        cx = self.width // 2
 
         # LOGO (TOP RIGHT)
-        if self.logo:
-            logo = self.logo.resize((120, 120))
-            logo.putalpha(alpha)
-            base.paste(logo, (VIDEO_WIDTH - 140, 30), logo)
+        if self.scene.logo:
+            canvas.paste_tile(self.scene.logo, lo.logo_pos, alpha)
 
         # TITLE
         self._draw_centered_text(
-            draw,
-            (cx, int(VIDEO_HEIGHT * 0.30)),
+            canvas,
+            (cx, int(self.height * 0.30)),
             "🎁 Monthly Rewards",
-            FONT_OUTRO_TITLE,
+            lo.font_outro_title,
             alpha,
         )
 
         # RED + BOLD SUBTEXT
         self._draw_centered_text(
-            draw,
-            (cx, int(VIDEO_HEIGHT * 0.42)),
+            canvas,
+            (cx, int(self.height * 0.42)),
             "Top commenters with correct answers\nget rewarded every month!",
-            FONT_OUTRO_TEXT,
+            lo.font_outro_text,
             alpha,
             color=(220, 30, 30),
         )
 
         # ICONS + LABELS
-        icon_y = int(VIDEO_HEIGHT * 0.62)
-        label_y = icon_y + 70
-        spacing = 200
+        icon_y = int(self.height * 0.62)
+        label_y = icon_y + lo.icon_label_offset
+        spacing = lo.icon_spacing
+        icon_w, icon_h = lo.icon_size
 
         items = [
             ("like", "Like"),
@@ -189,79 +525,58 @@ class QuizCompositor:
         ]
 
         for (name, label), x in zip(items, (cx - spacing, cx, cx + spacing)):
-            if name in self.icons:
-                icon = self.icons[name].resize((80, 80))
-                icon.putalpha(alpha)
-                base.paste(icon, (x - 40, icon_y - 40), icon)
+            if name in self.scene.icons:
+                canvas.paste_tile(
+                    self.scene.icons[name],
+                    (x - icon_w // 2, icon_y - icon_h // 2),
+                    alpha,
+                )
 
                 self._draw_centered_text(
-                    draw,
+                    canvas,
                     (x, label_y),
                     label,
-                    FONT_ICON_LABEL,
+                    lo.font_icon_label,
                     alpha,
                 )
 
-        return base
-
-    # =====================================================
-    # IMAGE GRID
-    # =====================================================
-
-    def _draw_image_grid(self, base: Image.Image, t: float) -> None:
-        start_x = (VIDEO_WIDTH - (IMAGE_SIZE[0] * 2 + GRID_GAP)) // 2
-        positions = [
-            (start_x, GRID_TOP_Y),
-            (start_x + IMAGE_SIZE[0] + GRID_GAP, GRID_TOP_Y),
-            (start_x, GRID_TOP_Y + IMAGE_SIZE[1] + GRID_GAP),
-            (start_x + IMAGE_SIZE[0] + GRID_GAP, GRID_TOP_Y + IMAGE_SIZE[1] + GRID_GAP),
-        ]
-
-        for i, (img, pos) in enumerate(zip(self.images, positions)):
-            gp = max(0.0, t - self.grid_start)
-            p = stagger_progress(gp, i, IMAGE_STAGGER_DELAY, ENTRY_ANIMATION_DURATION)
-            if p <= 0:
-                continue
+        if alpha == 255:
+            self._outro_settled = canvas.frame().copy()
 
-            final = slide_from_angle(pos, p, 180)
-            self._paste_image(base, img, final, p)
+        return canvas
 
     # =====================================================
     # HELPERS
     # =====================================================
 
-    def _paste_image(self, base: Image.Image, img: Image.Image, pos: Point, p: float):
-        img = img.resize(IMAGE_SIZE).convert("RGBA")
-        img.putalpha(fade_in(p))
-        base.paste(img, pos, img)
-
     def _draw_centered_text(
         self,
-        draw: ImageDraw.ImageDraw,
+        canvas: Canvas,
         center: Point,
         text: str,
         font: ImageFont.FreeTypeFont,
         alpha: int,
         color: tuple[int, int, int] = (255, 255, 255),
     ):
-        bbox = draw.multiline_textbbox((0, 0), text, font=font, align="center")
-        w = bbox[2] - bbox[0]
-        h = bbox[3] - bbox[1]
-        x = center[0] - w // 2
-        y = center[1] - h // 2
-
-        draw.multiline_text(
-            (x, y),
-            text,
-            font=font,
-            fill=(*color, alpha),
-            align="center",
-        )
+        sprite = text_sprite(text, font, color)
+        x = center[0] - sprite.width // 2
+        y = center[1] - sprite.height // 2
+        self._draw_text(canvas, (x, y), text, font, alpha, color)
 
-    @staticmethod
-    def _progress(t: float, start: float, duration: float) -> float:
-        if t <= start:
-            return 0.0
-        if t >= start + duration:
-            return 1.0
-        return (t - start) / duration
+    def _draw_text(
+        self,
+        canvas: Canvas,
+        origin: Point,
+        text: str,
+        font: ImageFont.FreeTypeFont,
+        alpha: int,
+        color: tuple[int, int, int] = (255, 255, 255),
+    ):
+        """
+        Equivalent of draw.multiline_text(origin, ...) using a cached sprite.
+        """
+        if alpha <= 0:
+            return
+        sprite = text_sprite(text, font, color)
+        pos = (origin[0] + sprite.offset[0], origin[1] + sprite.offset[1])
+        canvas.paste_text(sprite, pos, alpha)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from .assets import get_asset_catalog
+from .compositor import QuizCompositor, load_font
+from .ffmpeg import FFmpegPipeWriter
+from .render_cache import job_rng
+from .renderer import RenderJob, safe_job_id
+from ..config.settings import (
+    DRAFT_OUTPUT_DIR,
+    DRAFT_SCALE,
+    DRAFT_FPS,
+    DRAFT_CRF,
+    DRAFT_PRESET,
+    DRAFT_CONTACT_SHEET,
+    ENTRY_ANIMATION_DURATION,
+    FONT_SECONDARY,
+)
+from ..utils.logger import get_logger
+
+log = get_logger("draft")
+
+SHEET_COLUMNS = 4
+SHEET_GAP = 8
+SHEET_CAPTION_HEIGHT = 28
+
+
+@dataclass(frozen=True)
+class DraftResult:
+    video: Path
+    contact_sheet: Optional[Path]
+
+
+# =========================================================
+# KEYFRAMES
+# =========================================================
+
+
+def keyframes(comp: QuizCompositor) -> List[Tuple[str, int]]:
+    """
+    (label, frame index) of the moments QA checks: each element settled,
+    the grid mid-animation, the countdown and the outro.
+    """
+    last = comp.total_frames - 1
+
+    def at(t: float) -> int:
+        return min(last, max(0, int(round(t * comp.fps))))
+
+    return [
+        ("hook", at(comp.instruction_start)),
+        ("instruction", at(comp.grid_start)),
+        ("grid entering", at(comp.grid_start + ENTRY_ANIMATION_DURATION / 2)),
+        ("grid + timer", at(comp.timer_start)),
+        ("timer", at((comp.timer_start + comp.outro_start) / 2)),
+        ("timer end", at(comp.outro_start) - 1),
+        ("outro", last),
+    ]
+
+
+def build_contact_sheet(
+    frames: List[Tuple[str, float, Image.Image]],
+    columns: int = SHEET_COLUMNS,
+) -> Image.Image:
+    """
+    Grid of (label, t, frame) thumbnails with a caption under each.
+    """
+    w, h = frames[0][2].size
+    columns = max(1, min(columns, len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    cell_h = h + SHEET_CAPTION_HEIGHT
+
+    sheet = Image.new(
+        "RGB",
+        (
+            columns * w + (columns + 1) * SHEET_GAP,
+            rows * cell_h + (rows + 1) * SHEET_GAP,
+        ),
+        (24, 24, 24),
+    )
+    draw = ImageDraw.Draw(sheet)
+    font = load_font(FONT_SECONDARY, 16)
+
+    for n, (label, t, frame) in enumerate(frames):
+        x = SHEET_GAP + (n % columns) * (w + SHEET_GAP)
+        y = SHEET_GAP + (n // columns) * (cell_h + SHEET_GAP)
+        sheet.paste(frame, (x, y))
+        draw.text(
+            (x + 4, y + h + 4),
+            f"{t:5.2f}s  {label}",
+            font=font,
+            fill=(230, 230, 230),
+        )
+
+    return sheet
+
+
+# =========================================================
+# DRAFT RENDER
+# =========================================================
+
+
+def render_draft(
+    job: RenderJob,
+    *,
+    scale: float = DRAFT_SCALE,
+    fps: int = DRAFT_FPS,
+    contact_sheet: bool = DRAFT_CONTACT_SHEET,
+) -> DraftResult:
+    """
+    Low-resolution, low-fps, silent preview of a job for layout/timing QA.
+
+    Same QuizCompositor timeline and the same seeded background as the
+    final render, scaled down; frames are piped straight into an
+    ultrafast encode. Keyframes for the contact sheet are copied out of
+    the same pass.
+    """
+    start_time = time.time()
+
+    if len(job.images) != 4:
+        raise ValueError("RenderJob.images must contain exactly 4 images")
+
+    catalog = get_asset_catalog()
+    bg_path = catalog.choose_background(job_rng(job.puzzle_id))
+
+    comp = QuizCompositor(
+        hook_text=job.hook,
+        instruction_text=job.instruction,
+        images=job.images,
+        duration_seconds=job.duration_seconds,
+        background=catalog.load_background(bg_path),
+        scale=scale,
+        fps=fps,
+    )
+
+    safe_id = safe_job_id(job.puzzle_id)
+    out_video = DRAFT_OUTPUT_DIR / f"{safe_id}.mp4"
+    out_sheet = DRAFT_OUTPUT_DIR / f"{safe_id}.sheet.png"
+
+    log.info(
+        "Draft render: %s (%dx%d @ %dfps, %d frames)",
+        job.puzzle_id,
+        comp.width,
+        comp.height,
+        fps,
+        comp.total_frames,
+    )
+
+    wanted: Dict[int, str] = {}
+    if contact_sheet:
+        for label, i in keyframes(comp):
+            wanted.setdefault(i, label)
+    captured: List[Tuple[str, float, Image.Image]] = []
+
+    writer = FFmpegPipeWriter(
+        out_video,
+        fps=fps,
+        width=comp.width,
+        height=comp.height,
+        crf=DRAFT_CRF,
+        preset=DRAFT_PRESET,
+    )
+    changes = comp.frame_changes()
+    frame = None
+    with writer:
+        for i in range(comp.total_frames):
+            if frame is None or changes[i]:
+                frame = comp.render_frame_buffer(i / fps)
+            writer.write(frame)
+            if i in wanted:
+                img = Image.frombytes("RGB", (comp.width, comp.height), bytes(frame))
+                captured.append((wanted[i], i / fps, img))
+
+    sheet_path: Optional[Path] = None
+    if captured:
+        build_contact_sheet(captured).save(out_sheet)
+        sheet_path = out_sheet
+        log.info("Contact sheet saved: %s", out_sheet.name)
+
+    log.info("Draft finished in %.2fs: %s", time.time() - start_time, out_video.name)
+    return DraftResult(video=out_video, contact_sheet=sheet_path)
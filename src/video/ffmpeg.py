@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import json
 import subprocess
-import shutil
+import threading
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from ..config.settings import (
     VIDEO_WIDTH,
     VIDEO_HEIGHT,
     ENABLE_BACKGROUND_MUSIC,
+    MUSIC_CACHE_DIR,
     MUSIC_VOLUME,
 )
 from ..utils.logger import get_logger
@@ -40,6 +44,279 @@ def _ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+# =========================================================
+# PROBE (CACHED)
+# =========================================================
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    duration: Optional[float]
+    has_video: bool
+    has_audio: bool
+
+
+_PROBE_CACHE: Dict[Tuple[str, int, int], MediaInfo] = {}
+
+
+def probe(path: Path) -> MediaInfo:
+    """
+    Stream layout + duration via ffprobe, cached per (path, mtime, size).
+    """
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    if key in _PROBE_CACHE:
+        return _PROBE_CACHE[key]
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration:stream=codec_type",
+        "-of",
+        "json",
+        str(path),
+    ]
+    log.debug("FFprobe cmd: %s", " ".join(cmd))
+
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError as e:
+        raise RuntimeError(f"Could not start FFprobe: {e}") from e
+
+    if proc.returncode != 0:
+        raise RuntimeError(
+            "FFprobe failed:\n"
+            f"CMD: {' '.join(cmd)}\n\n"
+            f"STDERR:\n{proc.stderr.strip()}"
+        )
+
+    data = json.loads(proc.stdout or "{}")
+    types = {s.get("codec_type") for s in data.get("streams", [])}
+    duration = data.get("format", {}).get("duration")
+
+    info = MediaInfo(
+        duration=float(duration) if duration not in (None, "N/A") else None,
+        has_video="video" in types,
+        has_audio="audio" in types,
+    )
+    _PROBE_CACHE[key] = info
+    return info
+
+
+# =========================================================
+# MUSIC INPUT
+# =========================================================
+
+MUSIC_SUFFIX = ".m4a"
+
+
+def is_prepared_music(path: Path) -> bool:
+    """
+    True for tracks from the music cache (already AAC at the right length).
+    """
+    return path.suffix == MUSIC_SUFFIX and path.parent == MUSIC_CACHE_DIR
+
+
+def _music_input_args(
+    music_file: Optional[Path],
+    video_seconds: Optional[float] = None,
+) -> list[str]:
+    """
+    `-i music` (looped if shorter than the video), or [] when there is
+    no usable music track.
+    """
+    if not (ENABLE_BACKGROUND_MUSIC and music_file):
+        return []
+
+    if is_prepared_music(music_file):
+        # already AAC and trimmed to the video length
+        log.info("Adding background music: %s (cached)", music_file.name)
+        return ["-i", str(music_file)]
+
+    try:
+        info = probe(music_file)
+    except RuntimeError as e:
+        log.warning("Could not probe %s, assuming audio: %s", music_file.name, e)
+        return ["-i", str(music_file)]
+
+    if not info.has_audio:
+        log.warning("Music file has no audio stream, skipping: %s", music_file.name)
+        return []
+
+    args: list[str] = []
+    if video_seconds and info.duration and info.duration < video_seconds:
+        args += ["-stream_loop", "-1"]
+
+    log.info("Adding background music: %s", music_file.name)
+    return args + ["-i", str(music_file)]
+
+
+def _music_volume(music_file: Path) -> Optional[str]:
+    """
+    Volume filter for a raw track; cached tracks already have it applied,
+    so music is equally loud whether or not the cache could be built.
+    """
+    return None if is_prepared_music(music_file) else f"volume={MUSIC_VOLUME}"
+
+
+def _audio_output_args(input_index: int, music_file: Path) -> list[str]:
+    volume = _music_volume(music_file)
+    if volume is None:
+        audio_codec = ["-c:a", "copy"]
+    else:
+        audio_codec = ["-af", volume, "-c:a", "aac", "-b:a", "192k"]
+
+    return ["-map", f"{input_index}:a:0", *audio_codec, "-shortest"]
+
+
+def _music_output_args(input_index: int, music_file: Path) -> list[str]:
+    return ["-map", "0:v:0", *_audio_output_args(input_index, music_file)]
+
+
+def _video_filter(width: int = VIDEO_WIDTH, height: int = VIDEO_HEIGHT) -> str:
+    return (
+        f"scale={width}:{height}:"
+        "force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+        "format=yuv420p"
+    )
+
+
+def segment_args(fps: int) -> list[str]:
+    """
+    Extra args for pieces that are later joined with `-c copy`: one shared
+    timescale so segment timestamps line up exactly.
+    """
+    return ["-video_track_timescale", str(fps * 512)]
+
+
+def _x264_args(crf: int, preset: str) -> list[str]:
+    return [
+        "-c:v",
+        "libx264",
+        "-preset",
+        preset,
+        "-crf",
+        str(crf),
+        "-pix_fmt",
+        "yuv420p",
+    ]
+
+
+# =========================================================
+# RENDITIONS (ONE INPUT → SEVERAL OUTPUTS)
+# =========================================================
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """
+    Extra encode of the same frames, written next to the main output as
+    <stem>.<name>.mp4.
+    """
+
+    name: str
+    width: int
+    height: int
+    crf: int = 23
+    preset: str = "veryfast"
+    audio: bool = True
+
+
+def parse_renditions(spec: str) -> List[Rendition]:
+    """
+    "proxy:720x1280:crf=23:preset=veryfast,preview:360x640:crf=32:audio=0"
+    """
+    renditions: List[Rendition] = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, size, *opts = item.split(":")
+        try:
+            width, height = (int(v) for v in size.lower().split("x"))
+            kwargs: Dict[str, object] = {}
+            for opt in opts:
+                key, _, value = opt.partition("=")
+                if key == "crf":
+                    kwargs["crf"] = int(value)
+                elif key == "preset":
+                    kwargs["preset"] = value
+                elif key == "audio":
+                    kwargs["audio"] = value.lower() in ("1", "true", "yes", "on")
+                else:
+                    raise ValueError(f"unknown option '{key}'")
+        except ValueError as e:
+            raise ValueError(f"Invalid rendition '{item}': {e}") from e
+
+        renditions.append(Rendition(name=name, width=width, height=height, **kwargs))
+    return renditions
+
+
+def rendition_path(out_mp4: Path, rendition: Rendition) -> Path:
+    return out_mp4.with_name(f"{out_mp4.stem}.{rendition.name}{out_mp4.suffix}")
+
+
+def _output_args(
+    out_mp4: Path,
+    *,
+    crf: int,
+    preset: str,
+    width: int = VIDEO_WIDTH,
+    height: int = VIDEO_HEIGHT,
+    renditions: Sequence[Rendition] = (),
+    music_file: Optional[Path] = None,
+    audio_input: Optional[int] = None,
+    extra_args: Sequence[str] = (),
+    faststart: bool = True,
+) -> list[str]:
+    """
+    Encoder args for out_mp4 (width x height) plus one output per rendition.
+
+    Input 0 is decoded once; with renditions a split filter feeds every
+    encoder from the same frames. `audio_input` is the music input index
+    (None = silent).
+    """
+    main = Rendition("main", width, height, crf, preset, audio=True)
+    outputs = [(main, out_mp4)]
+    outputs += [(r, rendition_path(out_mp4, r)) for r in renditions]
+    split = len(outputs) > 1
+
+    args: list[str] = []
+    if split:
+        graph = [
+            f"[0:v]split={len(outputs)}"
+            + "".join(f"[s{i}]" for i in range(len(outputs)))
+        ]
+        graph += [
+            f"[s{i}]{_video_filter(r.width, r.height)}[v{i}]"
+            for i, (r, _) in enumerate(outputs)
+        ]
+        args += ["-filter_complex", ";".join(graph)]
+    else:
+        args += ["-vf", _video_filter(width, height)]
+
+    for i, (r, path) in enumerate(outputs):
+        with_audio = audio_input is not None and music_file is not None and r.audio
+        if split:
+            args += ["-map", f"[v{i}]"]
+        elif with_audio:
+            args += ["-map", "0:v:0"]
+
+        args += _x264_args(r.crf, r.preset)
+        if with_audio:
+            args += _audio_output_args(audio_input, music_file)
+        args += list(extra_args)
+        if faststart:
+            args += ["-movflags", "+faststart"]
+        args.append(str(path))
+
+    return args
+
+
+def output_paths(out_mp4: Path, renditions: Sequence[Rendition]) -> List[Path]:
+    return [out_mp4, *(rendition_path(out_mp4, r) for r in renditions)]
+
+
 # =========================================================
 # FRAMES → VIDEO
 # =========================================================
@@ -51,9 +328,13 @@ def encode_video_from_frames(
     fps: int,
     crf: int = 20,
     preset: str = "medium",
+    music_file: Optional[Path] = None,
+    duration_seconds: Optional[float] = None,
+    renditions: Sequence[Rendition] = (),
 ) -> None:
     """
-    Encode PNG frame sequence → MP4 (H.264, Shorts-friendly)
+    Encode PNG frame sequence (+ optional music) → MP4 in one pass,
+    plus any renditions from the same decode.
 
     Expects:
       frames_dir/frame_00000.png
@@ -62,6 +343,8 @@ def encode_video_from_frames(
 
     log.info("Encoding frames → video (%s)", out_mp4.name)
 
+    music_args = _music_input_args(music_file, duration_seconds)
+
     cmd = [
         "ffmpeg",
         "-y",
@@ -72,30 +355,224 @@ def encode_video_from_frames(
         str(fps),
         "-i",
         str(frames_dir / "frame_%05d.png"),
-        "-vf",
-        (
-            f"scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:"
-            "force_original_aspect_ratio=decrease,"
-            f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
-            "format=yuv420p"
+        *music_args,
+        *_output_args(
+            out_mp4,
+            crf=crf,
+            preset=preset,
+            renditions=renditions,
+            music_file=music_file,
+            audio_input=1 if music_args else None,
         ),
-        "-c:v",
-        "libx264",
-        "-preset",
-        preset,
-        "-crf",
-        str(crf),
-        "-pix_fmt",
-        "yuv420p",
-        "-movflags",
-        "+faststart",
-        str(out_mp4),
     ]
 
     _run(cmd)
     log.info("Video encoding completed")
 
 
+# =========================================================
+# RAW FRAMES → VIDEO (STREAMING)
+# =========================================================
+
+FrameBytes = Union[bytes, bytearray, memoryview]
+
+
+class FFmpegPipeWriter:
+    """
+    Long-lived ffmpeg process fed raw RGB frames over stdin.
+
+    Writes block while the pipe buffer is full, so the renderer can never
+    run ahead of the encoder. If ffmpeg dies mid-stream the next write
+    raises RuntimeError with the tail of its stderr.
+    """
+
+    STDERR_TAIL = 50  # lines kept for error reports
+
+    def __init__(
+        self,
+        out_mp4: Path,
+        *,
+        fps: int,
+        width: int = VIDEO_WIDTH,
+        height: int = VIDEO_HEIGHT,
+        crf: int = 20,
+        preset: str = "medium",
+        pix_fmt: str = "rgb24",
+        extra_args: Optional[list[str]] = None,
+        music_file: Optional[Path] = None,
+        duration_seconds: Optional[float] = None,
+        renditions: Sequence[Rendition] = (),
+    ) -> None:
+        self.out_mp4 = out_mp4
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.crf = crf
+        self.preset = preset
+        self.pix_fmt = pix_fmt
+        self.extra_args = list(extra_args or [])
+        self.music_file = music_file
+        self.duration_seconds = duration_seconds
+        self.renditions = tuple(renditions)
+        self._music_args: Optional[list[str]] = None
+
+        self.frames_written = 0
+        self._proc: Optional[subprocess.Popen] = None
+        self._stderr: deque[str] = deque(maxlen=self.STDERR_TAIL)
+        self._stderr_thread: Optional[threading.Thread] = None
+
+    # -----------------------------------------------------
+    # LIFECYCLE
+    # -----------------------------------------------------
+
+    def _cmd(self) -> list[str]:
+        if self._music_args is None:
+            self._music_args = _music_input_args(
+                self.music_file, self.duration_seconds
+            )
+
+        return [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            self.pix_fmt,
+            "-s",
+            f"{self.width}x{self.height}",
+            "-framerate",
+            str(self.fps),
+            "-i",
+            "pipe:0",
+            *self._music_args,
+            *_output_args(
+                self.out_mp4,
+                crf=self.crf,
+                preset=self.preset,
+                width=self.width,
+                height=self.height,
+                renditions=self.renditions,
+                music_file=self.music_file,
+                audio_input=1 if self._music_args else None,
+                extra_args=self.extra_args,
+            ),
+        ]
+
+    def open(self) -> "FFmpegPipeWriter":
+        _ensure_dir(self.out_mp4.parent)
+
+        cmd = self._cmd()
+        log.debug("FFmpeg cmd: %s", " ".join(cmd))
+        log.info("Streaming frames → video (%s)", self.out_mp4.name)
+
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise RuntimeError(f"Could not start FFmpeg: {e}") from e
+
+        # drain stderr so a chatty ffmpeg can never block on its own output
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, name="ffmpeg-stderr", daemon=True
+        )
+        self._stderr_thread.start()
+        return self
+
+    def _drain_stderr(self) -> None:
+        assert self._proc is not None and self._proc.stderr is not None
+        for raw in self._proc.stderr:
+            self._stderr.append(raw.decode("utf-8", "replace").rstrip())
+
+    def _failure(self, reason: str) -> RuntimeError:
+        if self._proc is not None:
+            self._proc.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=5)
+        return RuntimeError(
+            f"FFmpeg failed: {reason}\n"
+            f"CMD: {' '.join(self._cmd())}\n\n"
+            "STDERR:\n" + "\n".join(self._stderr)
+        )
+
+    # -----------------------------------------------------
+    # FRAMES
+    # -----------------------------------------------------
+
+    def write(self, frame: FrameBytes) -> None:
+        if self._proc is None or self._proc.stdin is None:
+            raise RuntimeError("FFmpegPipeWriter is not open")
+
+        if self._proc.poll() is not None:
+            raise self._failure(
+                f"exited with code {self._proc.returncode} "
+                f"after {self.frames_written} frames"
+            )
+
+        try:
+            self._proc.stdin.write(frame)
+        except (BrokenPipeError, ValueError, OSError) as e:
+            raise self._failure(
+                f"pipe closed after {self.frames_written} frames ({e})"
+            ) from e
+
+        self.frames_written += 1
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+
+        try:
+            if self._proc.stdin is not None:
+                self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+        code = self._proc.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=5)
+
+        self._proc = None
+        if code != 0:
+            raise RuntimeError(
+                f"FFmpeg failed: exited with code {code}\n"
+                f"CMD: {' '.join(self._cmd())}\n\n"
+                "STDERR:\n" + "\n".join(self._stderr)
+            )
+
+        log.info("Video encoding completed (%d frames)", self.frames_written)
+
+    def abort(self) -> None:
+        if self._proc is None:
+            return
+
+        try:
+            if self._proc.stdin is not None:
+                self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+        self._proc.kill()
+        self._proc.wait()
+        self._proc = None
+        for path in output_paths(self.out_mp4, self.renditions):
+            path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "FFmpegPipeWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
 # =========================================================
 # AUDIO MIX
 # =========================================================
@@ -104,83 +581,60 @@ def mux_music(
     in_mp4: Path,
     music_file: Path,
     out_mp4: Path,
-    *,
-    music_volume: float = MUSIC_VOLUME,
 ) -> None:
     """
-    Add or mix background music safely.
-    Falls back to music-only if input video has no audio.
+    Add background music to an existing video.
+
+    Mixes with the video's own audio when ffprobe finds an audio stream,
+    otherwise adds the music as the sole audio track.
     """
     _ensure_dir(out_mp4.parent)
 
     log.info("Adding background music: %s", music_file.name)
 
-    # Attempt mix (video audio + music)
-    mix_cmd = [
-        "ffmpeg",
-        "-y",
-        "-loglevel",
-        "error",
-        "-i",
-        str(in_mp4),
-        "-i",
-        str(music_file),
-        "-filter_complex",
-        (
-            f"[1:a]volume={music_volume}[bg];"
-            "[0:a][bg]amix=inputs=2:duration=shortest[aout]"
-        ),
-        "-map",
-        "0:v:0",
-        "-map",
-        "[aout]",
-        "-c:v",
-        "copy",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "192k",
-        "-shortest",
-        "-movflags",
-        "+faststart",
-        str(out_mp4),
-    ]
+    has_audio = probe(in_mp4).has_audio
+    inputs = ["-i", str(in_mp4), "-i", str(music_file)]
 
-    try:
-        _run(mix_cmd)
-        log.info("Music mixed with existing audio")
-        return
-    except RuntimeError:
-        log.warning("No audio stream detected, using music only")
+    if has_audio:
+        volume = _music_volume(music_file) or "anull"
+        audio_args = [
+            "-filter_complex",
+            (
+                f"[1:a]{volume}[bg];"
+                "[0:a][bg]amix=inputs=2:duration=shortest[aout]"
+            ),
+            "-map",
+            "0:v:0",
+            "-map",
+            "[aout]",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "192k",
+            "-shortest",
+        ]
+    else:
+        audio_args = _music_output_args(1, music_file)
 
-    # Fallback: music only
-    fallback_cmd = [
+    cmd = [
         "ffmpeg",
         "-y",
         "-loglevel",
         "error",
-        "-i",
-        str(in_mp4),
-        "-i",
-        str(music_file),
-        "-map",
-        "0:v:0",
-        "-map",
-        "1:a:0",
+        *inputs,
+        *audio_args,
         "-c:v",
         "copy",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "192k",
-        "-shortest",
         "-movflags",
         "+faststart",
         str(out_mp4),
     ]
 
-    _run(fallback_cmd)
-    log.info("Music added as sole audio track")
+    _run(cmd)
+    if has_audio:
+        log.info("Music mixed with existing audio")
+    else:
+        log.info("Music added as sole audio track")
 
 
 # =========================================================
@@ -195,26 +649,23 @@ def frames_to_mp4(
     music_file: Optional[Path] = None,
     crf: int = 20,
     preset: str = "medium",
+    duration_seconds: Optional[float] = None,
+    renditions: Sequence[Rendition] = (),
 ) -> Path:
     """
     Full pipeline (RAM-safe):
 
-      frames on disk → mp4 → (optional) mp4 + music
+      frames on disk (+ optional music) → mp4, in a single ffmpeg pass
     """
-    temp_video = out_mp4.with_suffix(".nomusic.mp4")
-
     encode_video_from_frames(
         frames_dir=frames_dir,
-        out_mp4=temp_video,
+        out_mp4=out_mp4,
         fps=fps,
         crf=crf,
         preset=preset,
+        music_file=music_file,
+        duration_seconds=duration_seconds,
+        renditions=renditions,
     )
 
-    if ENABLE_BACKGROUND_MUSIC and music_file:
-        mux_music(temp_video, music_file, out_mp4)
-        temp_video.unlink(missing_ok=True)
-    else:
-        shutil.move(temp_video, out_mp4)
-
     return out_mp4
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from .ffmpeg import MUSIC_SUFFIX, _ensure_dir, _run
+from ..config.settings import (
+    MUSIC_CACHE_DIR,
+    MUSIC_VOLUME,
+    MUSIC_FADE_IN,
+    MUSIC_FADE_OUT,
+)
+from ..utils.hashing import cached_sha256_file, sha1
+from ..utils.logger import get_logger
+
+log = get_logger("music")
+
+AUDIO_BITRATE = "192k"
+
+
+# =========================================================
+# CACHE ENTRIES
+# =========================================================
+
+
+def _params_key(
+    duration_seconds: float,
+    volume: float,
+    fade_in: float,
+    fade_out: float,
+) -> str:
+    params = f"{duration_seconds:.3f}|{volume:.4f}|{fade_in:.3f}|{fade_out:.3f}"
+    return sha1(params)[:12]
+
+
+def cache_path(
+    track: Path,
+    duration_seconds: float,
+    *,
+    volume: float = MUSIC_VOLUME,
+    fade_in: float = MUSIC_FADE_IN,
+    fade_out: float = MUSIC_FADE_OUT,
+) -> Path:
+    content = cached_sha256_file(track)[:16]
+    params = _params_key(duration_seconds, volume, fade_in, fade_out)
+    return MUSIC_CACHE_DIR / f"{content}_{params}{MUSIC_SUFFIX}"
+
+
+def _audio_filter(
+    duration_seconds: float,
+    volume: float,
+    fade_in: float,
+    fade_out: float,
+) -> str:
+    filters = [f"volume={volume}"]
+    if fade_in > 0:
+        filters.append(f"afade=t=in:st=0:d={fade_in}")
+    if fade_out > 0:
+        start = max(0.0, duration_seconds - fade_out)
+        filters.append(f"afade=t=out:st={start}:d={fade_out}")
+    return ",".join(filters)
+
+
+# =========================================================
+# BUILD (LAZY)
+# =========================================================
+
+
+def prepare_music(
+    track: Path,
+    duration_seconds: float,
+    *,
+    volume: float = MUSIC_VOLUME,
+    fade_in: float = MUSIC_FADE_IN,
+    fade_out: float = MUSIC_FADE_OUT,
+) -> Path:
+    """
+    AAC track already looped/trimmed to `duration_seconds`, with volume
+    and fades applied, so the final mux can stream-copy it.
+
+    Entries are keyed by track content + parameters and built on first
+    use; an edited track hashes differently, so stale entries are never
+    reused.
+    """
+    out = cache_path(
+        track, duration_seconds, volume=volume, fade_in=fade_in, fade_out=fade_out
+    )
+    if out.exists():
+        log.info("Music cache hit: %s (%s)", track.name, out.name)
+        return out
+
+    _ensure_dir(out.parent)
+    log.info("Music cache miss: transcoding %s → %s", track.name, out.name)
+
+    # write under a temp name so a crashed build never looks like a hit
+    tmp = out.with_name(f"{out.stem}.{os.getpid()}.tmp{MUSIC_SUFFIX}")
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-stream_loop",
+        "-1",
+        "-i",
+        str(track),
+        "-vn",
+        "-t",
+        f"{duration_seconds:.3f}",
+        "-af",
+        _audio_filter(duration_seconds, volume, fade_in, fade_out),
+        "-c:a",
+        "aac",
+        "-b:a",
+        AUDIO_BITRATE,
+        "-movflags",
+        "+faststart",
+        str(tmp),
+    ]
+
+    try:
+        _run(cmd)
+        tmp.replace(out)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return out
+
+
+def prepare_music_or_original(
+    track: Optional[Path],
+    duration_seconds: float,
+) -> Optional[Path]:
+    """
+    prepare_music(), falling back to the untouched track if the cache
+    entry cannot be built.
+    """
+    if track is None:
+        return None
+
+    try:
+        return prepare_music(track, duration_seconds)
+    except (OSError, RuntimeError) as e:
+        log.warning("Music cache unavailable, using %s as-is: %s", track.name, e)
+        return track
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .assets import get_asset_catalog
+from .compositor import OUTRO_SECONDS, OUTRO_FADE_SECONDS, Layout
+from .ffmpeg import (
+    FFmpegPipeWriter,
+    Rendition,
+    _video_filter,
+    _x264_args,
+    output_paths,
+    segment_args,
+)
+from .parallel import CompositorSpec
+from .render_cache import RenderCache, file_digest, fingerprint
+from .segments import Segment
+from ..config.settings import (
+    OUTRO_CACHE_DIR,
+    OUTRO_CACHE_MAX_MB,
+    FONT_PRIMARY,
+    FONT_SECONDARY,
+    COMPOSITOR_BACKEND,
+)
+from ..utils.logger import get_logger
+
+log = get_logger("outro")
+
+
+# =========================================================
+# KEY
+# =========================================================
+
+
+def outro_key(
+    spec: CompositorSpec,
+    background: Optional[Path],
+    *,
+    crf: int,
+    preset: str,
+    renditions: Sequence[Rendition] = (),
+) -> str:
+    """
+    Everything the outro segment depends on. Branding files are hashed by
+    content, so editing any of them yields a new key.
+    """
+    catalog = get_asset_catalog()
+    branding = [catalog.logo_path(), *catalog.icon_paths().values()]
+    width, height = Layout.at(spec.scale).size
+
+    return fingerprint(
+        {
+            "outro": {"seconds": OUTRO_SECONDS, "fade": OUTRO_FADE_SECONDS},
+            "background": file_digest(background),
+            "branding": [file_digest(p) if p.exists() else None for p in branding],
+            "fonts": [file_digest(FONT_PRIMARY), file_digest(FONT_SECONDARY)],
+            "video": {
+                "scale": spec.scale,
+                "fps": spec.fps,
+                "width": width,
+                "height": height,
+            },
+            "encoder": {
+                "backend": COMPOSITOR_BACKEND,
+                "args": [
+                    *_x264_args(crf, preset),
+                    "-vf",
+                    _video_filter(width, height),
+                    *segment_args(spec.fps),
+                ],
+            },
+            "renditions": [vars(r) for r in renditions],
+        }
+    )
+
+
+# =========================================================
+# CACHED SEGMENT
+# =========================================================
+
+
+def _encode_outro(
+    spec: CompositorSpec,
+    out_mp4: Path,
+    *,
+    crf: int,
+    preset: str,
+    renditions: Sequence[Rendition],
+) -> int:
+    """
+    Render + encode the outro on its own (a video that is all outro, so
+    the fade timing does not depend on the job's duration).
+    """
+    comp = dataclasses.replace(spec, duration_seconds=OUTRO_SECONDS).build()
+    changes = comp.frame_changes()
+
+    writer = FFmpegPipeWriter(
+        out_mp4,
+        fps=comp.fps,
+        width=comp.width,
+        height=comp.height,
+        crf=crf,
+        preset=preset,
+        extra_args=segment_args(comp.fps),
+        renditions=renditions,
+    )
+    frame = None
+    with writer:
+        for i in range(comp.total_frames):
+            if frame is None or changes[i]:
+                frame = comp.render_frame_buffer(i / comp.fps)
+            writer.write(frame)
+    return comp.total_frames
+
+
+def cached_outro(
+    spec: CompositorSpec,
+    background: Optional[Path],
+    *,
+    crf: int,
+    preset: str,
+    renditions: Sequence[Rendition] = (),
+    root: Path = OUTRO_CACHE_DIR,
+    max_bytes: int = OUTRO_CACHE_MAX_MB * 1024 * 1024,
+) -> Segment:
+    """
+    Pre-encoded outro segment for `spec`, rendered on first use.
+
+    The segment shares the job's encoder parameters and segment timescale,
+    so it can be appended with a stream copy (renditions alongside as
+    <key>.<name>.mp4). Like the render cache, hits refresh the files'
+    mtime and a new segment evicts the least recently used ones beyond
+    `max_bytes`.
+    """
+    key = outro_key(spec, background, crf=crf, preset=preset, renditions=renditions)
+    path = root / f"{key}.mp4"
+    frames = OUTRO_SECONDS * spec.fps
+
+    final = output_paths(path, renditions)
+    if all(p.exists() for p in final):
+        log.info("Outro cache hit: %s", key[:12])
+        try:
+            for p in final:
+                os.utime(p)
+        except OSError:
+            pass
+        return Segment(path=path, frames=frames, static=False)
+
+    log.info("Outro cache miss: rendering %s", key[:12])
+    # outside the cache's top level, so eviction never sees partial files
+    tmp = root / "partial" / f"{key}.{os.getpid()}.mp4"
+    try:
+        frames = _encode_outro(spec, tmp, crf=crf, preset=preset, renditions=renditions)
+        for src, dst in zip(output_paths(tmp, renditions), final):
+            src.replace(dst)
+    finally:
+        for p in output_paths(tmp, renditions):
+            p.unlink(missing_ok=True)
+
+    RenderCache(root, max_bytes).evict(keep=key)
+    return Segment(path=path, frames=frames, static=False)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from .backends import FrameBytes
+from .compositor import OUTRO_SECONDS, QuizCompositor
+from .profiling import NULL_PROFILER, make_profiler
+from ..config.settings import FPS
+from ..utils.logger import get_logger
+
+log = get_logger("parallel")
+
+
+# =========================================================
+# JOB DESCRIPTION (PICKLABLE)
+# =========================================================
+
+
+@dataclass(frozen=True)
+class CompositorSpec:
+    """
+    Everything needed to rebuild a QuizCompositor in another process.
+    """
+
+    hook_text: str
+    instruction_text: str
+    images: Tuple[Image.Image, ...]
+    duration_seconds: int
+    background: Image.Image
+    scale: float = 1.0
+    fps: int = FPS
+
+    @property
+    def total_frames(self) -> int:
+        return self.duration_seconds * self.fps
+
+    @property
+    def outro_start_frame(self) -> int:
+        return max(0, (self.duration_seconds - OUTRO_SECONDS) * self.fps)
+
+    def build(self, profiler=NULL_PROFILER) -> QuizCompositor:
+        return QuizCompositor(
+            hook_text=self.hook_text,
+            instruction_text=self.instruction_text,
+            images=list(self.images),
+            duration_seconds=self.duration_seconds,
+            background=self.background,
+            profiler=profiler,
+            scale=self.scale,
+            fps=self.fps,
+        )
+
+
+# =========================================================
+# WORKER
+# =========================================================
+
+_WORKER_COMP: Optional[QuizCompositor] = None
+_WORKER_CHANGES: List[bool] = []
+
+
+def _init_worker(spec: CompositorSpec, profile: bool) -> None:
+    global _WORKER_COMP, _WORKER_CHANGES
+    _WORKER_COMP = spec.build(make_profiler(profile))
+    _WORKER_CHANGES = _WORKER_COMP.frame_changes()
+
+
+def _render_chunk(
+    start: int, stop: int
+) -> Tuple[int, List[bytes], Dict[str, List[float]]]:
+    assert _WORKER_COMP is not None, "worker not initialised"
+
+    # held frames reuse the same bytes object; pickle sends it once
+    frames: List[bytes] = []
+    for i in range(start, stop):
+        if not frames or _WORKER_CHANGES[i]:
+            frames.append(bytes(_WORKER_COMP.render_frame_buffer(i / _WORKER_COMP.fps)))
+        else:
+            frames.append(frames[-1])
+    return start, frames, _WORKER_COMP.profiler.drain()
+
+
+# =========================================================
+# ORDERED PARALLEL RENDER
+# =========================================================
+
+
+def iter_frames_parallel(
+    spec: CompositorSpec,
+    *,
+    workers: int,
+    max_in_flight: int,
+    profiler=NULL_PROFILER,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[FrameBytes]:
+    """
+    Render frames [start, stop) (default: to the end) across a process
+    pool and yield raw RGB frames in order.
+
+    Contiguous chunks keep each worker's layer cache warm. At most
+    `max_in_flight` frames are rendered but not yet consumed, which bounds
+    memory regardless of how far ahead the workers could run. Worker
+    phase timings are merged into `profiler`.
+    """
+    total = spec.total_frames if stop is None else stop
+    chunk = max(1, min(spec.fps, max_in_flight // max(1, workers)))
+    max_chunks = max(1, max_in_flight // chunk)
+
+    log.info(
+        "Parallel render: %d workers, %d-frame chunks, ≤%d frames in flight",
+        workers,
+        chunk,
+        max_chunks * chunk,
+    )
+
+    pending: set[Future] = set()
+    ready: Dict[int, List[bytes]] = {}  # reorder buffer: chunk start → frames
+    next_submit = start
+    next_yield = start
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(spec, profiler.enabled),
+    ) as pool:
+        try:
+            while next_yield < total:
+                # keep the pool busy without exceeding the in-flight budget
+                while (
+                    next_submit < total
+                    and len(pending) + len(ready) < max_chunks
+                ):
+                    chunk_stop = min(total, next_submit + chunk)
+                    pending.add(pool.submit(_render_chunk, next_submit, chunk_stop))
+                    next_submit = chunk_stop
+
+                if next_yield not in ready:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        chunk_start, frames, samples = fut.result()
+                        ready[chunk_start] = frames
+                        profiler.merge(samples)
+                    continue
+
+                frames = ready.pop(next_yield)
+                yield from frames
+                next_yield += len(frames)
+
+        finally:
+            for fut in pending:
+                fut.cancel()
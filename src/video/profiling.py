@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import math
+from array import array
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List
+
+from ..utils.logger import get_logger
+
+log = get_logger("profiling")
+
+# histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+HISTOGRAM_BOUNDS_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133)
+
+
+# =========================================================
+# PHASE TIMING
+# =========================================================
+
+
+class _Phase:
+    __slots__ = ("samples", "start")
+
+    def __init__(self, samples: array) -> None:
+        self.samples = samples
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.samples.append(perf_counter() - self.start)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class FrameProfiler:
+    """
+    Wall-clock samples per hot-path phase (one sample each time it runs).
+
+    `phase(name)` is a reusable context manager; nesting the same phase is
+    not supported.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, array] = {}
+        self._phases: Dict[str, _Phase] = {}
+
+    def phase(self, name: str) -> _Phase:
+        ph = self._phases.get(name)
+        if ph is None:
+            samples = self.samples.setdefault(name, array("d"))
+            ph = self._phases[name] = _Phase(samples)
+        return ph
+
+    # -----------------------------------------------------
+    # TRANSFER (WORKER PROCESSES)
+    # -----------------------------------------------------
+
+    def drain(self) -> Dict[str, List[float]]:
+        """
+        Samples recorded so far (picklable), clearing them.
+        """
+        out = {name: s.tolist() for name, s in self.samples.items() if s}
+        for s in self.samples.values():
+            del s[:]
+        return out
+
+    def merge(self, samples: Dict[str, List[float]]) -> None:
+        for name, values in samples.items():
+            self.phase(name).samples.extend(values)
+
+    # -----------------------------------------------------
+    # REPORT
+    # -----------------------------------------------------
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: _summarize(samples)
+            for name, samples in self.samples.items()
+            if samples
+        }
+
+    def write_report(self, path: Path, **context: Any) -> None:
+        report = {**context, "phases": self.summary()}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        log.info("Timing report saved: %s", path.name)
+
+        for name, stats in report["phases"].items():
+            log.info(
+                "  %-12s n=%-5d p50=%.2fms p95=%.2fms max=%.2fms total=%.0fms",
+                name,
+                stats["count"],
+                stats["p50_ms"],
+                stats["p95_ms"],
+                stats["max_ms"],
+                stats["total_ms"],
+            )
+
+
+class NullProfiler:
+    """
+    Disabled profiler: every phase is a shared no-op context manager.
+    """
+
+    enabled = False
+
+    def phase(self, name: str) -> _NullPhase:
+        return _NULL_PHASE
+
+    def drain(self) -> Dict[str, List[float]]:
+        return {}
+
+    def merge(self, samples: Dict[str, List[float]]) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+# =========================================================
+# STATS
+# =========================================================
+
+
+def _percentile(sorted_ms: List[float], q: float) -> float:
+    # nearest-rank percentile
+    k = max(0, math.ceil(q / 100 * len(sorted_ms)) - 1)
+    return sorted_ms[k]
+
+
+def _histogram(sorted_ms: List[float]) -> Dict[str, int]:
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    b = 0
+    for v in sorted_ms:
+        while b < len(HISTOGRAM_BOUNDS_MS) and v > HISTOGRAM_BOUNDS_MS[b]:
+            b += 1
+        counts[b] += 1
+
+    labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS]
+    labels.append(f">{HISTOGRAM_BOUNDS_MS[-1]}ms")
+    return dict(zip(labels, counts))
+
+
+def _summarize(samples: array) -> Dict[str, Any]:
+    ms = sorted(s * 1000.0 for s in samples)
+    total = sum(ms)
+    return {
+        "count": len(ms),
+        "total_ms": round(total, 3),
+        "mean_ms": round(total / len(ms), 4),
+        "p50_ms": round(_percentile(ms, 50), 4),
+        "p95_ms": round(_percentile(ms, 95), 4),
+        "max_ms": round(ms[-1], 4),
+        "histogram": _histogram(ms),
+    }
+
+
+def make_profiler(enabled: bool):
+    return FrameProfiler() if enabled else NULL_PROFILER
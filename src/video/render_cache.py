@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .ffmpeg import Rendition, rendition_path
+from ..config.settings import (
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_MAX_MB,
+)
+from ..utils.hashing import cached_sha256_file, sha1, sha256
+from ..utils.logger import get_logger
+
+log = get_logger("render_cache")
+
+# bump when a change alters rendered output without changing any input
+RENDER_CACHE_VERSION = 1
+
+
+# =========================================================
+# FINGERPRINT
+# =========================================================
+
+
+def job_rng(puzzle_id: str) -> random.Random:
+    """
+    RNG seeded from the puzzle id, so asset picks are reproducible.
+    """
+    return random.Random(int(sha1(puzzle_id)[:16], 16))
+
+
+def image_digest(img: Image.Image) -> str:
+    h = hashlib.sha256(f"{img.mode}|{img.size}".encode("utf-8"))
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def file_digest(path: Optional[Path]) -> Optional[str]:
+    return cached_sha256_file(path) if path is not None else None
+
+
+def fingerprint(parts: Dict[str, Any]) -> str:
+    """
+    Stable hash of a JSON-serializable description of a render.
+    """
+    payload = json.dumps(
+        {"version": RENDER_CACHE_VERSION, **parts},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return sha256(payload)
+
+
+# =========================================================
+# ON-DISK CACHE (LRU BY MTIME)
+# =========================================================
+
+
+@dataclass(frozen=True)
+class CachedRender:
+    video: Path
+    meta: Path
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class RenderCache:
+    """
+    Finished MP4 + metadata pairs (plus any renditions, <key>.<name>.mp4)
+    keyed by job fingerprint.
+
+    Entries are hard-linked in and out of the cache (copied when linking
+    is not possible), so hits cost a couple of filesystem calls. Access
+    refreshes an entry's mtime; store() evicts least recently used entries
+    until the cache fits in `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        root: Path = RENDER_CACHE_DIR,
+        max_bytes: int = RENDER_CACHE_MAX_MB * 1024 * 1024,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.mp4", self.root / f"{key}.json"
+
+    def _pairs(
+        self,
+        key: str,
+        video: Path,
+        meta: Path,
+        renditions: Sequence[Rendition],
+    ) -> List[Tuple[Path, Path]]:
+        """
+        (cached, outside) path pairs for every file of one entry.
+        """
+        cached_video, cached_meta = self._paths(key)
+        pairs = [(cached_video, video), (cached_meta, meta)]
+        pairs += [
+            (rendition_path(cached_video, r), rendition_path(video, r))
+            for r in renditions
+        ]
+        return pairs
+
+    def fetch(
+        self,
+        key: str,
+        out_video: Path,
+        out_meta: Path,
+        renditions: Sequence[Rendition] = (),
+    ) -> Optional[CachedRender]:
+        if not self.enabled:
+            return None
+
+        pairs = self._pairs(key, out_video, out_meta, renditions)
+        if not all(cached.exists() for cached, _ in pairs):
+            return None
+
+        try:
+            for cached, out in pairs:
+                _link_or_copy(cached, out)
+                os.utime(cached)
+        except OSError as e:
+            log.warning("Render cache entry %s unusable: %s", key[:12], e)
+            return None
+
+        log.info("Render cache hit: %s", key[:12])
+        return CachedRender(video=out_video, meta=out_meta)
+
+    def store(
+        self,
+        key: str,
+        video: Path,
+        meta: Path,
+        renditions: Sequence[Rendition] = (),
+    ) -> None:
+        if not self.enabled:
+            return
+
+        try:
+            for cached, src in self._pairs(key, video, meta, renditions):
+                _link_or_copy(src, cached)
+        except OSError as e:
+            log.warning("Could not store render %s in cache: %s", key[:12], e)
+            return
+
+        log.info("Render cached: %s", key[:12])
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, List[Path]]]:
+        # every file of an entry starts with "<key>."
+        groups: Dict[str, List[Path]] = {}
+        for f in self.root.iterdir():
+            if f.is_file():
+                groups.setdefault(f.name.split(".", 1)[0], []).append(f)
+
+        entries = []
+        for files in groups.values():
+            try:
+                stats = [f.stat() for f in files]
+            except OSError:
+                continue
+            entries.append(
+                (
+                    max(s.st_mtime for s in stats),
+                    sum(s.st_size for s in stats),
+                    files,
+                )
+            )
+        return sorted(entries)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Drop least recently used entries until the cache fits in
+        `max_bytes`; the entry `keep` (one in use) is never dropped.
+        """
+        if not self.root.exists():
+            return
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, files in entries:
+            if total <= self.max_bytes:
+                break
+            key = files[0].name.split(".", 1)[0]
+            if key == keep:
+                continue
+            _unlink_all(files)
+            total -= size
+            log.info("Evicted %s from %s", key[:12], self.root.name)
+
+
+def _unlink_all(files: Iterable[Path]) -> None:
+    for f in files:
+        f.unlink(missing_ok=True)
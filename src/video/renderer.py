@@ -2,29 +2,78 @@ from __future__ import annotations
 
 import json
 import random
-import shutil
 import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 
 from PIL import Image
 
-from .compositor import QuizCompositor
-from .ffmpeg import frames_to_mp4
+from .assets import get_asset_catalog
+from .backends import FrameBytes
+from .checkpoint import (
+    MODE_CHUNKS,
+    MODE_PNG,
+    CheckpointedSink,
+    ChunkedFrameSink,
+    RenderCheckpoint,
+    cleanup_orphans,
+)
+from .ffmpeg import (
+    FFmpegPipeWriter,
+    Rendition,
+    frames_to_mp4,
+    parse_renditions,
+    rendition_path,
+)
+from .music import prepare_music_or_original
+from .outro import cached_outro
+from .parallel import CompositorSpec, iter_frames_parallel
+from .profiling import NULL_PROFILER, make_profiler
+from .render_cache import (
+    RenderCache,
+    file_digest,
+    fingerprint,
+    image_digest,
+    job_rng,
+)
+from .segments import Segment, SegmentedFrameSink
+from .sinks import FrameSink, PngFrameSink, PipeFrameSink
 from ..config.settings import (
-    ASSETS_DIR,
     VIDEO_OUTPUT_DIR,
     META_OUTPUT_DIR,
     CACHE_DIR,
+    ENABLE_BACKGROUND_MUSIC,
     TIMER_SECONDS,
+    ENTRY_ANIMATION_DURATION,
+    IMAGE_STAGGER_DELAY,
+    FONT_PRIMARY,
+    FONT_SECONDARY,
+    MUSIC_VOLUME,
+    MUSIC_FADE_IN,
+    MUSIC_FADE_OUT,
+    COMPOSITOR_BACKEND,
     FPS,
+    VIDEO_WIDTH,
+    VIDEO_HEIGHT,
+    STREAM_ENCODE,
+    SEGMENT_ENCODE,
+    SEGMENT_MIN_HOLD_FRAMES,
+    RENDER_WORKERS,
+    RENDER_MAX_IN_FLIGHT,
+    RENDER_PROFILE,
+    RENDER_CHECKPOINT_FRAMES,
+    RENDITIONS,
+    OUTRO_CACHE,
 )
 from ..utils.logger import get_logger
 
 log = get_logger("renderer")
 
+ENCODE_CRF = 20
+ENCODE_PRESET = "medium"
+
 
 # =========================================================
 # DATA MODEL
@@ -49,36 +98,70 @@ class RenderJob:
 # =========================================================
 
 
-def _list_files(dir_path: Path, exts: tuple[str, ...]) -> list[Path]:
-    if not dir_path.exists():
-        return []
-    return [p for p in dir_path.rglob("*") if p.is_file() and p.suffix.lower() in exts]
+def pick_background(rng: Optional[random.Random] = None) -> Image.Image:
+    return get_asset_catalog().random_background(rng)
 
 
-def pick_background() -> Image.Image:
-    bg_dir = ASSETS_DIR / "backgrounds"
-    candidates = _list_files(bg_dir, (".jpg", ".jpeg", ".png", ".webp"))
+def pick_music(rng: Optional[random.Random] = None) -> Optional[Path]:
+    return get_asset_catalog().random_music(rng)
 
-    if not candidates:
-        log.warning("No background images found, using fallback color")
-        return Image.new("RGB", (1080, 1920), (10, 10, 14))
 
-    chosen = random.choice(candidates)
-    log.info("Background selected: %s", chosen.name)
-    return Image.open(chosen).convert("RGB")
-
-
-def pick_music() -> Optional[Path]:
-    music_dir = ASSETS_DIR / "music"
-    candidates = _list_files(music_dir, (".mp3", ".wav", ".m4a", ".aac"))
+# =========================================================
+# JOB FINGERPRINT
+# =========================================================
 
-    if not candidates:
-        log.info("No background music found")
-        return None
 
-    chosen = random.choice(candidates)
-    log.info("Music selected: %s", chosen.name)
-    return chosen
+def job_fingerprint(
+    job: RenderJob,
+    background: Optional[Path],
+    music: Optional[Path],
+    renditions: Sequence[Rendition] = (),
+) -> str:
+    """
+    Hash of everything that determines the rendered video + metadata.
+    """
+    catalog = get_asset_catalog()
+    branding = [catalog.logo_path(), *catalog.icon_paths().values()]
+
+    return fingerprint(
+        {
+            "job": {
+                "puzzle_id": job.puzzle_id,
+                "hook": job.hook,
+                "instruction": job.instruction,
+                "items": job.items,
+                "duration_seconds": job.duration_seconds,
+                "title": job.title,
+                "description": job.description,
+                "tags": job.tags or [],
+            },
+            "images": [image_digest(img) for img in job.images],
+            "background": file_digest(background),
+            "music": file_digest(music) if ENABLE_BACKGROUND_MUSIC else None,
+            "branding": [file_digest(p) if p.exists() else None for p in branding],
+            "fonts": [file_digest(FONT_PRIMARY), file_digest(FONT_SECONDARY)],
+            "timing": {
+                "size": [VIDEO_WIDTH, VIDEO_HEIGHT],
+                "fps": FPS,
+                "timer_seconds": TIMER_SECONDS,
+                "entry_animation": ENTRY_ANIMATION_DURATION,
+                "stagger": IMAGE_STAGGER_DELAY,
+            },
+            "audio": {
+                "volume": MUSIC_VOLUME,
+                "fade_in": MUSIC_FADE_IN,
+                "fade_out": MUSIC_FADE_OUT,
+            },
+            "encoder": {
+                "crf": ENCODE_CRF,
+                "preset": ENCODE_PRESET,
+                "backend": COMPOSITOR_BACKEND,
+                "segmented": STREAM_ENCODE and SEGMENT_ENCODE,
+                "outro_cache": OUTRO_CACHE,
+            },
+            "renditions": [vars(r) for r in renditions],
+        }
+    )
 
 
 # =========================================================
@@ -86,6 +169,10 @@ def pick_music() -> Optional[Path]:
 # =========================================================
 
 
+def safe_job_id(puzzle_id: str) -> str:
+    return "".join(c for c in puzzle_id if c.isalnum() or c in ("-", "_"))
+
+
 def _now_stamp() -> str:
     return datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
@@ -105,7 +192,11 @@ def build_default_description(job: RenderJob) -> str:
     )
 
 
-def save_metadata(meta_path: Path, job: RenderJob) -> None:
+def save_metadata(
+    meta_path: Path,
+    job: RenderJob,
+    renditions: Sequence[Rendition] = (),
+) -> None:
     meta = {
         "puzzle_id": job.puzzle_id,
         "hook": job.hook,
@@ -116,6 +207,10 @@ def save_metadata(meta_path: Path, job: RenderJob) -> None:
         "title": job.title,
         "description": job.description,
         "tags": job.tags or [],
+        "renditions": [
+            {"name": r.name, "width": r.width, "height": r.height, "audio": r.audio}
+            for r in renditions
+        ],
     }
 
     meta_path.parent.mkdir(parents=True, exist_ok=True)
@@ -124,17 +219,245 @@ def save_metadata(meta_path: Path, job: RenderJob) -> None:
 
 
 # =========================================================
-# RENDER (STREAMING TO DISK)
+# FRAME LOOP
+# =========================================================
+
+
+def _iter_frames(
+    spec: CompositorSpec,
+    profiler=NULL_PROFILER,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[FrameBytes]:
+    """
+    Raw RGB frames [start, stop) in order (default: to the end), from a
+    process pool when RENDER_WORKERS > 1.
+
+    Each buffer is only valid until the next one is requested.
+    """
+    if RENDER_WORKERS > 1:
+        yield from iter_frames_parallel(
+            spec,
+            workers=RENDER_WORKERS,
+            max_in_flight=RENDER_MAX_IN_FLIGHT,
+            profiler=profiler,
+            start=start,
+            stop=stop,
+        )
+        return
+
+    log.info("Initializing compositor")
+    comp = spec.build(profiler)
+    changes = comp.frame_changes()
+    log.info(
+        "Distinct frames: %d/%d (held frames re-send the previous buffer)",
+        sum(changes),
+        comp.total_frames,
+    )
+
+    frame: Optional[FrameBytes] = None
+    for i in range(start, comp.total_frames if stop is None else stop):
+        if frame is None or changes[i]:
+            frame = comp.render_frame_buffer(i / comp.fps)
+        yield frame
+
+
+def _render_frames(
+    spec: CompositorSpec,
+    sink: FrameSink,
+    profiler=NULL_PROFILER,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> None:
+    """
+    Render frames [start, stop) in order into the sink (never held in a
+    list).
+    """
+    total_frames = spec.total_frames if stop is None else stop
+    frames = _iter_frames(spec, profiler, start, stop)
+    sink_phase = profiler.phase("sink")
+    start_time = time.time()
+    last_log_pct = -1
+    tick = time.time()
+
+    try:
+        # choose logging granularity
+        # - keep it clean: log each 10% + periodic ETA
+        for i, frame in enumerate(frames, start):
+            with sink_phase:
+                sink.write(frame)
+
+            # progress logging every 10%
+            pct = int((i + 1) * 100 / total_frames)
+            if pct % 10 == 0 and pct != last_log_pct:
+                elapsed = max(0.001, time.time() - start_time)
+                fps_eff = (i + 1 - start) / elapsed
+                remaining_frames = total_frames - (i + 1)
+                eta_sec = int(remaining_frames / max(0.1, fps_eff))
+
+                log.info(
+                    "Frame render progress: %d%% (%d/%d) | %.2f fps | ETA ~%ds",
+                    pct,
+                    i + 1,
+                    total_frames,
+                    fps_eff,
+                    eta_sec,
+                )
+                last_log_pct = pct
+
+            # small heartbeat every ~5 seconds (helps when 10% steps are slow)
+            if time.time() - tick >= 5:
+                log.info("Rendering... frame %d/%d", i + 1, total_frames)
+                tick = time.time()
+
+        sink.close()
+
+    except BaseException:
+        frames.close()
+        sink.abort()
+        raise
+
+    log.info("Frame rendering completed")
+
+
+def _render_streaming(
+    spec: CompositorSpec,
+    out_video: Path,
+    music: Optional[Path],
+    checkpoint: RenderCheckpoint,
+    profiler=NULL_PROFILER,
+    renditions: Sequence[Rendition] = (),
+    outro: Optional[Segment] = None,
+) -> None:
+    """
+    Frames + music → ffmpeg → final mp4 (one process, no intermediates).
+
+    With RENDER_CHECKPOINT_FRAMES > 0 frames go into resumable chunks that
+    are joined by a stream copy instead, ending with the cached `outro`
+    (whose frames are then not rendered).
+    """
+    if RENDER_CHECKPOINT_FRAMES > 0:
+        stop = spec.outro_start_frame if outro is not None else None
+        start = checkpoint.begin(MODE_CHUNKS, renditions, stop)
+        sink = ChunkedFrameSink(
+            checkpoint,
+            out_video,
+            fps=FPS,
+            chunk_frames=RENDER_CHECKPOINT_FRAMES,
+            width=VIDEO_WIDTH,
+            height=VIDEO_HEIGHT,
+            crf=ENCODE_CRF,
+            preset=ENCODE_PRESET,
+            music_file=music,
+            renditions=renditions,
+            tail=outro,
+        )
+        _render_frames(spec, sink, profiler, start, stop)
+        return
+
+    writer = FFmpegPipeWriter(
+        out_video,
+        fps=FPS,
+        width=VIDEO_WIDTH,
+        height=VIDEO_HEIGHT,
+        crf=ENCODE_CRF,
+        preset=ENCODE_PRESET,
+        music_file=music,
+        duration_seconds=spec.duration_seconds,
+        renditions=renditions,
+    )
+
+    _render_frames(spec, PipeFrameSink(writer.open()), profiler)
+
+
+def _render_segmented(
+    spec: CompositorSpec,
+    out_video: Path,
+    music: Optional[Path],
+    work_dir: Path,
+    profiler=NULL_PROFILER,
+    renditions: Sequence[Rendition] = (),
+    outro: Optional[Segment] = None,
+) -> None:
+    """
+    Frames → animated segments + still holds (+ cached outro) →
+    stream-copy concat + music.
+    """
+    sink = SegmentedFrameSink(
+        out_video,
+        work_dir,
+        fps=FPS,
+        width=VIDEO_WIDTH,
+        height=VIDEO_HEIGHT,
+        crf=ENCODE_CRF,
+        preset=ENCODE_PRESET,
+        min_hold_frames=SEGMENT_MIN_HOLD_FRAMES,
+        music_file=music,
+        renditions=renditions,
+        tail=outro,
+    )
+
+    stop = spec.outro_start_frame if outro is not None else None
+    _render_frames(spec, sink, profiler, stop=stop)
+
+
+def _render_via_disk(
+    spec: CompositorSpec,
+    out_video: Path,
+    music: Optional[Path],
+    checkpoint: RenderCheckpoint,
+    profiler=NULL_PROFILER,
+    renditions: Sequence[Rendition] = (),
+) -> None:
+    """
+    Frames → PNG sequence → ffmpeg (fallback path, resumable).
+    """
+    start = checkpoint.begin(MODE_PNG)
+    frames_dir = checkpoint.mode_dir
+
+    log.info("Writing frames to: %s", frames_dir)
+    sink = CheckpointedSink(
+        PngFrameSink(frames_dir, start=start),
+        checkpoint,
+        start=start,
+        every=FPS,
+    )
+    _render_frames(spec, sink, profiler, start)
+
+    log.info("Starting FFmpeg encoding")
+    frames_to_mp4(
+        frames_dir=frames_dir,
+        out_mp4=out_video,
+        fps=FPS,
+        music_file=music,
+        crf=ENCODE_CRF,
+        preset=ENCODE_PRESET,
+        duration_seconds=spec.duration_seconds,
+        renditions=renditions,
+    )
+
+
+# =========================================================
+# RENDER
 # =========================================================
 
 
-def render_job_to_mp4(job: RenderJob) -> tuple[Path, Path]:
+def render_job_to_mp4(
+    job: RenderJob,
+    renditions: Optional[Sequence[Rendition]] = None,
+) -> tuple[Path, Path]:
     """
     Render video + metadata with detailed logging.
 
+    `renditions` (default: RENDITIONS setting) are encoded from the same
+    frames and written next to the video as <name>.<rendition>.mp4.
+
     IMPORTANT:
-    - Renders frames directly to disk (RAM-safe for low-memory VPS)
-    - FFmpeg reads frames from disk
+    - Frames are never held in memory (RAM-safe for low-memory VPS)
+    - STREAM_ENCODE pipes raw frames into ffmpeg (SEGMENT_ENCODE splits
+      them into animated segments + still holds); each mode falls back to
+      the next, ending with PNG frames on disk
+    - Identical jobs (same fingerprint) are served from the render cache
     """
     start_time = time.time()
 
@@ -147,22 +470,54 @@ def render_job_to_mp4(job: RenderJob) -> tuple[Path, Path]:
     if not job.description.strip():
         job.description = build_default_description(job)
 
-    bg = pick_background()
-    music = pick_music()
+    if renditions is None:
+        renditions = parse_renditions(RENDITIONS)
+
+    # seeded picks: the same puzzle always gets the same assets
+    catalog = get_asset_catalog()
+    rng = job_rng(job.puzzle_id)
+    bg_path = catalog.choose_background(rng)
+    music = pick_music(rng)
 
     # -------------------------------------
-    # COMPOSITOR INIT
+    # OUTPUT PATHS
     # -------------------------------------
-    log.info("Initializing compositor")
-    comp = QuizCompositor(
+    stamp = _now_stamp()
+    safe_id = safe_job_id(job.puzzle_id)
+    base_name = f"{stamp}_{safe_id}"
+
+    out_video = VIDEO_OUTPUT_DIR / f"{base_name}.mp4"
+    out_meta = META_OUTPUT_DIR / f"{base_name}.json"
+
+    # -------------------------------------
+    # RENDER CACHE
+    # -------------------------------------
+    cache = RenderCache()
+    key = job_fingerprint(job, bg_path, music, renditions)
+    hit = cache.fetch(key, out_video, out_meta, renditions)
+    if hit is not None:
+        elapsed = round(time.time() - start_time, 2)
+        log.info("Render skipped (cached) in %ss", elapsed)
+        log.info("Video output: %s", out_video.name)
+        log.info("========================================")
+        return hit.video, hit.meta
+
+    if ENABLE_BACKGROUND_MUSIC:
+        # pre-transcoded + trimmed AAC, stream-copied by the final mux
+        music = prepare_music_or_original(music, job.duration_seconds)
+
+    # -------------------------------------
+    # COMPOSITOR SPEC
+    # -------------------------------------
+    spec = CompositorSpec(
         hook_text=job.hook,
         instruction_text=job.instruction,
-        images=job.images,
+        images=tuple(job.images),
         duration_seconds=job.duration_seconds,
-        background=bg,
+        background=catalog.load_background(bg_path),
     )
 
-    total_frames = comp.total_frames
+    total_frames = spec.total_frames
     log.info(
         "Rendering %d frames (%ds @ %dfps)",
         total_frames,
@@ -170,91 +525,96 @@ def render_job_to_mp4(job: RenderJob) -> tuple[Path, Path]:
         FPS,
     )
 
-    # -------------------------------------
-    # OUTPUT PATHS
-    # -------------------------------------
-    stamp = _now_stamp()
-    safe_id = "".join(c for c in job.puzzle_id if c.isalnum() or c in ("-", "_"))
-    base_name = f"{stamp}_{safe_id}"
-
-    out_video = VIDEO_OUTPUT_DIR / f"{base_name}.mp4"
-    out_meta = META_OUTPUT_DIR / f"{base_name}.json"
-
-    # temp dirs
-    temp_dir = CACHE_DIR / "tmp" / base_name
-    frames_dir = temp_dir / "frames"
-    frames_dir.mkdir(parents=True, exist_ok=True)
-
-    log.info("Temporary render directory: %s", temp_dir)
-    log.info("Writing frames to: %s", frames_dir)
+    # temp dir is per fingerprint, so a restarted job finds its checkpoint
+    temp_dir = CACHE_DIR / "tmp" / f"{safe_id}_{key[:12]}"
+    checkpoint = RenderCheckpoint.open(temp_dir, key, total_frames)
+    cleanup_orphans(temp_dir.parent, keep=temp_dir)
 
     # -------------------------------------
-    # FRAME RENDERING → DISK (RAM SAFE)
+    # FRAME RENDERING → FFMPEG
     # -------------------------------------
-    last_log_pct = -1
-    tick = time.time()
-
-    # choose logging granularity
-    # - keep it clean: log each 10% + periodic ETA
-    for i in range(total_frames):
-        t = i / FPS
-        frame = comp._render_frame(t)
-
-        # save immediately (do NOT store in list)
-        frame_path = frames_dir / f"frame_{i:05d}.png"
-        frame.save(frame_path, "PNG")
-
-        # progress logging every 10%
-        pct = int((i + 1) * 100 / total_frames)
-        if pct % 10 == 0 and pct != last_log_pct:
-            elapsed = max(0.001, time.time() - start_time)
-            fps_eff = (i + 1) / elapsed
-            remaining_frames = total_frames - (i + 1)
-            eta_sec = int(remaining_frames / max(0.1, fps_eff))
-
-            log.info(
-                "Frame render progress: %d%% (%d/%d) | %.2f fps | ETA ~%ds",
-                pct,
-                i + 1,
-                total_frames,
-                fps_eff,
-                eta_sec,
+    profiler = make_profiler(RENDER_PROFILE)
+    render_start = time.time()
+
+    # the outro only depends on background + branding: encode it once and
+    # stream-copy it onto every chunked/segmented render
+    outro: Optional[Segment] = None
+    joins_segments = SEGMENT_ENCODE or RENDER_CHECKPOINT_FRAMES > 0
+    if OUTRO_CACHE and STREAM_ENCODE and joins_segments and spec.outro_start_frame:
+        try:
+            outro = cached_outro(
+                spec,
+                bg_path,
+                crf=ENCODE_CRF,
+                preset=ENCODE_PRESET,
+                renditions=renditions,
             )
-            last_log_pct = pct
+        except RuntimeError as e:
+            log.warning("Outro cache unavailable, rendering it inline: %s", e)
+
+    modes = []
+    if STREAM_ENCODE and SEGMENT_ENCODE:
+        segments_dir = temp_dir / "segments"
+        modes.append(
+            (
+                "Segmented",
+                lambda: _render_segmented(
+                    spec, out_video, music, segments_dir, profiler, renditions, outro
+                ),
+            )
+        )
+    if STREAM_ENCODE:
+        modes.append(
+            (
+                "Streaming",
+                lambda: _render_streaming(
+                    spec, out_video, music, checkpoint, profiler, renditions, outro
+                ),
+            )
+        )
 
-        # small heartbeat every ~5 seconds (helps when 10% steps are slow)
-        if time.time() - tick >= 5:
-            log.info("Rendering... frame %d/%d", i + 1, total_frames)
-            tick = time.time()
+    streamed = False
+    for mode, render in modes:
+        log.info("%s encode: piping frames directly into FFmpeg", mode)
+        try:
+            render()
+        except RuntimeError as e:
+            log.warning("%s encode failed, falling back: %s", mode, e)
+            continue
 
-    log.info("Frame rendering completed")
+        streamed = True
+        break
+
+    if not streamed:
+        log.info("Temporary render directory: %s", temp_dir)
+        _render_via_disk(spec, out_video, music, checkpoint, profiler, renditions)
 
-    # -------------------------------------
-    # FFMPEG ENCODE (READ FRAMES FROM DISK)
-    # -------------------------------------
-    log.info("Starting FFmpeg encoding")
-    frames_to_mp4(
-        frames_dir=frames_dir,
-        out_mp4=out_video,
-        fps=FPS,
-        music_file=music,
-        crf=20,
-        preset="medium",
-    )
     log.info("FFmpeg encoding completed")
 
     # -------------------------------------
     # METADATA + CLEANUP
     # -------------------------------------
-    save_metadata(out_meta, job)
-
-    log.info("Cleaning up temporary frames")
-    shutil.rmtree(temp_dir, ignore_errors=True)
-    log.info("Temporary directory removed")
+    save_metadata(out_meta, job, renditions)
+    if profiler.enabled:
+        profiler.write_report(
+            out_meta.with_name(f"{base_name}.timing.json"),
+            puzzle_id=job.puzzle_id,
+            frames=total_frames,
+            fps=FPS,
+            backend=COMPOSITOR_BACKEND,
+            workers=RENDER_WORKERS,
+            render_seconds=round(time.time() - render_start, 3),
+        )
+    cache.store(key, out_video, out_meta, renditions)
+
+    log.info("Cleaning up temporary render directory")
+    checkpoint.remove()
 
     elapsed = round(time.time() - start_time, 2)
     log.info("Render finished in %ss", elapsed)
     log.info("Video output: %s", out_video.name)
+    for r in renditions:
+        log.info("Rendition %s: %s", r.name, rendition_path(out_video, r).name)
     log.info("========================================")
 
     return out_video, out_meta
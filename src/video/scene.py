@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from ..config.settings import VIDEO_WIDTH, VIDEO_HEIGHT
+
+# =========================================================
+# TYPES
+# =========================================================
+
+Size = Tuple[int, int]
+
+ALPHA_CACHE_SIZE = 8  # fades are short; 255 is the only hot entry
+
+
+# =========================================================
+# PREPARED TILE
+# =========================================================
+
+
+@dataclass
+class PreparedTile:
+    """
+    Image resampled once to its display size.
+
+    `fade_in` yields at most 256 alpha levels, so per-alpha variants are
+    kept in a small LRU instead of re-running putalpha every frame.
+    """
+
+    rgba: Image.Image
+    max_cached: int = ALPHA_CACHE_SIZE
+    _by_alpha: "OrderedDict[int, Image.Image]" = field(
+        default_factory=OrderedDict, repr=False
+    )
+
+    @classmethod
+    def from_image(cls, img: Image.Image, size: Size) -> "PreparedTile":
+        return cls(rgba=img.resize(size).convert("RGBA"))
+
+    @property
+    def size(self) -> Size:
+        return self.rgba.size
+
+    def with_alpha(self, alpha: int) -> Image.Image:
+        """
+        RGBA copy with a uniform alpha channel (treat as read-only).
+        """
+        cached = self._by_alpha.get(alpha)
+        if cached is not None:
+            self._by_alpha.move_to_end(alpha)
+            return cached
+
+        img = self.rgba.copy()
+        img.putalpha(alpha)
+
+        self._by_alpha[alpha] = img
+        if len(self._by_alpha) > self.max_cached:
+            self._by_alpha.popitem(last=False)
+        return img
+
+
+# =========================================================
+# PREPARED SCENE
+# =========================================================
+
+
+@dataclass
+class PreparedScene:
+    """
+    Everything a compositor pastes, decoded and resized once per job.
+    """
+
+    background: Image.Image
+    tiles: List[PreparedTile]
+    logo: Optional[PreparedTile] = None
+    icons: Dict[str, PreparedTile] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        background: Image.Image,
+        images: List[Image.Image],
+        tile_size: Size,
+        size: Size = (VIDEO_WIDTH, VIDEO_HEIGHT),
+        logo: Optional[Image.Image] = None,
+        logo_size: Size = (120, 120),
+        icons: Optional[Dict[str, Image.Image]] = None,
+        icon_size: Size = (80, 80),
+    ) -> "PreparedScene":
+        # catalog backgrounds arrive pre-resized (and are never mutated)
+        if background.size != size:
+            background = background.resize(size)
+
+        return cls(
+            background=background,
+            tiles=[PreparedTile.from_image(img, tile_size) for img in images],
+            logo=PreparedTile.from_image(logo, logo_size) if logo else None,
+            icons={
+                name: PreparedTile.from_image(icon, icon_size)
+                for name, icon in (icons or {}).items()
+            },
+        )
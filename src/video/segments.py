@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .ffmpeg import (
+    FFmpegPipeWriter,
+    FrameBytes,
+    Rendition,
+    _ensure_dir,
+    _music_input_args,
+    _music_output_args,
+    _output_args,
+    _run,
+    rendition_path,
+    segment_args,
+)
+from ..config.settings import VIDEO_WIDTH, VIDEO_HEIGHT
+from ..utils.logger import get_logger
+
+log = get_logger("segments")
+
+
+# =========================================================
+# SEGMENT MODEL
+# =========================================================
+
+
+@dataclass
+class Segment:
+    path: Path
+    frames: int
+    static: bool
+
+
+# =========================================================
+# STATIC SEGMENT (ONE STILL, LOOPED)
+# =========================================================
+
+
+def encode_still_segment(
+    still: FrameBytes,
+    frames: int,
+    out_mp4: Path,
+    *,
+    fps: int,
+    width: int = VIDEO_WIDTH,
+    height: int = VIDEO_HEIGHT,
+    crf: int = 20,
+    preset: str = "medium",
+    renditions: Sequence[Rendition] = (),
+) -> None:
+    """
+    Encode `frames` copies of one raw RGB frame (input looped by ffmpeg).
+    """
+    _ensure_dir(out_mp4.parent)
+
+    still_path = out_mp4.with_suffix(".rgb")
+    still_path.write_bytes(still)
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        f"{width}x{height}",
+        "-framerate",
+        str(fps),
+        "-stream_loop",
+        "-1",
+        "-i",
+        str(still_path),
+        *_output_args(
+            out_mp4,
+            crf=crf,
+            preset=preset,
+            renditions=renditions,
+            extra_args=["-frames:v", str(frames), *segment_args(fps)],
+            faststart=False,
+        ),
+    ]
+
+    try:
+        _run(cmd)
+    finally:
+        still_path.unlink(missing_ok=True)
+
+
+# =========================================================
+# CONCAT (STREAM COPY)
+# =========================================================
+
+
+def concat_segments(
+    segments: List[Segment],
+    out_mp4: Path,
+    *,
+    music_file: Optional[Path] = None,
+    duration_seconds: Optional[float] = None,
+) -> None:
+    """
+    Join segments with the concat demuxer without re-encoding video,
+    adding music in the same pass.
+    """
+    _ensure_dir(out_mp4.parent)
+
+    list_file = out_mp4.with_suffix(".concat.txt")
+    list_file.write_text(
+        "".join(f"file '{seg.path.resolve()}'\n" for seg in segments),
+        encoding="utf-8",
+    )
+
+    music_args = _music_input_args(music_file, duration_seconds)
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        *music_args,
+        "-c:v",
+        "copy",
+        *(_music_output_args(1, music_file) if music_args else []),
+        "-movflags",
+        "+faststart",
+        str(out_mp4),
+    ]
+
+    try:
+        _run(cmd)
+    finally:
+        list_file.unlink(missing_ok=True)
+
+
+def concat_renditions(
+    segments: List[Segment],
+    out_mp4: Path,
+    renditions: Sequence[Rendition],
+    *,
+    music_file: Optional[Path] = None,
+    duration_seconds: Optional[float] = None,
+) -> None:
+    """
+    concat_segments for the main output and each rendition; every segment
+    was encoded with its renditions alongside (see rendition_path).
+    """
+    concat_segments(
+        segments,
+        out_mp4,
+        music_file=music_file,
+        duration_seconds=duration_seconds,
+    )
+    for r in renditions:
+        concat_segments(
+            [
+                Segment(rendition_path(s.path, r), frames=s.frames, static=s.static)
+                for s in segments
+            ],
+            rendition_path(out_mp4, r),
+            music_file=music_file if r.audio else None,
+            duration_seconds=duration_seconds,
+        )
+
+
+# =========================================================
+# SEGMENTING FRAME SINK
+# =========================================================
+
+
+class SegmentedFrameSink:
+    """
+    Frame sink that encodes animated runs and static holds separately.
+
+    A frame followed by at least `min_hold_frames - 1` identical frames
+    becomes a static segment encoded from a single still; everything else
+    is piped into an animated segment. All segments share encoder
+    parameters and each starts on a keyframe, so close() can join them
+    with a stream copy.
+
+    Held frames are detected by identity (the renderer re-sends the same
+    buffer) with a byte comparison as the fallback.
+    """
+
+    def __init__(
+        self,
+        out_mp4: Path,
+        work_dir: Path,
+        *,
+        fps: int,
+        width: int = VIDEO_WIDTH,
+        height: int = VIDEO_HEIGHT,
+        crf: int = 20,
+        preset: str = "medium",
+        min_hold_frames: int = 15,
+        music_file: Optional[Path] = None,
+        renditions: Sequence[Rendition] = (),
+        tail: Optional[Segment] = None,
+    ) -> None:
+        self.out_mp4 = out_mp4
+        self.work_dir = work_dir
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.crf = crf
+        self.preset = preset
+        self.min_hold_frames = max(2, min_hold_frames)
+        self.music_file = music_file
+        self.renditions = tuple(renditions)
+        self.tail = tail  # pre-encoded segment appended on close (not owned)
+
+        self.segments: List[Segment] = []
+        self._writer: Optional[FFmpegPipeWriter] = None
+        self._writer_frames = 0
+
+        # current run: one distinct frame + how many times it is shown
+        self._run_src: Optional[FrameBytes] = None
+        self._run_frame: Optional[bytes] = None
+        self._run_count = 0
+
+        _ensure_dir(self.work_dir)
+
+    # -----------------------------------------------------
+    # FRAME SINK
+    # -----------------------------------------------------
+
+    def write(self, frame: FrameBytes) -> None:
+        if self._run_frame is not None and (
+            frame is self._run_src or frame == self._run_frame
+        ):
+            self._run_count += 1
+            return
+
+        self._flush_run()
+        self._run_src = frame
+        self._run_frame = bytes(frame)
+        self._run_count = 1
+
+    def close(self) -> None:
+        self._flush_run()
+        self._close_animated()
+
+        if not self.segments:
+            raise RuntimeError("No frames were written")
+        if self.tail is not None:
+            self.segments.append(self.tail)
+
+        static = [s for s in self.segments if s.static]
+        log.info(
+            "Joining %d segments (%d static holds, %d/%d frames from stills)",
+            len(self.segments),
+            len(static),
+            sum(s.frames for s in static),
+            sum(s.frames for s in self.segments),
+        )
+        total_frames = sum(s.frames for s in self.segments)
+        concat_renditions(
+            self.segments,
+            self.out_mp4,
+            self.renditions,
+            music_file=self.music_file,
+            duration_seconds=total_frames / self.fps,
+        )
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    # -----------------------------------------------------
+    # RUNS → SEGMENTS
+    # -----------------------------------------------------
+
+    def _next_path(self) -> Path:
+        return self.work_dir / f"seg_{len(self.segments):04d}.mp4"
+
+    def _flush_run(self) -> None:
+        if self._run_frame is None:
+            return
+
+        frame, count = self._run_frame, self._run_count
+        self._run_src = self._run_frame = None
+        self._run_count = 0
+
+        if count >= self.min_hold_frames:
+            self._close_animated()
+            path = self._next_path()
+            encode_still_segment(
+                frame,
+                count,
+                path,
+                fps=self.fps,
+                width=self.width,
+                height=self.height,
+                crf=self.crf,
+                preset=self.preset,
+                renditions=self.renditions,
+            )
+            self.segments.append(Segment(path=path, frames=count, static=True))
+            return
+
+        writer = self._animated_writer()
+        for _ in range(count):
+            writer.write(frame)
+        self._writer_frames += count
+
+    def _animated_writer(self) -> FFmpegPipeWriter:
+        if self._writer is None:
+            self._writer = FFmpegPipeWriter(
+                self._next_path(),
+                fps=self.fps,
+                width=self.width,
+                height=self.height,
+                crf=self.crf,
+                preset=self.preset,
+                extra_args=segment_args(self.fps),
+                renditions=self.renditions,
+            ).open()
+            self._writer_frames = 0
+        return self._writer
+
+    def _close_animated(self) -> None:
+        if self._writer is None:
+            return
+
+        writer, self._writer = self._writer, None
+        writer.close()
+        self.segments.append(
+            Segment(path=writer.out_mp4, frames=self._writer_frames, static=False)
+        )
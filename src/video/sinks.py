@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Protocol, Tuple
+
+from PIL import Image
+
+from .ffmpeg import FFmpegPipeWriter, FrameBytes
+from ..config.settings import VIDEO_WIDTH, VIDEO_HEIGHT
+
+# =========================================================
+# TYPES
+# =========================================================
+
+Frame = Image.Image
+Size = Tuple[int, int]
+
+
+class FrameSink(Protocol):
+    """
+    Destination for rendered frames (raw RGB24 buffers), in frame order.
+    """
+
+    def write(self, frame: FrameBytes) -> None: ...
+
+    def close(self) -> None: ...
+
+    def abort(self) -> None: ...
+
+
+# =========================================================
+# DISK (PNG SEQUENCE)
+# =========================================================
+
+
+class PngFrameSink:
+    """
+    Writes frame_00000.png, frame_00001.png, ... for encode_video_from_frames.
+    """
+
+    def __init__(
+        self,
+        frames_dir: Path,
+        size: Size = (VIDEO_WIDTH, VIDEO_HEIGHT),
+        start: int = 0,
+    ) -> None:
+        self.frames_dir = frames_dir
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.index = start
+
+    def write(self, frame: FrameBytes) -> None:
+        img = Image.frombuffer("RGB", self.size, frame, "raw", "RGB", 0, 1)
+        path = self.frames_dir / f"frame_{self.index:05d}.png"
+
+        # rename into place so a crash never leaves a truncated frame
+        tmp = path.with_suffix(".tmp")
+        img.save(tmp, "PNG")
+        tmp.replace(path)
+        self.index += 1
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        pass
+
+
+# =========================================================
+# FFMPEG STDIN (RAW RGB)
+# =========================================================
+
+
+class PipeFrameSink:
+    """
+    Streams raw RGB bytes into a running FFmpegPipeWriter (no copies).
+    """
+
+    def __init__(self, writer: FFmpegPipeWriter) -> None:
+        self.writer = writer
+
+    def write(self, frame: FrameBytes) -> None:
+        self.writer.write(frame)
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def abort(self) -> None:
+        self.writer.abort()
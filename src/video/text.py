@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# =========================================================
+# TYPES
+# =========================================================
+
+Point = Tuple[int, int]
+Color = Tuple[int, int, int]
+SpriteKey = Tuple[str, str, int, Color]
+
+TEXT_SPRITE_CACHE_SIZE = 256
+
+
+# =========================================================
+# SPRITE
+# =========================================================
+
+
+@dataclass(frozen=True)
+class TextSprite:
+    """
+    Pre-rasterized text: an RGBA image whose alpha is glyph coverage.
+
+    `offset` is the ink bbox origin relative to the draw origin, so pasting
+    at (x + offset[0], y + offset[1]) matches draw.multiline_text((x, y)).
+    """
+
+    image: Image.Image
+    offset: Point
+
+    @property
+    def width(self) -> int:
+        return self.image.width
+
+    @property
+    def height(self) -> int:
+        return self.image.height
+
+    def with_alpha(self, alpha: int) -> Image.Image:
+        """
+        Sprite with its coverage scaled by alpha/255 (treat as read-only).
+        """
+        if alpha >= 255:
+            return self.image
+
+        img = self.image.copy()
+        coverage = img.getchannel("A")
+        img.putalpha(coverage.point(lambda v: v * alpha // 255))
+        return img
+
+
+def _rasterize(text: str, font: ImageFont.FreeTypeFont, color: Color) -> TextSprite:
+    probe = ImageDraw.Draw(Image.new("L", (1, 1)))
+    bbox = probe.multiline_textbbox((0, 0), text, font=font, align="center")
+
+    # Pillow may report float bounds; keep the draw origin integral so
+    # per-line sub-pixel offsets match a direct multiline_text call
+    left, top = math.floor(bbox[0]), math.floor(bbox[1])
+    right, bottom = math.ceil(bbox[2]), math.ceil(bbox[3])
+    size = (max(1, right - left), max(1, bottom - top))
+
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).multiline_text(
+        (-left, -top), text, font=font, fill=255, align="center"
+    )
+
+    image = Image.new("RGBA", size, (*color, 0))
+    image.putalpha(mask)
+    return TextSprite(image=image, offset=(left, top))
+
+
+# =========================================================
+# PROCESS-WIDE LRU
+# =========================================================
+
+
+class TextSpriteCache:
+    """
+    LRU of rasterized strings keyed by (text, font file, font size, color).
+
+    One instance is shared per process so batch renders reuse timer and
+    outro sprites across jobs.
+    """
+
+    def __init__(self, max_entries: int = TEXT_SPRITE_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[SpriteKey, TextSprite]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, font: ImageFont.FreeTypeFont, color: Color) -> SpriteKey:
+        return (text, str(font.path), int(font.size), tuple(color))
+
+    def get(
+        self,
+        text: str,
+        font: ImageFont.FreeTypeFont,
+        color: Color = (255, 255, 255),
+    ) -> TextSprite:
+        key = self.key(text, font, color)
+
+        with self._lock:
+            sprite = self._entries.get(key)
+            if sprite is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return sprite
+
+        sprite = _rasterize(text, font, color)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = sprite
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return sprite
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: Optional[TextSpriteCache] = None
+
+
+def get_text_sprite_cache() -> TextSpriteCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = TextSpriteCache()
+    return _CACHE
+
+
+def text_sprite(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    color: Color = (255, 255, 255),
+) -> TextSprite:
+    return get_text_sprite_cache().get(text, font, color)
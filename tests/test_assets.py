@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from src.video.assets import AssetCatalog
+
+SIZE = (36, 64)
+
+
+def _catalog(tmp_path: Path) -> AssetCatalog:
+    return AssetCatalog(tmp_path / "assets", tmp_path / "cache", size=SIZE)
+
+
+def _background(catalog: AssetCatalog, name: str, color, size=(90, 160)) -> Path:
+    path = catalog.assets_dir / "backgrounds" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path)
+    return path
+
+
+def _raw_files(catalog: AssetCatalog) -> list[str]:
+    return sorted(f.name for f in catalog.cache_dir.glob("*.rgb"))
+
+
+def test_background_is_cached_raw(tmp_path):
+    catalog = _catalog(tmp_path)
+    path = _background(catalog, "a.png", (200, 40, 40))
+
+    img = catalog.background(path)
+    assert img.size == SIZE
+    assert len(_raw_files(catalog)) == 1
+
+    # a second catalog (another process) reads the raw file
+    again = _catalog(tmp_path).background(path)
+    assert again.tobytes() == img.tobytes()
+
+
+def test_edited_background_replaces_its_cache_file(tmp_path):
+    catalog = _catalog(tmp_path)
+    path = _background(catalog, "a.png", (200, 40, 40))
+    catalog.background(path)
+    before = _raw_files(catalog)
+
+    _background(catalog, "a.png", (10, 200, 40), size=(180, 320))
+    catalog.background(path)
+
+    after = _raw_files(catalog)
+    assert len(after) == 1 and after != before
+
+
+def test_removed_background_is_pruned_on_rescan(tmp_path):
+    catalog = _catalog(tmp_path)
+    keep = _background(catalog, "a.png", (200, 40, 40))
+    gone = _background(catalog, "b.png", (40, 40, 200))
+    catalog.background(keep)
+    catalog.background(gone)
+    assert len(_raw_files(catalog)) == 2
+
+    os.remove(gone)
+    assert catalog.backgrounds() == [keep]
+    assert len(_raw_files(catalog)) == 1
+    assert catalog.background(keep).size == SIZE
+
+
+def test_other_sizes_are_left_alone(tmp_path):
+    catalog = _catalog(tmp_path)
+    path = _background(catalog, "a.png", (200, 40, 40))
+    other = AssetCatalog(catalog.assets_dir, catalog.cache_dir, size=(18, 32))
+    other.background(path)
+
+    catalog.background(path)
+    os.remove(path)
+    catalog.backgrounds()
+
+    assert [f.endswith("_18x32.rgb") for f in _raw_files(catalog)] == [True]
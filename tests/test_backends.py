@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+from PIL import Image
+
+from src.config.settings import ENTRY_ANIMATION_DURATION
+from src.video.compositor import QuizCompositor
+
+np = pytest.importorskip("numpy")
+
+MAX_DIFF = 1  # rounding of the vectorized alpha blend
+
+
+def _images() -> list[Image.Image]:
+    colors = [(200, 40, 40), (40, 160, 60), (40, 80, 200), (220, 180, 30)]
+    images = []
+    for i, color in enumerate(colors):
+        img = Image.new("RGB", (640, 480), color)
+        # a gradient so resampling differences would show up
+        band = Image.linear_gradient("L").resize((640, 120)).convert("RGB")
+        img.paste(band, (0, 60 * i))
+        images.append(img)
+    return images
+
+
+def _compositor(backend: str) -> QuizCompositor:
+    return QuizCompositor(
+        hook_text="Name these 4 things!",
+        instruction_text="All start with A",
+        images=_images(),
+        duration_seconds=12,
+        background=Image.linear_gradient("L").resize((1080, 1920)).convert("RGB"),
+        backend=backend,
+    )
+
+
+def _sample_times(comp: QuizCompositor) -> list[float]:
+    return [
+        0.2,  # hook fading in
+        comp.grid_start + ENTRY_ANIMATION_DURATION / 2,  # tiles mid-slide
+        comp.timer_start + 0.5,  # settled grid + timer
+        comp.outro_start + 0.5,  # outro fading in
+        comp.duration_seconds - 1 / comp.fps,  # outro settled
+    ]
+
+
+def _frames(backend: str) -> list[np.ndarray]:
+    comp = _compositor(backend)
+    shape = (comp.height, comp.width, 3)
+    return [
+        np.frombuffer(bytes(comp.render_frame_buffer(t)), np.uint8).reshape(shape)
+        for t in _sample_times(comp)
+    ]
+
+
+def test_numpy_backend_matches_pil():
+    for i, (pil, fast) in enumerate(zip(_frames("pil"), _frames("numpy"))):
+        diff = np.abs(pil.astype(np.int16) - fast.astype(np.int16)).max()
+        assert diff <= MAX_DIFF, f"sample {i}: max difference {diff}"
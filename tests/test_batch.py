@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from src.pipeline import batch, runner
+from src.pipeline.batch import BatchItem, render_batch
+
+PUZZLES = [{"id": f"p-{i}", "items": [f"item {i}"]} for i in range(3)]
+
+
+@pytest.fixture
+def used_file(tmp_path, monkeypatch):
+    path = tmp_path / "used_puzzles.txt"
+    monkeypatch.setattr(runner, "USED_FILE", path)
+    monkeypatch.setattr(batch, "load_valid_puzzles", lambda: PUZZLES)
+    monkeypatch.setattr(batch, "prefetch_images", lambda items: [])
+    monkeypatch.setattr(
+        batch,
+        "_render_one",
+        lambda puzzle, draft: BatchItem(puzzle["id"], True, 0.0),
+    )
+    return path
+
+
+def _used(path) -> list[str]:
+    return path.read_text().split() if path.exists() else []
+
+
+def test_explicit_ids_are_marked_used_once(used_file, tmp_path):
+    used_file.write_text("p-1\n")
+
+    report = render_batch(
+        puzzle_ids=["p-0", "p-1", "p-0"], report_path=tmp_path / "report.json"
+    )
+
+    assert [it.puzzle_id for it in report.rendered] == ["p-0", "p-1", "p-0"]
+    assert _used(used_file) == ["p-1", "p-0"]
+
+
+def test_count_marks_new_puzzles_used(used_file, tmp_path):
+    used_file.write_text("p-0\n")
+
+    render_batch(count=2, report_path=tmp_path / "report.json")
+
+    assert _used(used_file) == ["p-0", "p-1", "p-2"]
+
+
+def test_drafts_leave_the_used_list_alone(used_file, tmp_path):
+    render_batch(count=2, draft=True, report_path=tmp_path / "report.json")
+    assert _used(used_file) == []
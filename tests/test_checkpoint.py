@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from src.video.checkpoint import (
+    MANIFEST_NAME,
+    MODE_CHUNKS,
+    MODE_PNG,
+    ORPHAN_MIN_AGE_SECONDS,
+    RenderCheckpoint,
+    chunk_path,
+    cleanup_orphans,
+    png_path,
+)
+from src.video.ffmpeg import Rendition, rendition_path
+
+KEY = "job-fingerprint"
+TOTAL = 300
+SMALL = Rendition(name="small", width=540, height=960)
+
+
+def _chunks(tmp_path: Path, frames: list[int], renditions=()) -> RenderCheckpoint:
+    """
+    A chunks-mode checkpoint with stub (non-empty) chunk files on disk.
+    """
+    cp = RenderCheckpoint.open(tmp_path / "job", KEY, TOTAL)
+    cp.begin(MODE_CHUNKS, renditions)
+    for i, n in enumerate(frames):
+        p = chunk_path(cp.mode_dir, i)
+        for q in (p, *(rendition_path(p, r) for r in renditions)):
+            q.write_bytes(b"chunk")
+        cp.add_chunk(n)
+    return cp
+
+
+def _pngs(tmp_path: Path, count: int) -> RenderCheckpoint:
+    cp = RenderCheckpoint.open(tmp_path / "job", KEY, TOTAL)
+    cp.begin(MODE_PNG)
+    for i in range(count):
+        Image.new("RGB", (8, 8), (i, 0, 0)).save(png_path(cp.mode_dir, i))
+    cp.advance(count)
+    return cp
+
+
+def _reopen(
+    cp: RenderCheckpoint, fingerprint: str = KEY, total: int = TOTAL
+) -> RenderCheckpoint:
+    return RenderCheckpoint.open(cp.dir, fingerprint, total)
+
+
+# =========================================================
+# RESUME
+# =========================================================
+
+
+def test_resume_from_complete_chunks(tmp_path):
+    cp = _chunks(tmp_path, [60, 60, 60])
+    assert _reopen(cp).begin(MODE_CHUNKS) == 180
+
+
+def test_missing_or_empty_chunk_is_dropped(tmp_path):
+    cp = _chunks(tmp_path, [60, 60, 60])
+    chunk_path(cp.mode_dir, 1).write_bytes(b"")
+
+    resumed = _reopen(cp)
+    assert resumed.begin(MODE_CHUNKS) == 60
+    assert resumed.chunks == [60]
+
+    cp = _chunks(tmp_path / "other", [60, 60, 60])
+    chunk_path(cp.mode_dir, 2).unlink()
+    assert _reopen(cp).begin(MODE_CHUNKS) == 120
+
+
+def test_chunk_with_missing_rendition_is_dropped(tmp_path):
+    cp = _chunks(tmp_path, [60, 60], renditions=[SMALL])
+    rendition_path(chunk_path(cp.mode_dir, 1), SMALL).unlink()
+    assert _reopen(cp).begin(MODE_CHUNKS, [SMALL]) == 60
+
+
+def test_corrupt_last_png_is_dropped(tmp_path):
+    cp = _pngs(tmp_path, 5)
+    last = png_path(cp.mode_dir, 4)
+    last.write_bytes(last.read_bytes()[:20])
+    assert _reopen(cp).begin(MODE_PNG) == 4
+
+
+def test_resume_stops_at_first_missing_png(tmp_path):
+    cp = _pngs(tmp_path, 5)
+    png_path(cp.mode_dir, 2).unlink()
+    assert _reopen(cp).begin(MODE_PNG) == 2
+
+
+def test_chunks_past_the_outro_stop_are_dropped(tmp_path):
+    cp = _chunks(tmp_path, [60, 60, 60], renditions=[SMALL])
+
+    resumed = _reopen(cp)
+    assert resumed.begin(MODE_CHUNKS, [SMALL], stop=150) == 120
+    assert resumed.chunks == [60, 60]
+    dropped = chunk_path(cp.mode_dir, 2)
+    assert not dropped.exists()
+    assert not rendition_path(dropped, SMALL).exists()
+    assert chunk_path(cp.mode_dir, 1).exists()
+
+
+def test_stop_after_frames_done_keeps_everything(tmp_path):
+    cp = _chunks(tmp_path, [60, 60])
+    assert _reopen(cp).begin(MODE_CHUNKS, stop=240) == 120
+
+
+def test_mode_switch_discards_progress(tmp_path):
+    cp = _chunks(tmp_path, [60, 60])
+    resumed = _reopen(cp)
+    assert resumed.begin(MODE_PNG) == 0
+    assert not (cp.dir / MODE_CHUNKS).exists()
+
+
+# =========================================================
+# INVALIDATION
+# =========================================================
+
+
+def test_fingerprint_mismatch_wipes_the_dir(tmp_path):
+    cp = _chunks(tmp_path, [60, 60])
+    other = _reopen(cp, fingerprint="another-job")
+
+    assert other.begin(MODE_CHUNKS) == 0
+    assert not chunk_path(cp.mode_dir, 0).exists()
+    manifest = json.loads((cp.dir / MANIFEST_NAME).read_text())
+    assert manifest["fingerprint"] == "another-job"
+
+
+def test_total_frames_mismatch_wipes_the_dir(tmp_path):
+    cp = _chunks(tmp_path, [60, 60])
+    assert _reopen(cp, total=TOTAL + 1).begin(MODE_CHUNKS) == 0
+    assert not chunk_path(cp.mode_dir, 0).exists()
+
+
+def test_unreadable_manifest_wipes_the_dir(tmp_path):
+    cp = _chunks(tmp_path, [60])
+    (cp.dir / MANIFEST_NAME).write_text("{not json")
+    assert _reopen(cp).begin(MODE_CHUNKS) == 0
+
+
+# =========================================================
+# ORPHAN CLEANUP
+# =========================================================
+
+
+def _job_dir(root: Path, name: str, pid: int | None, age: float = 0) -> Path:
+    d = root / name
+    d.mkdir(parents=True)
+    if pid is not None:
+        (d / MANIFEST_NAME).write_text(json.dumps({"pid": pid}))
+    if age:
+        past = time.time() - age
+        os.utime(d, (past, past))
+    return d
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_cleanup_orphans(tmp_path):
+    old = ORPHAN_MIN_AGE_SECONDS + 60
+    keep = _job_dir(tmp_path, "current", pid=os.getpid())
+    live = _job_dir(tmp_path, "live", pid=os.getppid())
+    dead = _job_dir(tmp_path, "dead", pid=_dead_pid())
+    recent = _job_dir(tmp_path, "recent", pid=None)
+    stale = _job_dir(tmp_path, "stale", pid=None, age=old)
+
+    cleanup_orphans(tmp_path, keep=keep)
+
+    assert keep.exists()
+    assert live.exists()
+    assert recent.exists()
+    assert not dead.exists()
+    assert not stale.exists()
+
+
+def test_cleanup_removes_own_pid_manifests(tmp_path):
+    # a previous job of this process that was not cleaned up
+    own = _job_dir(tmp_path, "earlier", pid=os.getpid())
+    cleanup_orphans(tmp_path, keep=tmp_path / "current")
+    assert not own.exists()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+from PIL import Image
+
+from src.media.image_index import INDEX_VERSION, ImageCacheIndex, IndexEntry
+
+
+def _image(root: Path, name: str, color=(200, 40, 40)) -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / name
+    Image.new("RGB", (640, 480), color).save(path, format="JPEG")
+    return path
+
+
+def _index(tmp_path: Path) -> ImageCacheIndex:
+    return ImageCacheIndex(tmp_path / "index.sqlite3", tmp_path / "images")
+
+
+# =========================================================
+# ROUND TRIP
+# =========================================================
+
+
+def test_put_lookup_touch_remove(tmp_path):
+    index = _index(tmp_path)
+    path = _image(index.root, "cat.jpg")
+    entry = IndexEntry.for_file(
+        path, source_url="https://img.test/cat.jpg", etag='"v1"', fetched_at=1.0
+    )
+    index.put(entry)
+
+    found = index.lookup(path)
+    assert found == entry
+    assert (found.width, found.height) == (640, 480)
+    assert found.etag == '"v1"'
+
+    index.touch("cat.jpg")
+    touched = index.get("cat.jpg")
+    assert touched.accessed_at >= entry.accessed_at
+    assert touched.fetched_at == 1.0
+
+    index.touch("cat.jpg", fetched=True)
+    assert index.get("cat.jpg").fetched_at > 1.0
+
+    index.remove("cat.jpg")
+    assert index.get("cat.jpg") is None
+    assert index.lookup(path) is None
+
+
+def test_entries_survive_reopening(tmp_path):
+    index = _index(tmp_path)
+    path = _image(index.root, "cat.jpg")
+    index.put(IndexEntry.for_file(path))
+
+    assert _index(tmp_path).lookup(path) is not None
+
+
+# =========================================================
+# CHANGED FILES
+# =========================================================
+
+
+def _rewrite_same_size(path: Path) -> None:
+    """
+    Change one byte in place and restore the old mtime.
+    """
+    st = path.stat()
+    data = bytearray(path.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert path.stat().st_size == st.st_size
+    assert path.stat().st_mtime_ns == st.st_mtime_ns
+
+
+def test_same_size_same_mtime_rewrite_is_rejected(tmp_path):
+    index = _index(tmp_path)
+    path = _image(index.root, "cat.jpg")
+    index.put(IndexEntry.for_file(path))
+
+    _rewrite_same_size(path)
+    assert index.lookup(path) is None
+
+
+def test_replaced_file_is_rejected(tmp_path):
+    index = _index(tmp_path)
+    path = _image(index.root, "cat.jpg")
+    index.put(IndexEntry.for_file(path))
+
+    _image(index.root, "cat.jpg", color=(10, 10, 10))
+    assert index.lookup(path) is None
+
+
+def test_touched_file_is_kept_and_rerecorded(tmp_path):
+    index = _index(tmp_path)
+    path = _image(index.root, "cat.jpg")
+    entry = IndexEntry.for_file(path)
+    index.put(entry)
+
+    later = entry.mtime_ns + 5_000_000_000
+    os.utime(path, ns=(later, later))
+
+    found = index.lookup(path)
+    assert found is not None and found.sha256 == entry.sha256
+    assert index.get("cat.jpg").mtime_ns == later
+
+
+# =========================================================
+# SCHEMA VERSION
+# =========================================================
+
+
+def test_version_mismatch_rebuilds(tmp_path):
+    db = tmp_path / "index.sqlite3"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE images (file TEXT PRIMARY KEY, width INTEGER)")
+    conn.execute("INSERT INTO images VALUES ('stale.jpg', 1)")
+    conn.execute(f"PRAGMA user_version={INDEX_VERSION - 1}")
+    conn.commit()
+    conn.close()
+
+    root = tmp_path / "images"
+    good = _image(root, "cat.jpg")
+    (root / "broken.jpg").write_bytes(b"not an image")
+
+    index = _index(tmp_path)
+
+    assert index.get("stale.jpg") is None
+    assert index.lookup(good) is not None
+    # unreadable files are dropped from the cache directory
+    assert not (root / "broken.jpg").exists()
+    version = sqlite3.connect(db).execute("PRAGMA user_version").fetchone()[0]
+    assert version == INDEX_VERSION
+
+
+def test_current_version_is_not_rebuilt(tmp_path):
+    index = _index(tmp_path)
+    path = _image(index.root, "cat.jpg")
+    index.put(IndexEntry.for_file(path, source_url="https://img.test/cat.jpg"))
+
+    # a rebuild would have lost the source URL
+    reopened = _index(tmp_path)
+    assert reopened.get("cat.jpg").source_url == "https://img.test/cat.jpg"
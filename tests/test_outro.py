@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.video import outro
+from src.video.compositor import OUTRO_SECONDS
+from src.video.ffmpeg import Rendition, output_paths
+
+SMALL = Rendition(name="small", width=540, height=960)
+SEGMENT_BYTES = 1000
+SPEC = SimpleNamespace(fps=30)
+
+
+@pytest.fixture
+def encodes(monkeypatch) -> list[Path]:
+    """
+    Stub encoder (no ffmpeg); the outro key is the background's name.
+    """
+    done: list[Path] = []
+
+    def encode(spec, out_mp4: Path, *, crf, preset, renditions) -> int:
+        for p in output_paths(out_mp4, renditions):
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_bytes(b"o" * SEGMENT_BYTES)
+        done.append(out_mp4)
+        return OUTRO_SECONDS * spec.fps
+
+    monkeypatch.setattr(outro, "_encode_outro", encode)
+    monkeypatch.setattr(outro, "outro_key", lambda spec, bg, **kw: bg.name)
+    return done
+
+
+def _outro(root: Path, key: str, renditions=(), max_bytes=int(2.5 * SEGMENT_BYTES)):
+    return outro.cached_outro(
+        SPEC,
+        Path(key),
+        crf=20,
+        preset="medium",
+        renditions=renditions,
+        root=root,
+        max_bytes=max_bytes,
+    )
+
+
+def _cached(root: Path) -> list[str]:
+    return sorted(f.name for f in root.iterdir() if f.is_file())
+
+
+def test_second_use_is_a_hit(tmp_path, encodes):
+    first = _outro(tmp_path, "a")
+    second = _outro(tmp_path, "a")
+
+    assert first.path == second.path == tmp_path / "a.mp4"
+    assert second.frames == OUTRO_SECONDS * SPEC.fps
+    assert len(encodes) == 1
+    assert not any((tmp_path / "partial").iterdir())
+
+
+def test_least_recently_used_outros_are_evicted(tmp_path, encodes):
+    _outro(tmp_path, "a")
+    _outro(tmp_path, "b")
+    past = time.time() - 300
+    os.utime(tmp_path / "a.mp4", (past, past))
+    os.utime(tmp_path / "b.mp4", (past - 100, past - 100))
+
+    # the hit refreshes "b", so "a" goes when "c" is added
+    _outro(tmp_path, "b")
+    _outro(tmp_path, "c")
+
+    assert _cached(tmp_path) == ["b.mp4", "c.mp4"]
+
+
+def test_renditions_are_evicted_with_their_outro(tmp_path, encodes):
+    _outro(tmp_path, "a", [SMALL], max_bytes=3 * SEGMENT_BYTES)
+    past = time.time() - 300
+    for p in output_paths(tmp_path / "a.mp4", [SMALL]):
+        os.utime(p, (past, past))
+
+    _outro(tmp_path, "b", [SMALL], max_bytes=3 * SEGMENT_BYTES)
+
+    assert _cached(tmp_path) == ["b.mp4", "b.small.mp4"]
+
+
+def test_outro_in_use_is_kept_over_budget(tmp_path, encodes):
+    segment = _outro(tmp_path, "a", max_bytes=SEGMENT_BYTES // 2)
+    assert segment.path.exists()
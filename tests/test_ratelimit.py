@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import pytest
+import requests
+
+from src.media import ratelimit
+from src.media.ratelimit import CircuitOpenError, RateLimiter
+
+URL = "https://upload.test/image.jpg"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        # like a real sleep, always lets some time pass (a sub-ulp delay
+        # would otherwise leave the clock where it was)
+        self.now += max(seconds, 1e-6)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self) -> None:
+        pass
+
+
+class FakeSession:
+    """
+    Plays back `outcomes` (status codes, (status, headers) pairs or
+    exceptions); the last one repeats.
+    """
+
+    def __init__(self, *outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, tuple):
+            return FakeResponse(*outcome)
+        return FakeResponse(outcome)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    # backoff draws its upper bound, so delays are deterministic
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda low, high: high)
+    return clock
+
+
+def _limiter(**kwargs) -> RateLimiter:
+    options = dict(
+        rate=1000,
+        burst=10,
+        max_retries=3,
+        backoff_max=30,
+        breaker_failures=3,
+        breaker_cooldown=60,
+    )
+    return RateLimiter(**{**options, **kwargs})
+
+
+# =========================================================
+# BACKOFF
+# =========================================================
+
+
+def test_retry_after_is_honoured(clock):
+    session = FakeSession((429, {"Retry-After": "7"}), 200)
+    resp = _limiter().request(session, "GET", URL)
+
+    assert resp.status_code == 200
+    assert session.calls == 2
+    assert clock.sleeps[0] == pytest.approx(7)
+
+
+def test_retry_after_is_capped_at_backoff_max(clock):
+    session = FakeSession((429, {"Retry-After": "600"}), 200)
+    _limiter(backoff_max=30).request(session, "GET", URL)
+
+    assert clock.sleeps[0] == pytest.approx(30)
+
+
+def test_backoff_without_retry_after_doubles_up_to_the_cap(clock):
+    session = FakeSession(503, 503, 503, 200)
+    _limiter(backoff_max=3).request(session, "GET", URL)
+
+    # first sleep of each pause: 1s, 2s, then 4s capped to 3s
+    pauses = [s for s in clock.sleeps if s > 0.5]
+    assert pauses == pytest.approx([1, 2, 3])
+
+
+def test_exhausted_retries_raise(clock):
+    session = FakeSession(503)
+    with pytest.raises(RuntimeError, match="HTTP 503 .* after 3 attempt"):
+        _limiter(max_retries=2).request(session, "GET", URL)
+    assert session.calls == 3
+
+
+def test_connection_errors_are_retried(clock):
+    session = FakeSession(requests.ConnectionError("reset"), 200)
+    assert _limiter().request(session, "GET", URL).status_code == 200
+    assert session.calls == 2
+
+
+# =========================================================
+# CIRCUIT BREAKER
+# =========================================================
+
+
+def test_breaker_opens_and_half_opens(clock):
+    limiter = _limiter(max_retries=0, breaker_failures=2, breaker_cooldown=60)
+    failing = FakeSession(503)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            limiter.request(failing, "GET", URL)
+    assert limiter.stats.circuit_opened == 1
+
+    # open: fails without a request
+    with pytest.raises(CircuitOpenError):
+        limiter.request(failing, "GET", URL)
+    assert failing.calls == 2
+
+    # after the cooldown one trial goes through; failing it re-opens
+    clock.now += 60
+    with pytest.raises(RuntimeError):
+        limiter.request(failing, "GET", URL)
+    assert failing.calls == 3
+    with pytest.raises(CircuitOpenError):
+        limiter.request(failing, "GET", URL)
+
+    # a successful trial closes the circuit again
+    clock.now += 60
+    healthy = FakeSession(200)
+    for _ in range(3):
+        assert limiter.request(healthy, "GET", URL).status_code == 200
+    assert healthy.calls == 3
+    assert limiter.stats.circuit_opened == 2
+
+
+def test_non_retryable_error_settles_the_trial(clock):
+    limiter = _limiter(max_retries=0, breaker_failures=1, breaker_cooldown=60)
+    with pytest.raises(RuntimeError):
+        limiter.request(FakeSession(503), "GET", URL)
+
+    clock.now += 60
+    with pytest.raises(requests.TooManyRedirects):
+        limiter.request(FakeSession(requests.TooManyRedirects()), "GET", URL)
+
+    # the trial failed (not left pending), so the next one is due later
+    clock.now += 60
+    assert limiter.request(FakeSession(200), "GET", URL).status_code == 200
+
+
+def test_breakers_are_per_host(clock):
+    limiter = _limiter(max_retries=0, breaker_failures=1)
+    with pytest.raises(RuntimeError):
+        limiter.request(FakeSession(503), "GET", URL)
+
+    other = "https://en.wikipedia.test/w/api.php"
+    assert limiter.request(FakeSession(200), "GET", other).status_code == 200
+
+
+# =========================================================
+# STATS
+# =========================================================
+
+
+def test_counters(clock):
+    limiter = _limiter(max_retries=1, breaker_failures=2)
+    limiter.request(FakeSession(429, 200), "GET", URL)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            limiter.request(FakeSession(503), "GET", URL)
+    with pytest.raises(CircuitOpenError):
+        limiter.request(FakeSession(200), "GET", URL)
+
+    stats = limiter.stats.to_dict()
+    assert stats["requests"] == 6
+    assert stats["throttled"] == 5
+    assert stats["retried"] == 3
+    assert stats["failed"] == 3
+    assert stats["circuit_opened"] == 1
+    assert stats["wait_seconds"] > 0
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from src.video import renderer
+from src.video.ffmpeg import Rendition, rendition_path
+from src.video.render_cache import RenderCache
+from src.video.renderer import RenderJob, job_fingerprint
+
+ROOT = Path(__file__).resolve().parents[1]
+SMALL = Rendition(name="small", width=540, height=960)
+VIDEO_BYTES = 1000
+
+
+def _render(out_dir: Path, name: str, renditions=()) -> tuple[Path, Path]:
+    """
+    Stub output files for one job: video, metadata and renditions.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    video, meta = out_dir / f"{name}.mp4", out_dir / f"{name}.json"
+    video.write_bytes(b"v" * VIDEO_BYTES)
+    meta.write_text("{}")
+    for r in renditions:
+        rendition_path(video, r).write_bytes(b"r" * VIDEO_BYTES)
+    return video, meta
+
+
+def _age(cache: RenderCache, key: str, seconds: float) -> None:
+    past = time.time() - seconds
+    for f in cache.root.glob(f"{key}.*"):
+        os.utime(f, (past, past))
+
+
+def _cached(cache: RenderCache, key: str) -> list[str]:
+    return sorted(f.name for f in cache.root.glob(f"{key}.*"))
+
+
+# =========================================================
+# LRU CACHE
+# =========================================================
+
+
+def test_store_then_fetch(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=1 << 20)
+    cache.store("a", *_render(tmp_path / "out", "a", [SMALL]), [SMALL])
+
+    out = tmp_path / "fetched"
+    hit = cache.fetch("a", out / "job.mp4", out / "job.json", [SMALL])
+    assert hit is not None
+    assert hit.video.read_bytes() == b"v" * VIDEO_BYTES
+    assert rendition_path(hit.video, SMALL).exists()
+
+
+def test_fetch_misses_without_every_rendition(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=1 << 20)
+    cache.store("a", *_render(tmp_path / "out", "a"))
+
+    out = tmp_path / "fetched"
+    assert cache.fetch("a", out / "job.mp4", out / "job.json", [SMALL]) is None
+    assert cache.fetch("a", out / "job.mp4", out / "job.json") is not None
+
+
+def test_evicts_least_recently_used_within_budget(tmp_path):
+    # room for two entries (video + small metadata each)
+    cache = RenderCache(tmp_path / "cache", max_bytes=int(2.5 * VIDEO_BYTES))
+    cache.store("a", *_render(tmp_path / "out", "a"))
+    cache.store("b", *_render(tmp_path / "out", "b"))
+    _age(cache, "a", 300)
+    _age(cache, "b", 200)
+
+    # a hit refreshes "a", so "b" is now the least recently used
+    out = tmp_path / "fetched"
+    assert cache.fetch("a", out / "a.mp4", out / "a.json") is not None
+    cache.store("c", *_render(tmp_path / "out", "c"))
+
+    assert _cached(cache, "a") == ["a.json", "a.mp4"]
+    assert _cached(cache, "b") == []
+    assert _cached(cache, "c") == ["c.json", "c.mp4"]
+
+
+def test_renditions_are_evicted_with_their_key(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=int(3.5 * VIDEO_BYTES))
+    cache.store("a", *_render(tmp_path / "out", "a", [SMALL]), [SMALL])
+    assert _cached(cache, "a") == ["a.json", "a.mp4", "a.small.mp4"]
+    _age(cache, "a", 300)
+
+    cache.store("b", *_render(tmp_path / "out", "b", [SMALL]), [SMALL])
+
+    assert _cached(cache, "a") == []
+    assert _cached(cache, "b") == ["b.json", "b.mp4", "b.small.mp4"]
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=0)
+    cache.store("a", *_render(tmp_path / "out", "a"))
+
+    out = tmp_path / "fetched"
+    assert not (tmp_path / "cache").exists()
+    assert cache.fetch("a", out / "a.mp4", out / "a.json") is None
+
+
+# =========================================================
+# JOB FINGERPRINT
+# =========================================================
+
+
+def _job() -> RenderJob:
+    colors = [(200, 40, 40), (40, 160, 60), (40, 80, 200), (220, 180, 30)]
+    return RenderJob(
+        puzzle_id="p-001",
+        hook="Name these 4 things!",
+        instruction="All start with A",
+        items=["Apple", "Anchor", "Arrow", "Axe"],
+        images=[Image.new("RGB", (64, 64), c) for c in colors],
+        tags=["quiz"],
+    )
+
+
+def _background(tmp_path: Path) -> Path:
+    path = tmp_path / "bg.png"
+    if not path.exists():
+        Image.new("RGB", (32, 32), (10, 20, 30)).save(path)
+    return path
+
+
+def test_fingerprint_is_stable_across_processes(tmp_path):
+    bg = _background(tmp_path)
+    script = (
+        "import sys; from pathlib import Path; sys.path.insert(0, 'tests')\n"
+        "from test_render_cache import _job\n"
+        "from src.video.renderer import job_fingerprint\n"
+        f"print(job_fingerprint(_job(), Path({str(bg)!r}), None))\n"
+    )
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=ROOT,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert keys == {job_fingerprint(_job(), bg, None)}
+
+
+def test_fingerprint_changes_with_settings(tmp_path, monkeypatch):
+    bg = _background(tmp_path)
+    before = job_fingerprint(_job(), bg, None)
+    monkeypatch.setattr(renderer, "TIMER_SECONDS", renderer.TIMER_SECONDS + 1)
+    assert job_fingerprint(_job(), bg, None) != before
+
+
+def test_fingerprint_changes_with_images(tmp_path):
+    bg = _background(tmp_path)
+    job = _job()
+    before = job_fingerprint(job, bg, None)
+
+    job.images[2].putpixel((0, 0), (0, 0, 0))
+    assert job_fingerprint(job, bg, None) != before
+
+
+def test_fingerprint_changes_with_background(tmp_path):
+    bg = _background(tmp_path)
+    before = job_fingerprint(_job(), bg, None)
+
+    Image.new("RGB", (32, 32), (99, 20, 30)).save(bg)
+    assert job_fingerprint(_job(), bg, None) != before
+
+
+def test_fingerprint_changes_with_renditions(tmp_path):
+    bg = _background(tmp_path)
+    assert job_fingerprint(_job(), bg, None) != job_fingerprint(
+        _job(), bg, None, [SMALL]
+    )
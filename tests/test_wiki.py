@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.media import ratelimit, wiki
+
+
+class _StubApi(BaseHTTPRequestHandler):
+    """
+    Minimal pageimages endpoint: titles are capitalised (normalized),
+    "Felis catus" redirects to "Cat", "Nope*" pages are missing, and every
+    response is split in two via `continue` (original, then thumbnail).
+    """
+
+    protocol_version = "HTTP/1.1"
+    requests: list[dict] = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        q = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        self.requests.append(q)
+        first = "pcontinue" not in q
+
+        normalized, redirects, pages = [], [], {}
+        for i, title in enumerate(q["titles"].split("|")):
+            name = title[0].upper() + title[1:]
+            if name != title:
+                normalized.append({"from": title, "to": name})
+            if name == "Felis catus":
+                redirects.append({"from": name, "to": "Cat"})
+                name = "Cat"
+            if name.startswith("Nope"):
+                pages[str(-1 - i)] = {"title": name, "missing": ""}
+                continue
+            slug = name.replace(" ", "_")
+            kind = "original" if first else "thumbnail"
+            pages[str(i + 1)] = {
+                "pageid": i + 1,
+                "title": name,
+                kind: {
+                    "source": f"http://img.test/{kind}/{slug}.jpg",
+                    "width": 1200 if first else 800,
+                    "height": 900 if first else 600,
+                },
+            }
+
+        query = {"pages": pages}
+        if first:
+            query.update(normalized=normalized, redirects=redirects)
+            data = {"continue": {"pcontinue": "1", "continue": "||"}, "query": query}
+        else:
+            data = {"batchcomplete": "", "query": query}
+
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _StubApi.requests = []
+
+    url = f"http://127.0.0.1:{server.server_port}/"
+    monkeypatch.setattr(wiki, "WIKI_API_URL", url)
+    limiter = ratelimit.RateLimiter(rate=1000, burst=100)
+    monkeypatch.setattr(ratelimit, "_limiter", limiter)
+    yield _StubApi.requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_titles_are_batched(api):
+    titles = [f"Item {i}" for i in range(120)]
+    pages = wiki.resolve_page_images(titles)
+
+    assert set(pages) == set(titles)
+    # 3 batches (50 + 50 + 20), each followed by one continuation
+    batches = [q["titles"].split("|") for q in api if "pcontinue" not in q]
+    assert [len(b) for b in batches] == [50, 50, 20]
+    assert [t for b in batches for t in b] == titles
+    assert len(api) == 6
+
+
+def test_normalized_and_redirected_titles_map_back(api):
+    pages = wiki.resolve_page_images(["felis catus", "dog", "Nope", "Dog"])
+
+    assert pages["felis catus"].title == "Cat"
+    assert pages["dog"].title == "Dog"
+    assert pages["Dog"].title == "Dog"
+    assert pages["Nope"] is None
+
+
+def test_continuations_are_merged(api):
+    page = wiki.resolve_page_images(["cat"])["cat"]
+
+    assert len(api) == 2 and api[1]["pcontinue"] == "1"
+    assert page.original == "http://img.test/original/Cat.jpg"
+    assert page.original_size == (1200, 900)
+    assert page.thumbnail == "http://img.test/thumbnail/Cat.jpg"
+    assert page.thumbnail_size == (800, 600)